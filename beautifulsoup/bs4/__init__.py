@@ -36,6 +36,12 @@ __all__ = [
     "UnicodeDammit",
     "CData",
     "Doctype",
+    "iterparse",
+    "parse_many",
+    "ParseResult",
+    "loads",
+    "ParseCache",
+    "TextRenderer",
 
     # Exceptions
     "FeatureNotFound",
@@ -50,8 +56,11 @@ __all__ = [
     "XMLParsedAsHTMLWarning",
 ]
 
+import codecs
 from collections import Counter
+import gc
 import sys
+from types import MappingProxyType
 import warnings
 
 # The very first thing we do is give a useful error if someone is
@@ -63,11 +72,14 @@ if sys.version_info.major < 3:
 
 from .builder import (
     builder_registry,
+    IncrementalParser,
     TreeBuilder,
 )
 from .builder._htmlparser import HTMLParserTreeBuilder
-from .dammit import UnicodeDammit
+from .dammit import EncodingDetector, UnicodeDammit
 from .css import CSS
+from ._batch import TreeBatch
+from ._index import TagIndex
 from ._deprecation import (
     _deprecated,
 )
@@ -88,6 +100,10 @@ from .element import (
     TemplateString,
 )
 from .formatter import Formatter
+from .cache import ParseCache, QueryCache
+from .parallel import ParseResult, parse_many
+from .serialize import loads
+from .text import TextRenderer
 from .filter import (
     ElementFilter,
     SoupStrainer,
@@ -95,9 +111,12 @@ from .filter import (
 from .replacer import SoupReplacer
 from typing import (
     Any,
+    Callable,
     cast,
     Counter as CounterType,
     Dict,
+    IO,
+    Iterable,
     Iterator,
     List,
     Sequence,
@@ -107,6 +126,7 @@ from typing import (
 )
 
 from bs4._typing import (
+    _AllowTagCreationFunction,
     _Encoding,
     _Encodings,
     _IncomingMarkup,
@@ -145,7 +165,11 @@ class BeautifulSoup(Tag):
 
     These methods will be called by the BeautifulSoup constructor:
       * reset()
-      * feed(markup)
+      * _feed()
+
+    When a document is parsed incrementally, `BeautifulSoup.feed`
+    and `BeautifulSoup.close` do the same job using a
+    `bs4.builder.IncrementalParser`.
 
     The tree builder may call these methods from its feed() implementation:
       * handle_starttag(name, attrs) # See note about return value
@@ -192,6 +216,51 @@ class BeautifulSoup(Tag):
     preserve_whitespace_tag_stack: List[Tag]  #: :meta private:
     string_container_stack: List[Tag]  #: :meta private:
     _most_recent_element: Optional[PageElement]  #: :meta private:
+    _allow_tag_creation: _AllowTagCreationFunction  #: :meta private:
+
+    #: When a document is parsed incrementally, `BeautifulSoup.feed`
+    #: collects this many bytes before deciding which encoding the
+    #: document is in.
+    ENCODING_DETECTION_SIZE: int = 2048
+
+    # These members are only used while parsing markup incrementally.
+    _from_encoding: Optional[_Encoding] = None
+    _exclude_encodings: Optional[_Encodings] = None
+    _incremental_parser: Optional[IncrementalParser] = None
+    _incremental_buffer: Optional[bytearray] = None
+    _incremental_type: Optional[type] = None
+    _can_feed: bool = True
+
+    #: If this is True, the first search of the document builds an
+    #: index of its tags by name, ID and CSS class, which later calls
+    #: to `Tag.find_all`, `Tag.find` and `Tag.select` use to avoid
+    #: looking at every element. See the ``use_index`` constructor
+    #: argument.
+    use_index: bool = False
+    _tag_index: Optional[TagIndex] = None
+
+    #: This number goes up every time the tree is modified through
+    #: the Beautiful Soup API. If it hasn't changed, the tree hasn't
+    #: changed.
+    tree_version: int = 0
+
+    #: If this is set, the results of searches are kept here, and
+    #: running the same search again returns the same results without
+    #: looking at the tree. See the ``query_cache_size`` constructor
+    #: argument.
+    query_cache: Optional[QueryCache] = None
+
+    #: If this is True, every time a `Tag` in this document is
+    #: rendered as a string, the result is kept. See the
+    #: ``cache_rendering`` constructor argument.
+    cache_rendering: bool = False
+
+    #: If this is True, the cyclic garbage collector is switched off
+    #: while the document is parsed. See the ``pause_gc`` constructor
+    #: argument.
+    pause_gc: bool = False
+
+    _batch: Optional[TreeBatch] = None
 
     #: Beautiful Soup's best guess as to the character encoding of the
     #: original document.
@@ -218,6 +287,10 @@ class BeautifulSoup(Tag):
         exclude_encodings: Optional[_Encodings] = None,
         element_classes: Optional[Dict[Type[PageElement], Type[PageElement]]] = None,
         replacer: Optional[SoupReplacer] = None,
+        use_index: bool = False,
+        query_cache_size: int = 0,
+        cache_rendering: bool = False,
+        pause_gc: bool = False,
         **kwargs: Any,
     ):
         """Constructor.
@@ -263,6 +336,50 @@ class BeautifulSoup(Tag):
          to replace tag names, modify attributes, or apply other
          transformations as tags are created.
 
+        :param use_index: If this is True, the first time the document
+         is searched, an index of its tags is built, and searches
+         for tags with a particular name, ID or CSS class (through
+         `Tag.find_all`, `Tag.find`, `Tag.select` or `Tag.select_one`)
+         look only at the tags that might match. This pays off when
+         the same document is searched many times. Modifying the tree
+         throws the index away, and the next search rebuilds it. Only
+         changes made through methods like `Tag.append`,
+         `PageElement.extract` and ``tag[attribute] = value`` are
+         noticed; if you change a tag's `Tag.name` or modify
+         `Tag.attrs` directly, set ``use_index`` to False.
+
+        :param query_cache_size: If this is more than zero, the results
+         of up to this many searches (through `Tag.find_all`,
+         `Tag.find`, `Tag.select` or `Tag.select_one`) are kept in a
+         `QueryCache`, and running exactly the same search on the same
+         `Tag` again returns a copy of the old results. Modifying the
+         tree empties the cache. As with ``use_index``, changing a
+         tag's `Tag.name` or modifying `Tag.attrs` directly isn't
+         noticed.
+
+        :param cache_rendering: If this is True, rendering a `Tag` as
+         a string (through `Tag.decode`, ``str()``, `Tag.encode`,
+         `Tag.prettify` and so on) stores the result on the `Tag`,
+         along with the renderings of its children. Rendering the
+         same `Tag` again with the same options is instant, and after
+         a change to the tree, only the parts of the tree that
+         changed are formatted again. This uses more memory: up to a
+         few times the size of the rendered document. Changing a
+         tag's `Tag.name` or modifying `Tag.attrs` directly isn't
+         noticed; call ``tag.fingerprint(recalculate=True)`` after
+         doing that.
+
+        :param pause_gc: If this is True, Python's cyclic garbage
+         collector is switched off while the markup is parsed, and
+         switched back on afterwards. A parse tree is full of
+         reference cycles, and while a big document is being parsed,
+         the garbage collector will look through the growing tree
+         over and over again without finding anything to collect.
+         The collector is switched off for the whole process, not
+         just this thread, so trees you've stopped using aren't
+         collected during the parse either; `BeautifulSoup.release`
+         frees a tree without waiting for the collector.
+
         :param kwargs: For backwards compatibility purposes, the
          constructor accepts certain keyword arguments used in
          Beautiful Soup 3. None of these arguments do anything in
@@ -343,7 +460,9 @@ class BeautifulSoup(Tag):
             "fromEncoding", "from_encoding"
         )
 
-        if from_encoding and isinstance(markup, str):
+        # (An empty string is the default markup, and the document may
+        # arrive later as bytestrings passed into feed().)
+        if from_encoding and isinstance(markup, str) and markup:
             warnings.warn(
                 "You provided Unicode markup but also provided a value for from_encoding. Your from_encoding will be ignored."
             )
@@ -444,6 +563,13 @@ class BeautifulSoup(Tag):
         self._namespaces = dict()
         self.parse_only = parse_only
         self.replacer = replacer
+        self.use_index = use_index
+        if query_cache_size > 0:
+            self.query_cache = QueryCache(query_cache_size)
+        self.cache_rendering = cache_rendering
+        self.pause_gc = pause_gc
+        self._from_encoding = from_encoding
+        self._exclude_encodings = exclude_encodings
 
         if hasattr(markup, "read"):  # It's a file-type object.
             markup = markup.read()
@@ -497,6 +623,10 @@ class BeautifulSoup(Tag):
         # reference to this object.
         self.markup = None
         self.builder.soup = None
+        if markup:
+            # This object can't also be used to parse a document
+            # incrementally.
+            self._can_feed = False
 
     def copy_self(self) -> "BeautifulSoup":
         """Create a new BeautifulSoup object with the same TreeBuilder,
@@ -506,28 +636,21 @@ class BeautifulSoup(Tag):
         """
         clone = type(self)("", None, self.builder)
 
+        # Some tree builders (html5lib) turn even an empty string into
+        # a skeleton document, but the copy needs to start out empty.
+        clone.clear()
+
         # Keep track of the encoding of the original document,
         # since we won't be parsing it again.
         clone.original_encoding = self.original_encoding
         return clone
 
-    def __getstate__(self) -> Dict[str, Any]:
-        # Frequently a tree builder can't be pickled.
-        d = dict(self.__dict__)
-        if "builder" in d and d["builder"] is not None and not self.builder.picklable:
-            d["builder"] = type(self.builder)
-        # Store the contents as a Unicode string.
-        d["contents"] = []
-        d["markup"] = self.decode()
-
-        # If _most_recent_element is present, it's a Tag object left
-        # over from initial parse. It might not be picklable and we
-        # don't need it.
-        if "_most_recent_element" in d:
-            del d["_most_recent_element"]
-        return d
-
     def __setstate__(self, state: Dict[str, Any]) -> None:
+        # A BeautifulSoup object is now pickled through Tag.dumps()
+        # (see Tag.__reduce__), but a pickle created by an older
+        # version of Beautiful Soup contains the document's markup,
+        # which needs to be parsed again.
+        #
         # If necessary, restore the TreeBuilder by looking it up.
         self.__dict__ = state
         if isinstance(self.builder, type):
@@ -664,7 +787,14 @@ class BeautifulSoup(Tag):
         self.builder.reset()
 
         if self.markup is not None:
-            self.builder.feed(self.markup)
+            if self.pause_gc and gc.isenabled():
+                gc.disable()
+                try:
+                    self.builder.feed(self.markup)
+                finally:
+                    gc.enable()
+            else:
+                self.builder.feed(self.markup)
         # Close out any unfinished strings and close all the open tags.
         self.endData()
         while (
@@ -672,10 +802,152 @@ class BeautifulSoup(Tag):
         ):
             self.popTag()
 
+    def feed(self, data: _RawMarkup) -> None:
+        """Parse the next chunk of a document that's arriving a piece
+        at a time, e.g. over a network connection.
+
+        Create a `BeautifulSoup` object without any markup, call
+        feed() for every chunk of the document, and then call
+        `BeautifulSoup.close`::
+
+            soup = BeautifulSoup(features="lxml")
+            for chunk in response.iter_content(8192):
+                soup.feed(chunk)
+            soup.close()
+
+        The parse tree is built as the chunks arrive, so parsing
+        overlaps with the download, and the whole document never
+        needs to be in memory at once. Only some tree builders
+        support this; currently, those are "html.parser", "lxml" and
+        "lxml-xml".
+
+        The chunks can be Unicode strings or bytestrings, but not a
+        mixture. If they're bytestrings, the encoding will be the
+        ``from_encoding`` passed into the constructor, if any, or else
+        it will be guessed from the first `ENCODING_DETECTION_SIZE`
+        bytes. Since the start of the document has already been
+        parsed by the time the rest of it arrives, only one encoding
+        can be tried.
+
+        :param data: A string or bytestring.
+        :raise NotImplementedError: If the tree builder can't parse
+            documents incrementally.
+        :raise ValueError: If this object was created with some
+            markup, `BeautifulSoup.close` has already been called, or
+            the document has been frozen.
+        :raise ParserRejectedMarkup: If the parser can't handle the markup.
+        """
+        self._check_mutable()
+        if self._incremental_type is None:
+            if not self._can_feed:
+                raise ValueError(
+                    "This BeautifulSoup object already contains a parsed document. To parse a document incrementally, create a BeautifulSoup object without any markup."
+                )
+            self.reset()
+            self.builder.initialize_soup(self)
+            self._incremental_type = type(data)
+            if isinstance(data, bytes):
+                self._incremental_buffer = bytearray()
+        elif not isinstance(data, self._incremental_type):
+            raise TypeError(
+                "Can't mix Unicode strings and bytestrings when parsing a document incrementally."
+            )
+
+        if self._incremental_parser is not None:
+            self._incremental_parser.feed(data)
+        elif self._incremental_buffer is None:
+            # This is Unicode, so there's no encoding to figure out.
+            self._incremental_parser = self.builder.incremental_parser(None)
+            self._incremental_parser.feed(data)
+        else:
+            self._incremental_buffer += data
+            if (
+                self._from_encoding is not None
+                or len(self._incremental_buffer) >= self.ENCODING_DETECTION_SIZE
+            ):
+                self._start_incremental_bytes()
+
+    def _start_incremental_bytes(self) -> None:
+        """Decide which encoding an incrementally parsed document is in,
+        then send the bytes collected so far to the parser.
+        """
+        assert self._incremental_buffer is not None
+        detector = EncodingDetector(
+            bytes(self._incremental_buffer),
+            known_definite_encodings=[self._from_encoding] if self._from_encoding else None,
+            is_html=not self.is_xml,
+            exclude_encodings=self._exclude_encodings,
+        )
+        self._incremental_buffer = None
+
+        # Go with the first encoding that can handle the start of the
+        # document.
+        encoding: Optional[_Encoding] = None
+        for candidate in detector.encodings:
+            try:
+                codecs.getincrementaldecoder(candidate)().decode(detector.markup)
+            except (UnicodeDecodeError, LookupError):
+                continue
+            encoding = candidate
+            break
+        if encoding is None:
+            raise ParserRejectedMarkup(
+                "Could not find an encoding that works for the start of this document."
+            )
+        self.original_encoding = encoding
+        self.declared_html_encoding = detector.declared_encoding
+        self.contains_replacement_characters = False
+        self._incremental_parser = self.builder.incremental_parser(encoding)
+        self._incremental_parser.feed(detector.markup)
+
+    def close(self) -> None:
+        """Finish parsing a document that was passed in through
+        `BeautifulSoup.feed`.
+
+        Any data held back by the parser is processed, and any tags
+        that are still open are closed.
+
+        :raise ParserRejectedMarkup: If the parser can't handle the markup.
+        """
+        if self._incremental_type is None:
+            # Nothing was ever fed in, so the (empty) document was
+            # completely parsed by the constructor.
+            return
+        if self._incremental_parser is None:
+            if self._incremental_buffer is not None:
+                # The document was too short for us to have chosen
+                # an encoding yet.
+                self._start_incremental_bytes()
+            else:
+                self._incremental_parser = self.builder.incremental_parser(None)
+        assert self._incremental_parser is not None
+        self._incremental_parser.close()
+
+        # Close out any unfinished strings and close all the open tags.
+        self.endData()
+        while (
+            self.currentTag is not None and self.currentTag.name != self.ROOT_TAG_NAME
+        ):
+            self.popTag()
+
+        # Remove the builder's circular reference to this object.
+        self.builder.soup = None
+        self._incremental_parser = None
+        self._incremental_type = None
+        self._can_feed = False
+
     def reset(self) -> None:
         """Reset this object to a state as though it had never parsed any
         markup.
+
+        :raise ValueError: If the document has been frozen (see
+            `BeautifulSoup.freeze`).
         """
+        if self._frozen:
+            # This is the top of the tree, so there's no need to look
+            # any further; and when reset() is called from the
+            # constructor, the tree links haven't been set up yet.
+            self._check_mutable()
         Tag.__init__(self, self, self.builder, self.ROOT_TAG_NAME)
         self.hidden = True
         self.builder.reset()
@@ -686,8 +958,170 @@ class BeautifulSoup(Tag):
         self.preserve_whitespace_tag_stack = []
         self.string_container_stack = []
         self._most_recent_element = None
+        self._tag_index = None
+        self.tree_version += 1
+        if self.parse_only:
+            self._allow_tag_creation = self.parse_only._compile_tag_creation()
         self.pushTag(self)
 
+    def _document_changed(self) -> None:
+        # The tree has been modified, so the index is out of date, and
+        # so is everything in the query cache.
+        self._tag_index = None
+        self.tree_version += 1
+
+    def _document_index(self) -> Optional[TagIndex]:
+        if self._batch is not None:
+            self._batch.flush()
+        if not self.use_index or self._incremental_type is not None:
+            return None
+        if self._tag_index is None:
+            self._tag_index = TagIndex(self)
+        return self._tag_index
+
+    def _document_caches_rendering(self) -> bool:
+        if self._batch is not None:
+            self._batch.flush()
+        return self.cache_rendering and self._incremental_type is None
+
+    def _document_query_cache(self) -> Optional[QueryCache]:
+        if self._batch is not None:
+            self._batch.flush()
+        cache = self.query_cache
+        if cache is None or self._incremental_type is not None:
+            return None
+        cache.validate(self.tree_version)
+        return cache
+
+    def batch_edit(self) -> TreeBatch:
+        """Make a lot of changes to the tree at once.
+
+        Use the return value as a context manager::
+
+         with soup.batch_edit():
+             for tag in soup.find_all("span"):
+                 tag.unwrap()
+
+        Inside the ``with`` block, adding or removing an element only
+        changes `Tag.contents`, `PageElement.parent` and the sibling
+        links. The `PageElement.next_element` and
+        `PageElement.previous_element` links, and everything
+        calculated from the tree (see `BeautifulSoup.tree_version`),
+        are brought up to date in a single pass over the parts of the
+        tree that changed, when the block ends.
+
+        Any method that needs the next_element chain, such as
+        `Tag.descendants`, `Tag.find_all` or `Tag.decode`, brings the
+        tree up to date before it starts, so the results are always
+        correct. Reading ``next_element`` or ``previous_element``
+        yourself inside the block may give an out-of-date answer.
+
+        Blocks can be nested; the tree is brought up to date when the
+        outermost block ends. A block only affects this document:
+        searching another document inside the block doesn't bring
+        this one up to date, or look at its changes at all.
+
+        :raise ValueError: If the document has been frozen (see
+            `BeautifulSoup.freeze`).
+        """
+        self._check_mutable()
+        if self._batch is None:
+            self._batch = TreeBatch(self)
+        return self._batch
+
+    def release(self) -> None:
+        """Destroy the parse tree, and leave this object as though it
+        had never parsed any markup.
+
+        The elements of a parse tree all refer to each other, so a
+        tree that's simply dropped stays in memory until Python's
+        cyclic garbage collector gets around to it, and the garbage
+        collector has to look at every element to find that out. This
+        method breaks every link between the elements in one pass:
+        `PageElement.parent`, the sibling links, the
+        `PageElement.next_element` chain and `Tag.contents`. After
+        that, each element is freed as soon as nothing else refers to
+        it. In a long-running process that parses a lot of big
+        documents, this keeps memory use down.
+
+        The elements that used to be in the tree are left empty and
+        disconnected, and shouldn't be used for anything. (Calling
+        `PageElement.decompose` on the `BeautifulSoup` object itself
+        doesn't reach the rest of the document; this does.)
+
+        :raise ValueError: If the document has been frozen (see
+            `BeautifulSoup.freeze`).
+        """
+        self._check_mutable()
+        if self._batch is not None:
+            self._batch.flush()
+        # Go by .contents rather than the next_element chain, so that
+        # nothing is missed even if the chain has been damaged.
+        stack: List[PageElement] = list(self.contents)
+        while stack:
+            element = stack.pop()
+            if isinstance(element, Tag):
+                stack.extend(element.contents)
+                element.contents = []
+            element.parent = element.next_element = element.previous_element = None
+            element.next_sibling = element.previous_sibling = None
+        self.reset()
+
+    def freeze(self) -> None:
+        """Make this document read-only, so it can be searched by many
+        threads at once.
+
+        After this, any attempt to change the tree through the
+        Beautiful Soup API (`Tag.append`, `PageElement.extract`,
+        ``tag[attribute] = value``, and so on) raises ValueError.
+        Every `Tag.contents` becomes a tuple, and every `Tag.attrs`
+        becomes a read-only mapping. (The values of multi-valued
+        attributes like "class" are still lists; don't change them.)
+
+        Anything Beautiful Soup would otherwise calculate the first
+        time it's needed, and throw away whenever the tree changes, is
+        calculated now and kept: the fingerprint of every `Tag` (see
+        `Tag.fingerprint`), the index of tags if this object was
+        created with ``use_index=True``, and the rendered document if
+        it was created with ``cache_rendering=True``. Searching and
+        rendering a frozen document from several threads is safe.
+
+        A frozen document can't be thawed, but a copy of it (made with
+        `copy.copy`) can be changed.
+
+        :raise ValueError: If this is called inside a
+            `BeautifulSoup.batch_edit` block, or while a document is
+            being parsed with `BeautifulSoup.feed`.
+        """
+        if self._frozen:
+            return
+        if self._batch is not None:
+            raise ValueError("Cannot freeze a document inside a batch_edit() block.")
+        if self._incremental_type is not None:
+            raise ValueError(
+                "Cannot freeze a document that's still being parsed. Call close() first."
+            )
+        stack: List[Tag] = [self]
+        while stack:
+            tag = stack.pop()
+            tag.contents = cast(List[PageElement], tuple(tag.contents))
+            tag.attrs = cast(Dict[str, Any], MappingProxyType(tag.attrs))
+            tag._positions = None
+            for child in tag.contents:
+                if isinstance(child, Tag):
+                    stack.append(child)
+        self._frozen = True
+
+        self.fingerprint()
+        self._document_index()
+        if self.cache_rendering:
+            self.decode()
+
+    @property
+    def frozen(self) -> bool:
+        """Has this document been frozen with `BeautifulSoup.freeze`?"""
+        return self._frozen
+
     def new_tag(
         self,
         name: str,
@@ -1030,7 +1464,7 @@ class BeautifulSoup(Tag):
         if (
             self.parse_only
             and len(self.tagStack) <= 1
-            and not self.parse_only.allow_tag_creation(nsprefix, name, attrs)
+            and not self._allow_tag_creation(nsprefix, name, attrs)
         ):
             return None
 
@@ -1133,21 +1567,6 @@ class BeautifulSoup(Tag):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        if self.is_xml:
-            # Print the XML declaration
-            encoding_part = ""
-            declared_encoding: Optional[str] = eventual_encoding
-            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
-                # This is a special Python encoding; it can't actually
-                # go into an XML document because it means nothing
-                # outside of Python.
-                declared_encoding = None
-            if declared_encoding is not None:
-                encoding_part = ' encoding="%s"' % declared_encoding
-            prefix = '<?xml version="1.0"%s?>\n' % encoding_part
-        else:
-            prefix = ""
-
         # Prior to 4.13.0, the first argument to this method was a
         # bool called pretty_print, which gave the method a different
         # signature from its superclass implementation, Tag.decode.
@@ -1177,7 +1596,30 @@ class BeautifulSoup(Tag):
             warnings.warn(warning, DeprecationWarning, stacklevel=2)
         elif indent_level is False or pretty_print is False:
             indent_level = None
-        return prefix + super(BeautifulSoup, self).decode(
+        return super(BeautifulSoup, self).decode(
+            indent_level, eventual_encoding, formatter, iterator
+        )
+
+    def _decode_pieces(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: Union[Formatter, str] = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        if self.is_xml:
+            # Print the XML declaration
+            encoding_part = ""
+            declared_encoding: Optional[str] = eventual_encoding
+            if eventual_encoding in PYTHON_SPECIFIC_ENCODINGS:
+                # This is a special Python encoding; it can't actually
+                # go into an XML document because it means nothing
+                # outside of Python.
+                declared_encoding = None
+            if declared_encoding is not None:
+                encoding_part = ' encoding="%s"' % declared_encoding
+            yield '<?xml version="1.0"%s?>\n' % encoding_part
+        yield from super(BeautifulSoup, self)._decode_pieces(
             indent_level, eventual_encoding, formatter, iterator
         )
 
@@ -1201,6 +1643,137 @@ class BeautifulStoneSoup(BeautifulSoup):
         super(BeautifulStoneSoup, self).__init__(*args, **kwargs)
 
 
+class _IterParseSoup(BeautifulSoup):
+    """A `BeautifulSoup` object that keeps track of the tags matching
+    some condition as they're closed, so that `iterparse` can hand
+    them out while the rest of the document is still being parsed.
+    """
+
+    _iterparse_match: Union[ElementFilter, str]
+    _iterparse_matcher: Optional[Callable[[Tag], Any]] = None
+    _iterparse_closed: List[Tag]
+
+    def popTag(self) -> Optional[Tag]:
+        """Internal method called by _popToTag when a tag is closed.
+
+        :meta private:
+        """
+        tag = self.currentTag
+        result = super(_IterParseSoup, self).popTag()
+        if tag is not None and tag is not self and self._matches(tag):
+            self._iterparse_closed.append(tag)
+        return result
+
+    def _matches(self, tag: Tag) -> bool:
+        if self._iterparse_matcher is None:
+            if isinstance(self._iterparse_match, str):
+                # Compile the selector as late as possible, so that
+                # it can use namespace prefixes defined in the
+                # document.
+                self._iterparse_matcher = self.css.compile(self._iterparse_match).match
+            else:
+                self._iterparse_matcher = self._iterparse_match.compile()
+        return bool(self._iterparse_matcher(tag))
+
+    def _discard(self, tag: Tag, parent: Tag) -> None:
+        """Remove a tag that has been yielded by `iterparse` from the
+        tree, along with everything that came before it in its parent.
+        """
+        if tag.parent is not parent:
+            # The caller has already moved this tag somewhere else.
+            return
+        last = tag._last_descendant()
+        while parent.contents:
+            first = parent.contents[0]
+            first.extract(_self_index=0)
+            if first is tag:
+                break
+        if self._most_recent_element is last:
+            # Whatever gets parsed next will come immediately after
+            # the parent, not after the tag we just removed.
+            self._most_recent_element = parent
+
+
+def iterparse(
+    source: Union[_IncomingMarkup, Iterable[_RawMarkup]],
+    match: Union[ElementFilter, str],
+    features: Optional[Union[str, Sequence[str]]] = "lxml-xml",
+    chunk_size: int = 64 * 1024,
+    **kwargs: Any,
+) -> Iterator[Tag]:
+    """Parse a document incrementally, yielding each `Tag` that matches
+    some condition as soon as its end tag is seen.
+
+    This is meant for documents that are too large to keep in memory,
+    such as huge XML data dumps::
+
+        with open("sitemap.xml", "rb") as fh:
+            for url in iterparse(fh, "url"):
+                print(url.loc.string)
+
+    Once a matching `Tag` has been yielded, it's removed from the
+    parse tree, along with everything that came before it in its
+    parent. If the matching tags are siblings, as they usually are,
+    the amount of memory used depends on the depth of the document,
+    not its size. A yielded `Tag` stays intact, so you can keep it
+    around if you want.
+
+    Because earlier parts of the document are thrown away, a `Tag`
+    will not contain any matches nested inside it, and CSS selectors
+    that look at a tag's earlier siblings (such as ``:nth-child``)
+    won't work as expected.
+
+    :param source: The document: a string or bytestring, an open
+        filehandle, or an iterable of string or bytestring chunks.
+    :param match: Yield the tags that match this `ElementFilter`
+        (such as a `SoupStrainer`), or this CSS selector.
+    :param features: The tree builder to use. Only tree builders that
+        can parse a document incrementally will work; see
+        `BeautifulSoup.feed`.
+    :param chunk_size: If ``source`` is a string or a filehandle, pass
+        it into the parser this many characters (or bytes) at a time.
+    :param kwargs: Other arguments to the `BeautifulSoup` constructor,
+        such as ``from_encoding`` or ``element_classes``.
+    """
+    chunks: Iterable[_RawMarkup]
+    if hasattr(source, "read"):
+        chunks = _read_chunks(cast(IO, source), chunk_size)
+    elif isinstance(source, (str, bytes)):
+        chunks = (
+            source[i : i + chunk_size] for i in range(0, len(source), chunk_size)
+        )
+    else:
+        chunks = cast(Iterable[_RawMarkup], source)
+
+    soup = _IterParseSoup(features=features, **kwargs)
+    soup._iterparse_match = match
+    soup._iterparse_closed = []
+    for chunk in chunks:
+        soup.feed(chunk)
+        yield from _drain(soup)
+    soup.close()
+    yield from _drain(soup)
+
+
+def _read_chunks(fh: IO, chunk_size: int) -> Iterator[_RawMarkup]:
+    while True:
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _drain(soup: _IterParseSoup) -> Iterator[Tag]:
+    """Yield and then discard the matches found in the most recent chunk."""
+    closed = soup._iterparse_closed
+    soup._iterparse_closed = []
+    for tag in closed:
+        parent = tag.parent
+        yield tag
+        if parent is not None:
+            soup._discard(tag, parent)
+
+
 # If this file is run as a script, act as an HTML pretty-printer.
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,197 @@
+"""Batches of changes to a parse tree.
+
+Every time an element is added to or removed from a tree, the
+`PageElement.next_element` and `PageElement.previous_element` links
+around it are repaired right away, and everything calculated from the
+tree (the tag index, the query cache, cached renderings...) is thrown
+away. That's a lot of work to repeat when a lot of elements are moved
+at once. Inside a `BeautifulSoup.batch_edit` block, a change only
+touches `Tag.contents`, `PageElement.parent` and the sibling links;
+the tags whose contents changed are written down here, and the rest
+of the work is done once, when the block ends.
+
+A batch belongs to a single document. It's stored on the document's
+`BeautifulSoup` object (and on any element taken out of the document
+while the batch is open), so looking at one document never touches a
+batch that's open on another.
+
+This module is private; use `BeautifulSoup.batch_edit` instead.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TYPE_CHECKING,
+)
+
+from bs4.element import (
+    PageElement,
+    Tag,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class TreeBatch(object):
+    """The changes made to one document inside a
+    `BeautifulSoup.batch_edit` block.
+
+    While a batch is open, any method that follows the
+    `PageElement.next_element` chain (`Tag.descendants`,
+    `Tag.find_all`, `Tag.decode`, and so on) calls `TreeBatch.flush`
+    before it looks at a tree that's part of the batch, so the tree
+    is never seen in an inconsistent state. Looking at
+    ``next_element`` or ``previous_element`` directly, though, may
+    give an out-of-date answer until the batch is flushed.
+    """
+
+    #: The document being changed.
+    root: BeautifulSoup
+
+    #: The number of `BeautifulSoup.batch_edit` blocks for this
+    #: document that haven't ended yet.
+    depth: int
+
+    #: The tags whose contents have changed since the last flush,
+    #: keyed by their ids.
+    changed: Dict[int, Tag]
+
+    #: The elements that have been taken out of their trees since the
+    #: last flush, keyed by their ids. These elements, and anything
+    #: added to them, are part of the batch until it's flushed; each
+    #: one has the batch as its ``_batch`` attribute, the same as the
+    #: document does.
+    detached: Dict[int, PageElement]
+
+    def __init__(self, root: BeautifulSoup):
+        self.root = root
+        self.depth = 0
+        self.changed = {}
+        self.detached = {}
+
+    def __enter__(self) -> TreeBatch:
+        self.depth += 1
+        self.root._batch = self
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.depth -= 1
+        if self.depth == 0:
+            # Even if the block raised an exception, the tree needs
+            # to be made consistent again.
+            self.root._batch = None
+            self.flush()
+
+    def owns(self, root: PageElement) -> bool:
+        """Is the tree that has ``root`` at the top part of this batch?"""
+        return self.depth > 0 and root._batch is self
+
+    def detach(self, element: PageElement) -> None:
+        """Make an element that was just taken out of a tree that's
+        part of this batch into a tree of its own, also part of this
+        batch.
+        """
+        self.detached[id(element)] = element
+        element._batch = self
+
+    def attach(self, element: PageElement) -> None:
+        """Note that an element has been put into a tree that's part
+        of this batch, so it's no longer a tree of its own.
+        """
+        if self.detached.pop(id(element), None) is not None:
+            self._forget(element)
+
+    @classmethod
+    def _forget(cls, element: PageElement) -> None:
+        # Go back to the class's default value of None.
+        try:
+            del element._batch
+        except AttributeError:
+            pass
+
+    def flush(self) -> None:
+        """Repair the `PageElement.next_element` and
+        `PageElement.previous_element` links in every part of the tree
+        that changed, and let the document know it has changed.
+
+        This takes time proportional to the size of the subtrees that
+        changed, no matter how many times they changed.
+        """
+        if not self.changed and not self.detached:
+            return
+        changed = list(self.changed.values())
+        detached = []
+        for element in self.detached.values():
+            self._forget(element)
+            if element.parent is None:
+                detached.append(element)
+        self.changed = {}
+        self.detached = {}
+
+        # Relinking a tag takes care of everything beneath it, so only
+        # the outermost changed tags need to be relinked.
+        ids: Set[int] = set(id(tag) for tag in changed)
+        for tag in changed:
+            parent = tag.parent
+            while parent is not None and id(parent) not in ids:
+                parent = parent.parent
+            if parent is None:
+                self.relink(tag)
+
+        # An element that's still out of the tree is the start and end
+        # of its own next_element chain.
+        for element in detached:
+            element.previous_element = None
+            last = element._last_descendant(is_initialized=False)
+            if last is not None:
+                last.next_element = None
+
+        for tag in changed:
+            tag._tree_changed()
+
+    @classmethod
+    def elements(cls, top: PageElement) -> Iterator[PageElement]:
+        """Yield ``top`` and everything beneath it, in document order,
+        without relying on the `PageElement.next_element` chain.
+        """
+        stack: List[PageElement] = [top]
+        while stack:
+            element = stack.pop()
+            yield element
+            if isinstance(element, Tag) and element.contents:
+                stack.extend(reversed(element.contents))
+
+    @classmethod
+    def relink(cls, top: Tag) -> None:
+        """Rebuild the `PageElement.next_element` and
+        `PageElement.previous_element` links for everything beneath
+        ``top``, and connect the last of them to whatever follows
+        ``top`` in the document.
+        """
+        previous: PageElement = top
+        stack: List[PageElement] = list(reversed(top.contents))
+        while stack:
+            element = stack.pop()
+            previous.next_element = element
+            element.previous_element = previous
+            previous = element
+            if isinstance(element, Tag) and element.contents:
+                stack.extend(reversed(element.contents))
+
+        following: Optional[PageElement] = None
+        ancestor: Optional[Tag] = top
+        while ancestor is not None:
+            if ancestor.next_sibling is not None:
+                following = ancestor.next_sibling
+                break
+            ancestor = ancestor.parent
+        previous.next_element = following
+        if following is not None:
+            following.previous_element = previous
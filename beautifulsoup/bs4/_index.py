@@ -0,0 +1,176 @@
+"""An index of the tags in a parse tree, by name, ID and CSS class.
+
+A `BeautifulSoup` object created with ``use_index=True`` builds one of
+these the first time it's searched, and `Tag.find_all` and
+`CSS.select` use it to look at only the tags that might match, instead
+of every element beneath the starting point. Any change to the tree
+throws the index away, and it's rebuilt by the next search.
+
+This module is private; the index is an implementation detail, and
+may change or go away without warning.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+import re
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from bs4.element import Tag
+
+if TYPE_CHECKING:
+    from bs4._typing import _StrainableAttributes
+    from bs4.element import _FindMethodName
+
+# An index key is the kind of key ("name", "id" or "class") and a string.
+_Key = Tuple[str, str]
+
+# The CSS selectors that can be answered from the index: an optional
+# type selector followed by any number of ID and class selectors.
+_SIMPLE_SELECTOR = re.compile(r"(?:\*|[A-Za-z_][-\w]*)?(?:[#.][-\w]+)*")
+_SIMPLE_SELECTOR_PART = re.compile(r"([#.]?)([-\w]+)")
+
+
+def _attribute_words(value: Any) -> Set[str]:
+    """All the strings someone might use to look for an attribute
+    value: the whole value, plus each of its whitespace-separated
+    words.
+    """
+    if isinstance(value, str):
+        words = value.split()
+        words.append(value)
+    elif isinstance(value, list):
+        words = [str(x) for x in value]
+        words.append(" ".join(words))
+    else:
+        words = [str(value)]
+    return set(words)
+
+
+class TagIndex(object):
+    """An index of every `Tag` beneath a `BeautifulSoup` object.
+
+    The index is deliberately generous: it may offer up tags that
+    don't match a search (tag names are compared case-insensitively,
+    for instance), so every candidate is checked against the real
+    search criteria. It must never leave out a tag that would match.
+    """
+
+    def __init__(self, root: Tag):
+        self.root = root
+
+        #: Every tag in the document, in document order.
+        self.tags: List[Tag] = []
+
+        #: Maps id() of each tag to its position in `TagIndex.tags`.
+        self.positions: Dict[int, int] = {}
+
+        #: Maps each key to the positions of the tags that have that
+        #: key, in document order.
+        self.keys: Dict[_Key, List[int]] = {}
+
+        for element in root.descendants:
+            if isinstance(element, Tag):
+                self._add(element)
+
+    def _add(self, tag: Tag) -> None:
+        position = len(self.tags)
+        self.tags.append(tag)
+        self.positions[id(tag)] = position
+        keys = {("name", tag.name.lower())}
+        if tag.prefix:
+            keys.add(("name", ("%s:%s" % (tag.prefix, tag.name)).lower()))
+        for attribute, value in tag.attrs.items():
+            attribute = attribute.lower()
+            if attribute == "id" or attribute == "class":
+                for word in _attribute_words(value):
+                    keys.add((attribute, word))
+        for key in keys:
+            self.keys.setdefault(key, []).append(position)
+
+    def _candidates(self, tag: Tag, keys: Iterable[_Key]) -> Optional[Iterator[Tag]]:
+        """Find the tags beneath ``tag`` that have all of the given keys.
+
+        :return: An iterator over a subset of ``tag.descendants``, or
+            None if the index can't help.
+        """
+        if tag is self.root:
+            start, end = 0, len(self.tags)
+        else:
+            position = self.positions.get(id(tag))
+            if position is None or self.tags[position] is not tag:
+                return None
+            last = tag._last_descendant()
+            while not isinstance(last, Tag):
+                assert last is not None
+                last = last.previous_element
+            start = position + 1
+            end = self.positions[id(last)] + 1
+
+        # Only the key with the fewest tags needs to be consulted.
+        # Everything else will be checked by the caller.
+        best: Optional[List[int]] = None
+        for key in keys:
+            positions = self.keys.get(key, [])
+            if best is None or len(positions) < len(best):
+                best = positions
+        if best is None:
+            return None
+        low = bisect_left(best, start)
+        high = bisect_left(best, end, low)
+        tags = self.tags
+        return (tags[best[i]] for i in range(low, high))
+
+    def find_all_candidates(
+        self,
+        tag: Tag,
+        name: _FindMethodName,
+        attrs: _StrainableAttributes,
+        kwargs: Dict[str, Any],
+    ) -> Optional[Iterator[Tag]]:
+        """Find the tags beneath ``tag`` that might match a call to
+        `Tag.find_all` with the given arguments.
+        """
+        keys = []
+        if isinstance(name, str):
+            keys.append(("name", name.lower()))
+        if not isinstance(attrs, dict):
+            attrs = {"class": attrs}
+        for attrdict in attrs, kwargs:
+            for attribute, value in attrdict.items():
+                if attribute == "class_" and attrdict is kwargs:
+                    attribute = "class"
+                if (attribute == "id" or attribute == "class") and isinstance(
+                    value, str
+                ):
+                    keys.append((attribute, value))
+        return self._candidates(tag, keys)
+
+    def select_candidates(self, tag: Tag, selector: str) -> Optional[Iterator[Tag]]:
+        """Find the tags beneath ``tag`` that might match a simple CSS
+        selector like "p", "#id", ".class" or "div.class".
+
+        :return: None if the selector is too complicated.
+        """
+        selector = selector.strip()
+        if not selector or not _SIMPLE_SELECTOR.fullmatch(selector):
+            return None
+        keys = []
+        for prefix, value in _SIMPLE_SELECTOR_PART.findall(selector):
+            if prefix == "#":
+                keys.append(("id", value))
+            elif prefix == ".":
+                keys.append(("class", value))
+            else:
+                keys.append(("name", value.lower()))
+        return self._candidates(tag, keys)
@@ -0,0 +1,161 @@
+"""Where each child of a wide tag is in its parent's contents.
+
+`Tag.index` used to find a child by going through `Tag.contents`
+until it came to the right object, and `PageElement.extract`,
+`PageElement.replace_with`, `PageElement.insert_before` and
+friends all call `Tag.index`. Taking every child out of a `Tag` with
+thousands of children took time proportional to the square of the
+number of children.
+
+A `Tag` with a lot of children keeps a `ChildPositions` instead. Each
+child is given a sort key when the `ChildPositions` is built, and a
+child's position is the number of children with a smaller key. When
+a child is added or removed its key is written down in a sorted list,
+so a position can be found with a couple of binary searches, and
+nothing needs to be renumbered until enough changes have piled up.
+
+`Tag.contents` is a plain list, and code that changes it directly
+won't tell the `ChildPositions` about the change. So every answer is
+checked against `Tag.contents` before it's used, and if it's wrong,
+the `ChildPositions` is rebuilt from scratch.
+
+This module is private; it's an implementation detail of `Tag.index`.
+"""
+
+from __future__ import annotations
+
+from bisect import (
+    bisect_left,
+    insort,
+)
+import math
+from typing import (
+    Dict,
+    List,
+    Optional,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from bs4.element import PageElement
+
+
+class ChildPositions(object):
+    """The positions of the children of one `Tag`."""
+
+    #: A `Tag` with fewer children than this doesn't get a
+    #: `ChildPositions`; it's faster to look through the list.
+    MIN_CHILDREN: int = 32
+
+    #: The sort key of every child, keyed by the child's id.
+    keys: Dict[int, float]
+
+    #: The number of children when the keys were handed out. Those
+    #: children got the keys 0, 1, 2 and so on.
+    size: int
+
+    #: The sorted keys of the children added since then.
+    added: List[float]
+
+    #: The sorted keys of the children removed since then.
+    removed: List[float]
+
+    #: If this is True, the keys are no longer trustworthy and will be
+    #: handed out again the next time they're needed.
+    stale: bool
+
+    def __init__(self, contents: List[PageElement]):
+        self.rebuild(contents)
+
+    def rebuild(self, contents: List[PageElement]) -> None:
+        """Hand out a new set of keys."""
+        self.keys = {id(child): i for i, child in enumerate(contents)}
+        self.size = len(contents)
+        self.added = []
+        self.removed = []
+        self.stale = False
+
+    def find(self, contents: List[PageElement], element: PageElement) -> Optional[int]:
+        """Find the position of ``element`` in ``contents``.
+
+        :return: The position, or None if ``element`` isn't in
+           ``contents``.
+        """
+        if not self.stale:
+            key = self.keys.get(id(element))
+            if key is not None:
+                position = self._rank(key)
+                if position < len(contents) and contents[position] is element:
+                    return position
+        # Either the keys were out of date, or ``element`` isn't a
+        # child at all. Make sure which.
+        self.rebuild(contents)
+        position = self.keys.get(id(element))
+        if position is None:
+            return None
+        return int(position)
+
+    def _rank(self, key: float) -> int:
+        """Count the children with keys smaller than ``key``."""
+        original = min(max(math.ceil(key), 0), self.size)
+        return (
+            original
+            + bisect_left(self.added, key)
+            - bisect_left(self.removed, key)
+        )
+
+    def inserted(self, contents: List[PageElement], position: int) -> None:
+        """Give a key to the child that was just inserted into
+        ``contents`` at ``position``.
+        """
+        if self.stale:
+            return
+        keys = self.keys
+        before = after = None
+        if position > 0:
+            before = keys.get(id(contents[position - 1]))
+            if before is None:
+                self.stale = True
+                return
+        if position + 1 < len(contents):
+            after = keys.get(id(contents[position + 1]))
+            if after is None:
+                self.stale = True
+                return
+        if before is not None and after is not None:
+            key = (before + after) / 2
+            if not before < key < after:
+                # We've run out of room between these two keys.
+                self.stale = True
+                return
+        elif before is not None:
+            key = before + 1
+        elif after is not None:
+            key = after - 1
+        else:
+            self.stale = True
+            return
+        keys[id(contents[position])] = key
+        insort(self.added, key)
+        self._changed()
+
+    def removed_child(self, element: PageElement) -> None:
+        """Take away the key of a child that was just removed."""
+        if self.stale:
+            return
+        key = self.keys.pop(id(element), None)
+        if key is None:
+            self.stale = True
+            return
+        insort(self.removed, key)
+        self._changed()
+
+    def _changed(self) -> None:
+        # Keeping the lists of changes short keeps them cheap to
+        # update. Once there have been about as many changes as there
+        # are children, it's time to hand out the keys again.
+        if len(self.added) + len(self.removed) > len(self.keys) + self.MIN_CHILDREN:
+            self.stale = True
+            self.keys = {}
+            self.added = []
+            self.removed = []
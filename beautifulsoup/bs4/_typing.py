@@ -137,8 +137,9 @@ _PageElementMatchFunction: TypeAlias = Callable[["PageElement"], bool]
 
 #: A function that takes the raw parsed ingredients of a markup tag
 #: and returns a yes-or-no answer.
-#  Not necessary at the moment.
-# _AllowTagCreationFunction:TypeAlias = Callable[[Optional[str], str, Optional[_RawAttributeValues]], bool]
+_AllowTagCreationFunction: TypeAlias = Callable[
+    [Optional[str], str, Optional[_RawAttributeValues]], bool
+]
 
 #: A function that takes the raw parsed ingredients of a markup string node
 #: and returns a yes-or-no answer.
@@ -30,6 +30,7 @@ from bs4.element import (
     RubyTextString,
     Stylesheet,
     Script,
+    TagProfile,
     TemplateString,
     nonwhitespace_re,
 )
@@ -79,6 +80,7 @@ __all__ = [
     "TreeBuilder",
     "HTMLTreeBuilder",
     "DetectsXMLParsedAsHTML",
+    "IncrementalParser",
 
     "ParserRejectedMarkup", # backwards compatibility only as of 4.13.0
 ]
@@ -239,6 +241,7 @@ class TreeBuilder(object):
         self.string_containers = string_containers
         self.attribute_dict_class = attribute_dict_class
         self.attribute_value_list_class = attribute_value_list_class
+        self._tag_profiles = {}
 
     NAME: str = "[Unknown tree builder]"
     ALTERNATE_NAMES: Iterable[str] = []
@@ -256,6 +259,7 @@ class TreeBuilder(object):
     preserve_whitespace_tags: Set[str]  #: :meta private:
     string_containers: Dict[str, Type[NavigableString]]  #: :meta private:
     tracks_line_numbers: bool  #: :meta private:
+    _tag_profiles: Dict[str, TagProfile]
 
     #: A value for these tag/attribute combinations is a space- or
     #: comma-separated list of CDATA, rather than a single CDATA.
@@ -320,6 +324,25 @@ class TreeBuilder(object):
         """Run incoming markup through some parsing process."""
         raise NotImplementedError()
 
+    def incremental_parser(self, encoding: Optional[_Encoding]) -> IncrementalParser:
+        """Prepare to parse a document that will arrive as a series of
+        chunks, rather than all at once.
+
+        This is used by `BeautifulSoup.feed`. `TreeBuilder.initialize_soup`
+        will already have been called.
+
+        :param encoding: The encoding of any bytestrings that will be
+            passed into the parser, or None if the document is
+            arriving as Unicode.
+        :return: An `IncrementalParser` that will build the document
+            into ``self.soup``.
+        :raise NotImplementedError: If this TreeBuilder can't parse
+            a document incrementally.
+        """
+        raise NotImplementedError(
+            f"The {self.NAME} tree builder can't parse a document incrementally."
+        )
+
     def prepare_markup(
         self,
         markup: _RawMarkup,
@@ -373,6 +396,42 @@ class TreeBuilder(object):
         """
         return fragment
 
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # A TreeBuilder pickled by an older version of Beautiful Soup
+        # doesn't have a place to store its TagProfiles.
+        state.setdefault("_tag_profiles", {})
+        self.__dict__.update(state)
+
+    def tag_profile(self, tag_name: str) -> TagProfile:
+        """Find the `TagProfile` shared by every `Tag` with the given
+        name that's created by this `TreeBuilder`.
+
+        The profile is calculated the first time a tag name is seen,
+        and reused after that.
+
+        :param tag_name: The name of a markup tag.
+        """
+        profile = self._tag_profiles.get(tag_name)
+        if profile is None:
+            profile = self._tag_profiles[tag_name] = TagProfile.for_builder(
+                self, tag_name
+            )
+        return profile
+
+    def may_set_up_substitutions(self, tag_name: str) -> bool:
+        """Might `TreeBuilder.set_up_substitutions` need to do anything
+        for a tag with this name?
+
+        If this returns False, `TreeBuilder.set_up_substitutions` won't
+        be called for tags with this name. By default, this is only
+        true if a subclass has overridden
+        `TreeBuilder.set_up_substitutions`.
+
+        :param tag_name: The name of a markup tag.
+        :meta private:
+        """
+        return type(self).set_up_substitutions is not TreeBuilder.set_up_substitutions
+
     def set_up_substitutions(self, tag: Tag) -> bool:
         """Set up any substitutions that will need to be performed on
         a `Tag` when it's output as a string.
@@ -442,6 +501,29 @@ class TreeBuilder(object):
         return modified_attrs
 
 
+class IncrementalParser(object):
+    """An object that parses a document as it arrives, chunk by
+    chunk. `TreeBuilder.incremental_parser` creates these.
+    """
+
+    def feed(self, data: _RawMarkup) -> None:
+        """Parse another chunk of the document.
+
+        :param data: A string, or a bytestring in the encoding that
+            was passed into `TreeBuilder.incremental_parser`.
+        :raise ParserRejectedMarkup: If the parser can't handle the markup.
+        """
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Finish parsing the document, handling any data that has
+        been held back waiting for more input.
+
+        :raise ParserRejectedMarkup: If the parser can't handle the markup.
+        """
+        raise NotImplementedError()
+
+
 class SAXTreeBuilder(TreeBuilder):
     """A Beautiful Soup treebuilder that listens for SAX events.
 
@@ -639,6 +721,16 @@ class HTMLTreeBuilder(TreeBuilder):
     #: preserved rather than being collapsed.
     DEFAULT_PRESERVE_WHITESPACE_TAGS: set[str] = set(["pre", "textarea"])
 
+    def may_set_up_substitutions(self, tag_name: str) -> bool:
+        """Only <meta> tags need substitutions, unless a subclass has
+        overridden `HTMLTreeBuilder.set_up_substitutions`.
+
+        :meta private:
+        """
+        if type(self).set_up_substitutions is not HTMLTreeBuilder.set_up_substitutions:
+            return True
+        return tag_name == "meta"
+
     def set_up_substitutions(self, tag: Tag) -> bool:
         """Replace the declared encoding in a <meta> tag with a placeholder,
         to be substituted when the tag is output to a string.
@@ -9,6 +9,7 @@ __all__ = [
     "HTMLParserTreeBuilder",
 ]
 
+import codecs
 from html.parser import HTMLParser
 
 from typing import (
@@ -39,6 +40,7 @@ from bs4.builder import (
     DetectsXMLParsedAsHTML,
     HTML,
     HTMLTreeBuilder,
+    IncrementalParser,
     STRICT,
 )
 
@@ -327,6 +329,63 @@ class BeautifulSoupHTMLParser(HTMLParser, DetectsXMLParsedAsHTML):
         self.soup.endData(ProcessingInstruction)
 
 
+class HTMLParserIncrementalParser(IncrementalParser):
+    """Feeds a document into a `BeautifulSoupHTMLParser` as it arrives.
+
+    :py:class:`html.parser.HTMLParser` only handles Unicode, so
+    bytestrings are decoded here, with an incremental decoder that
+    copes with multi-byte characters split across chunks.
+    """
+
+    def __init__(self, builder: HTMLParserTreeBuilder, encoding: Optional[_Encoding]):
+        assert builder.soup is not None
+        args, kwargs = builder.parser_args
+        self.soup = builder.soup
+        self.parser = BeautifulSoupHTMLParser(builder.soup, *args, **kwargs)
+        self.decoder: Optional[codecs.IncrementalDecoder] = None
+        if encoding is not None:
+            self.decoder = codecs.getincrementaldecoder(encoding)()
+
+    def _decode(self, data: bytes, final: bool = False) -> str:
+        if self.decoder is None:
+            raise TypeError(
+                "Can't parse a bytestring without knowing its encoding."
+            )
+        try:
+            return self.decoder.decode(data, final)
+        except UnicodeDecodeError:
+            # The encoding worked for the start of the document, but
+            # it's too late to pick another one. Do what
+            # UnicodeDammit does as a last resort, and replace the
+            # characters that can't be decoded.
+            self.decoder.errors = "replace"
+            self.soup.contains_replacement_characters = True
+            return self.decoder.decode(data, final)
+
+    def _parse(self, markup: str) -> None:
+        try:
+            self.parser.feed(markup)
+        except AssertionError as e:
+            # See HTMLParserTreeBuilder.feed.
+            raise ParserRejectedMarkup(e)
+
+    def feed(self, data: _RawMarkup) -> None:
+        """See `IncrementalParser`."""
+        if isinstance(data, bytes):
+            data = self._decode(data)
+        self._parse(data)
+
+    def close(self) -> None:
+        """See `IncrementalParser`."""
+        if self.decoder is not None:
+            self._parse(self._decode(b"", final=True))
+        try:
+            self.parser.close()
+        except AssertionError as e:
+            raise ParserRejectedMarkup(e)
+        self.parser.already_closed_empty_element = []
+
+
 class HTMLParserTreeBuilder(HTMLTreeBuilder):
     """A Beautiful soup `bs4.builder.TreeBuilder` that uses the
     :py:class:`html.parser.HTMLParser` parser, found in the Python
@@ -472,3 +531,9 @@ class HTMLParserTreeBuilder(HTMLTreeBuilder):
             # when there's an error in the doctype declaration.
             raise ParserRejectedMarkup(e)
         parser.already_closed_empty_element = []
+
+    def incremental_parser(
+        self, encoding: Optional[_Encoding]
+    ) -> HTMLParserIncrementalParser:
+        """See `TreeBuilder.incremental_parser`."""
+        return HTMLParserIncrementalParser(self, encoding)
@@ -41,6 +41,7 @@ from bs4.builder import (
     FAST,
     HTML,
     HTMLTreeBuilder,
+    IncrementalParser,
     PERMISSIVE,
     TreeBuilder,
     XML,
@@ -74,6 +75,43 @@ _ParserOrParserClass: TypeAlias = Union[
 ]
 
 
+class LXMLIncrementalParser(IncrementalParser):
+    """Feeds a document into one of lxml's parsers as it arrives.
+
+    lxml's parsers accept data a chunk at a time, and know how to
+    decode bytestrings themselves, so this is a thin wrapper that
+    converts lxml's errors into `ParserRejectedMarkup`.
+    """
+
+    def __init__(self, parser: _LXMLParser):
+        self.parser = parser
+        self.fed = False
+
+    def feed(self, data: _RawMarkup) -> None:
+        """See `IncrementalParser`."""
+        if not self.fed and isinstance(data, str):
+            # See LXMLTreeBuilderForXML.prepare_markup for why the
+            # byte-order mark has to go.
+            if len(data) > 0 and data[0] == "\N{BYTE ORDER MARK}":
+                data = data[1:]
+        try:
+            self.parser.feed(data)
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+        self.fed = True
+
+    def close(self) -> None:
+        """See `IncrementalParser`."""
+        if not self.fed:
+            # Call feed() at least once, even if the markup is empty,
+            # or the parser won't be initialized.
+            self.feed(b"")
+        try:
+            self.parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            raise ParserRejectedMarkup(e)
+
+
 class LXMLTreeBuilderForXML(TreeBuilder):
     DEFAULT_PARSER_CLASS: Type[etree.XMLParser] = etree.XMLParser
 
@@ -306,6 +344,15 @@ class LXMLTreeBuilderForXML(TreeBuilder):
         except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
             raise ParserRejectedMarkup(e)
 
+    def incremental_parser(self, encoding: Optional[_Encoding]) -> LXMLIncrementalParser:
+        """See `TreeBuilder.incremental_parser`."""
+        if self.is_xml:
+            self.processing_instruction_class = XMLProcessingInstruction
+        else:
+            self.processing_instruction_class = ProcessingInstruction
+        self.parser = self.parser_for(encoding)
+        return LXMLIncrementalParser(self.parser)
+
     def close(self) -> None:
         self.nsmaps = [self.DEFAULT_NSMAPS_INVERTED]
 
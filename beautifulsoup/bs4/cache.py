@@ -0,0 +1,456 @@
+"""A cache for parsed documents.
+
+A `ParseCache` remembers the documents it has parsed, so that parsing
+the same markup again (with the same parser and the same options)
+doesn't tokenize anything. Parse trees are stored in the compact
+format created by `Tag.dumps`, and every time a document is found in
+the cache, you get a brand new copy of its parse tree, which you can
+modify without affecting anything else.
+
+The cache keeps the most recently used trees in memory, up to a total
+size, and can also keep every tree it has seen in a directory on disk,
+so that the trees can be shared between processes, or between runs of
+the same program.
+
+This module also contains `QueryCache`, which remembers the results of
+searches within a single parse tree.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+import threading
+from typing import (
+    Any,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+    TYPE_CHECKING,
+)
+
+from bs4.builder import builder_registry, TreeBuilder
+from bs4.element import ResultSet
+from bs4.exceptions import FeatureNotFound
+from bs4.filter import ElementFilter
+from bs4.serialize import FORMAT_VERSION, loads
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
+    from bs4._typing import _IncomingMarkup
+    from bs4.filter import SoupStrainer
+
+
+class CacheStats(NamedTuple):
+    """A snapshot of a `ParseCache`'s counters."""
+
+    #: The number of documents found in memory.
+    hits: int
+
+    #: The number of documents found on disk, but not in memory.
+    disk_hits: int
+
+    #: The number of documents that had to be parsed.
+    misses: int
+
+    #: The number of trees dropped from memory to make room for
+    #: others.
+    evictions: int
+
+    #: The number of trees currently held in memory.
+    entries: int
+
+    #: The total size, in bytes, of the trees held in memory.
+    size: int
+
+
+class ParseCache(object):
+    """Parses documents, keeping the results around in case the same
+    document is parsed again.
+
+    Use `ParseCache.parse` instead of the `BeautifulSoup` constructor::
+
+        cache = ParseCache(max_size=256 * 1024 * 1024, directory="soup-cache")
+        soup = cache.parse(markup, "lxml")
+
+    A document is identified by a hash of its markup, the tree builder
+    that parses it, and all of the other arguments passed into
+    `ParseCache.parse`, so asking for a different parser or a
+    different `SoupStrainer` will parse the document again.
+    Arguments are compared by their ``repr()``; if you pass in a
+    function, such as a `SoupStrainer` rule, the document will only be
+    found again if you pass in the same function object.
+
+    A `ParseCache` can be shared between threads.
+    """
+
+    #: The suffix of the files in the on-disk cache.
+    SUFFIX: str = ".bs4tree"
+
+    def __init__(
+        self, max_size: int = 64 * 1024 * 1024, directory: Optional[str] = None
+    ):
+        """Constructor.
+
+        :param max_size: The most memory, in bytes, to use for parse
+            trees. The size of a tree is the size of its serialized
+            form, which is usually a fraction of the size of the tree
+            itself. When the cache gets too big, the least recently
+            used trees are dropped.
+        :param directory: If this is set, every tree is also written to
+            a file in this directory, and trees that aren't in memory
+            are looked for there. Nothing is ever removed from this
+            directory; use `ParseCache.clear` to empty it.
+        """
+        self.max_size = max_size
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """The cache's counters, as a `CacheStats`."""
+        with self._lock:
+            return CacheStats(
+                self.hits,
+                self.disk_hits,
+                self.misses,
+                self.evictions,
+                len(self._entries),
+                self._size,
+            )
+
+    def parse(
+        self,
+        markup: _IncomingMarkup = "",
+        features: Optional[Union[str, Sequence[str]]] = None,
+        parse_only: Optional[SoupStrainer] = None,
+        **kwargs: Any,
+    ) -> BeautifulSoup:
+        """Parse a document, or get a copy of its parse tree from the
+        cache.
+
+        The arguments are the same as for the `BeautifulSoup`
+        constructor, except that a tree builder has to be chosen with
+        ``features`` rather than passed in as ``builder``.
+
+        :return: A `BeautifulSoup` object that belongs to the caller.
+        :raise FeatureNotFound: If no tree builder has the given features.
+        """
+        # Import here to avoid circular import
+        from bs4 import BeautifulSoup
+
+        if hasattr(markup, "read"):
+            markup = markup.read()
+        builder_class = self._builder_class(features)
+        key = self.key(markup, builder_class, parse_only, **kwargs)
+
+        data = self._get(key)
+        if data is not None:
+            return loads(data)
+
+        soup = BeautifulSoup(
+            markup, builder=builder_class, parse_only=parse_only, **kwargs
+        )
+        data = soup.dumps()
+        with self._lock:
+            self.misses += 1
+            self._add(key, data)
+        if self.directory is not None:
+            self._write(key, data)
+        return soup
+
+    def key(
+        self,
+        markup: Union[str, bytes],
+        builder_class: Type[TreeBuilder],
+        parse_only: Optional[SoupStrainer] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Calculate the key under which a parse tree is stored.
+
+        :return: A string of hex digits.
+        """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(b"%d\0" % FORMAT_VERSION)
+        if isinstance(markup, str):
+            h.update(b"s" + markup.encode("utf8", "surrogatepass"))
+        else:
+            h.update(b"b" + bytes(markup))
+        options = [
+            "%s.%s" % (builder_class.__module__, builder_class.__qualname__),
+            repr(parse_only),
+        ] + ["%s=%r" % (k, v) for k, v in sorted(kwargs.items())]
+        for option in options:
+            h.update(b"\0" + option.encode("utf8", "backslashreplace"))
+        return h.hexdigest()
+
+    def clear(self) -> None:
+        """Remove every tree from the cache, including the ones on disk.
+
+        The counters are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.directory is None:
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(self.SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def _builder_class(
+        self, features: Optional[Union[str, Sequence[str]]]
+    ) -> Type[TreeBuilder]:
+        # Import here to avoid circular import
+        from bs4 import BeautifulSoup
+
+        if isinstance(features, str):
+            features = [features]
+        if not features:
+            features = BeautifulSoup.DEFAULT_BUILDER_FEATURES
+        builder_class = builder_registry.lookup(*features)
+        if builder_class is None:
+            raise FeatureNotFound(
+                "Couldn't find a tree builder with the features you "
+                "requested: %s. Do you need to install a parser library?"
+                % ",".join(features)
+            )
+        return builder_class
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        if self.directory is None:
+            return None
+        data = self._read(key)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._add(key, data)
+        return data
+
+    def _add(self, key: str, data: bytes) -> None:
+        # The caller must hold the lock.
+        if len(data) > self.max_size:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        assert self.directory is not None
+        # Write to a temporary file and rename it, so another process
+        # never sees half a tree.
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+class QueryCacheStats(NamedTuple):
+    """A snapshot of a `QueryCache`'s counters."""
+
+    #: The number of searches answered from the cache.
+    hits: int
+
+    #: The number of searches that had to look at the tree.
+    misses: int
+
+    #: The number of results dropped to make room for others.
+    evictions: int
+
+    #: The number of results currently in the cache.
+    entries: int
+
+
+class _Uncacheable(Exception):
+    """A search argument can't be part of a cache key."""
+
+
+class _Identity(object):
+    """Wraps an object so that it's compared by identity.
+
+    An `ElementFilter` can't be hashed, but the same object passed
+    into the same search will find the same things.
+    """
+
+    __slots__ = ["obj"]
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __hash__(self) -> int:
+        return id(self.obj)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Identity) and other.obj is self.obj
+
+
+class QueryCache(object):
+    """Remembers the results of `Tag.find_all`, `Tag.find`,
+    `Tag.select` and `Tag.select_one` calls made on a parse tree, so
+    that running the same search on the same part of the tree again
+    doesn't look at any elements.
+
+    You don't usually create one of these yourself; pass
+    ``query_cache_size`` into the `BeautifulSoup` constructor instead.
+    Every `BeautifulSoup` object needs its own `QueryCache`.
+
+    Every search result was calculated for a particular version of
+    the tree (see `BeautifulSoup.tree_version`). When the tree is
+    modified, everything in the cache is thrown away the next time
+    it's used.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """Constructor.
+
+        :param max_entries: The most search results to keep. When the
+            cache is full, the least recently used result is dropped.
+        """
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: OrderedDict[Hashable, ResultSet[Any]] = OrderedDict()
+        # A frozen document may be searched by several threads at once.
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> QueryCacheStats:
+        """The cache's counters, as a `QueryCacheStats`."""
+        with self._lock:
+            return QueryCacheStats(
+                self.hits, self.misses, self.evictions, len(self._entries)
+            )
+
+    def key(self, tag: Tag, method: str, *args: Any) -> Optional[Hashable]:
+        """Calculate the key for a search.
+
+        :param tag: The `Tag` the search starts from.
+        :param method: The name of the search method.
+        :param args: The arguments to the search method.
+        :return: A hashable object, or None if one of the arguments
+            can't be used in a key (because it's a mutable object the
+            cache doesn't know about), in which case the search
+            shouldn't be cached.
+        """
+        try:
+            return (id(tag), method, self._freeze(args))
+        except (_Uncacheable, RecursionError):
+            # RecursionError means a list that contains itself, which
+            # find_all() is able to handle.
+            return None
+
+    @classmethod
+    def _freeze(cls, value: Any) -> Hashable:
+        """Turn a search argument into something hashable that will
+        compare equal to the same argument passed in next time.
+        """
+        if isinstance(value, (list, tuple)):
+            return (type(value), tuple(cls._freeze(x) for x in value))
+        if isinstance(value, dict):
+            return (
+                dict,
+                tuple(sorted((str(k), cls._freeze(v)) for k, v in value.items())),
+            )
+        if isinstance(value, (set, frozenset)):
+            return frozenset(cls._freeze(x) for x in value)
+        if isinstance(value, ElementFilter):
+            return _Identity(value)
+        if isinstance(value, bool):
+            # Don't confuse True with 1.
+            return (bool, value)
+        try:
+            hash(value)
+        except TypeError:
+            raise _Uncacheable()
+        return value
+
+    def validate(self, version: int) -> None:
+        """Make sure the cache is up to date with a version of its tree.
+        If the tree has changed since the results were calculated,
+        they're all thrown away.
+        """
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+
+    def get(self, key: Hashable) -> Optional[ResultSet[Any]]:
+        """Look up the results of a search.
+
+        :return: A new `ResultSet` with the results, or None if the
+            search isn't in the cache.
+        """
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return ResultSet(results.source, results)
+
+    def add(self, key: Hashable, results: ResultSet[Any]) -> None:
+        """Store the results of a search."""
+        if self.max_entries <= 0:
+            return
+        results = ResultSet(results.source, results)
+        with self._lock:
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every search result from the cache.
+
+        The counters are not reset.
+        """
+        with self._lock:
+            self._entries.clear()
@@ -20,6 +20,7 @@ from typing import (
     cast,
     Iterable,
     Iterator,
+    List,
     Optional,
     TYPE_CHECKING,
 )
@@ -101,6 +102,38 @@ class CSS(object):
 
         return ResultSet(None, results)
 
+    def _select_from_index(
+        self,
+        select: str,
+        namespaces: Optional[_NamespaceMapping],
+        limit: int,
+        flags: int,
+        **kwargs: Any,
+    ) -> Optional[List[Tag]]:
+        """If the document has a tag index (see
+        `BeautifulSoup.use_index`) and the selector is simple enough,
+        use the index to find the matching tags.
+
+        :return: A list of matching tags, or None if the index can't
+            be used.
+        """
+        if not isinstance(select, str):
+            return None
+        index = self.tag._tree_index()
+        if index is None:
+            return None
+        candidates = index.select_candidates(self.tag, select)
+        if candidates is None:
+            return None
+        compiled = self.compile(select, namespaces, flags, **kwargs)
+        results = []
+        for candidate in candidates:
+            if compiled.match(candidate):
+                results.append(candidate)
+                if len(results) == limit:
+                    break
+        return results
+
     def compile(
         self,
         select: str,
@@ -154,9 +187,26 @@ class CSS(object):
         :param kwargs: Keyword arguments to be passed into Soup Sieve's
            `soupsieve.select_one() <https://facelessuser.github.io/soupsieve/api/#soupsieveselect_one>`_ method.
         """
-        return self.api.select_one(
-            select, self.tag, self._ns(namespaces, select), flags, **kwargs
-        )
+        cache = self.tag._tree_query_cache()
+        key = None
+        if cache is not None:
+            key = cache.key(self.tag, "select_one", select, namespaces, flags, kwargs)
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached[0] if cached else None
+
+        results = self._select_from_index(select, namespaces, 1, flags, **kwargs)
+        if results is not None:
+            result = results[0] if results else None
+        else:
+            result = self.api.select_one(
+                select, self.tag, self._ns(namespaces, select), flags, **kwargs
+            )
+        if key is not None:
+            assert cache is not None
+            cache.add(key, self._rs([result] if result is not None else []))
+        return result
 
     def select(
         self,
@@ -189,11 +239,27 @@ class CSS(object):
         if limit is None:
             limit = 0
 
-        return self._rs(
-            self.api.select(
+        cache = self.tag._tree_query_cache()
+        key = None
+        if cache is not None:
+            key = cache.key(
+                self.tag, "select", select, namespaces, limit, flags, kwargs
+            )
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+
+        results = self._select_from_index(select, namespaces, limit, flags, **kwargs)
+        if results is None:
+            results = self.api.select(
                 select, self.tag, self._ns(namespaces, select), limit, flags, **kwargs
             )
-        )
+        result_set = self._rs(results)
+        if key is not None:
+            assert cache is not None
+            cache.add(key, result_set)
+        return result_set
 
     def iselect(
         self,
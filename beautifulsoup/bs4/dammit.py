@@ -125,6 +125,29 @@ class EntitySubstitution(object):
     #: :meta hide-value:
     CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE: Pattern[str]
 
+    #: A `str.translate` table that does the same job as
+    #: CHARACTER_TO_HTML_ENTITY_RE, for strings that don't contain
+    #: any of the multi-character sequences that have named entities.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_TABLE: Dict[int, str]
+
+    #: A `str.translate` table that does the same job as
+    #: CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE, for strings that
+    #: don't contain any of the multi-character sequences that have
+    #: named entities.
+    #:
+    #: :meta hide-value:
+    CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE: Dict[int, str]
+
+    #: A regular expression that matches the second character of any
+    #: multi-character sequence that has a named entity. A string that
+    #: doesn't match can be run through one of the translate tables
+    #: instead of a regular expression.
+    #:
+    #: :meta hide-value:
+    HTML_ENTITY_SEQUENCE_RE: Pattern[str]
+
     @classmethod
     def _populate_class_variables(cls) -> None:
         """Initialize variables used by this class to manage the plethora of
@@ -148,6 +171,12 @@ class EntitySubstitution(object):
         also matches unescaped ampersands. This is used by the 'html'
         formatted to provide backwards-compatibility, even though the HTML5
         spec allows most ampersands to go unescaped.
+
+        CHARACTER_TO_HTML_ENTITY_TABLE,
+        CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE: `str.translate`
+        tables equivalent to the two regular expressions, for strings
+        that HTML_ENTITY_SEQUENCE_RE says contain no multi-character
+        sequences.
         """
         unicode_to_name = {}
         name_to_unicode = {}
@@ -257,6 +286,25 @@ class EntitySubstitution(object):
             re_definition_with_ampersand
         )
 
+        # Unless a string contains one of the multi-character
+        # sequences, the regular expressions will only ever match one
+        # character at a time, and str.translate can do the same work
+        # much more quickly.
+        table = {}
+        for short in short_entities:
+            table[ord(short)] = "&%s;" % unicode_to_name[short]
+        cls.CHARACTER_TO_HTML_ENTITY_TABLE = table
+        table_with_ampersand = dict(table)
+        table_with_ampersand[ord("&")] = "&amp;"
+        cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE = table_with_ampersand
+        second_characters = set()
+        for long_entities in long_entities_by_first_character.values():
+            for long_entity in long_entities:
+                second_characters.update(long_entity[1:])
+        cls.HTML_ENTITY_SEQUENCE_RE = re.compile(
+            "[%s]" % "".join(re.escape(x) for x in sorted(second_characters))
+        )
+
     #: A map of Unicode strings to the corresponding named XML entities.
     #:
     #: :meta hide-value:
@@ -312,6 +360,33 @@ class EntitySubstitution(object):
             return "&%s;" % possible_entity
         return "&amp;%s;" % possible_entity
 
+    @classmethod
+    def _substitute_html_characters(cls, s: str, ampersands: bool) -> str:
+        """Convert the characters in a string that have named HTML
+        entities into those entities.
+
+        This gives the same result as running
+        CHARACTER_TO_HTML_ENTITY_RE (or, if ``ampersands`` is True,
+        CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE) over the string,
+        but avoids the regular expression whenever possible.
+        """
+        if s.isascii():
+            # The only ASCII characters that get turned into entities
+            # are the angle brackets and, possibly, the ampersand.
+            if ampersands and "&" in s:
+                s = s.replace("&", "&amp;")
+            return s.replace("<", "&lt;").replace(">", "&gt;")
+        if cls.HTML_ENTITY_SEQUENCE_RE.search(s) is None:
+            # Every entity is for a single character.
+            if ampersands:
+                return s.translate(cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_TABLE)
+            return s.translate(cls.CHARACTER_TO_HTML_ENTITY_TABLE)
+        if ampersands:
+            regex = cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE
+        else:
+            regex = cls.CHARACTER_TO_HTML_ENTITY_RE
+        return regex.sub(cls._substitute_html_entity, s)
+
     @classmethod
     def quoted_attribute_value(cls, value: str) -> str:
         """Make a value into a quoted XML attribute, possibly escaping it.
@@ -370,8 +445,11 @@ class EntitySubstitution(object):
         :return: A version of ``value`` with special characters replaced
          with named entities.
         """
-        # Escape angle brackets and ampersands.
-        value = cls.AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        # Escape angle brackets and ampersands. This is the same as
+        # running AMPERSAND_OR_BRACKET over the string, but a lot
+        # faster, especially for the majority of strings, which
+        # contain none of these characters.
+        value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -393,7 +471,10 @@ class EntitySubstitution(object):
         """
         # Escape angle brackets, and ampersands that aren't part of
         # entities.
-        value = cls.BARE_AMPERSAND_OR_BRACKET.sub(cls._substitute_xml_entity, value)
+        if "&" in value or "<" in value or ">" in value:
+            value = cls.BARE_AMPERSAND_OR_BRACKET.sub(
+                cls._substitute_xml_entity, value
+            )
 
         if make_quoted_attribute:
             value = cls.quoted_attribute_value(value)
@@ -416,9 +497,7 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # Convert any appropriate characters to HTML entities.
-        return cls.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE.sub(
-            cls._substitute_html_entity, s
-        )
+        return cls._substitute_html_characters(s, True)
 
     @classmethod
     def substitute_html5(cls, s: str) -> str:
@@ -447,12 +526,11 @@ class EntitySubstitution(object):
            HTML entities.
         """
         # First, escape any HTML entities found in the markup.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_entity_name, s)
 
         # Next, convert any appropriate characters to unescaped HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s, False)
 
     @classmethod
     def substitute_html5_raw(cls, s: str) -> str:
@@ -470,13 +548,12 @@ class EntitySubstitution(object):
         # First, escape the ampersand for anything that looks like an
         # entity but isn't in the list of recognized entities. All other
         # ampersands can be left alone.
-        s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
+        if "&" in s:
+            s = cls.ANY_ENTITY_RE.sub(cls._escape_unrecognized_entity_name, s)
 
         # Then, convert a range of Unicode characters to unescaped
         # HTML entities.
-        s = cls.CHARACTER_TO_HTML_ENTITY_RE.sub(cls._substitute_html_entity, s)
-
-        return s
+        return cls._substitute_html_characters(s, False)
 
 
 EntitySubstitution._populate_class_variables()
@@ -9,13 +9,17 @@ from html.parser import HTMLParser
 import bs4
 from bs4 import BeautifulSoup, __version__
 from bs4.builder import builder_registry
+from bs4.element import Tag
 from typing import (
     Any,
+    Callable,
+    Dict,
     IO,
     List,
     Optional,
     Tuple,
     TYPE_CHECKING,
+    cast,
 )
 
 if TYPE_CHECKING:
@@ -248,6 +252,310 @@ def benchmark_parsers(num_elements: int = 100000) -> None:
     print(("Raw html5lib parsed the markup in %.2fs." % (b - a)))
 
 
+def benchmark_memory(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Measure how much memory a parse tree needs for each of its nodes.
+
+    The tree is built under `tracemalloc`, so the figure includes
+    every object the tree keeps alive: `Tag` and `NavigableString`
+    objects, attribute dictionaries and `Tag.contents` lists.
+    """
+    import gc
+    import tracemalloc
+
+    print(("Memory benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    soup = BeautifulSoup(data, parser)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    nodes = sum(1 for _ in soup.descendants) + 1
+    tags = len(soup.find_all(True)) + 1
+    print(
+        (
+            "BS4+%s built %d nodes (%d tags, %d strings) using %d bytes: %.1f bytes per node."
+            % (parser, nodes, tags, nodes - tags, used, used / nodes)
+        )
+    )
+
+
+def benchmark_find_all(num_elements: int = 100000, parser: str = "html.parser") -> None:
+    """Compare checking every element of a document against a
+    compiled `SoupStrainer` (see `SoupStrainer.compile`) with calling
+    `SoupStrainer.match` on every element.
+    """
+    import re
+    from bs4.filter import SoupStrainer
+
+    print(("find_all() benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    elements = list(soup.descendants)
+
+    strainers = [
+        ('"p"', SoupStrainer("p")),
+        ('["p", "b", "i"]', SoupStrainer(["p", "b", "i"])),
+        ('re.compile("^[bi]$")', SoupStrainer(re.compile("^[bi]$"))),
+        ('"span", class_="a"', SoupStrainer("span", class_="a")),
+        (
+            '["div", "span"], id=True, class_=["a", "b"]',
+            SoupStrainer(["div", "span"], id=True, class_=["a", "b"]),
+        ),
+        ('string=re.compile("a")', SoupStrainer(string=re.compile("a"))),
+    ]
+    for description, strainer in strainers:
+        a = time.time()
+        expect = [e for e in elements if strainer.match(e)]
+        b = time.time()
+        match = strainer.compile()
+        got = [e for e in elements if match(e)]
+        c = time.time()
+        assert got == expect
+        print(
+            (
+                "SoupStrainer(%s): %d matches. match(): %.3fs, compiled: %.3fs."
+                % (description, len(got), b - a, c - b)
+            )
+        )
+
+
+def benchmark_serialization(
+    num_elements: int = 100000, parser: str = "html.parser"
+) -> None:
+    """Time the rendering of a document with each of the built-in
+    formatters, and compare the entity substitution done by each one
+    with the equivalent regular expression.
+    """
+    from bs4.dammit import EntitySubstitution
+
+    print(("Serialization benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+
+    for formatter in ("minimal", "html", "html5", "minify", None):
+        a = time.time()
+        soup.decode(formatter=formatter)
+        b = time.time()
+        print(("formatter=%r: %.3fs." % (formatter, b - a)))
+
+    # Most strings are plain ASCII. Try some that aren't, as well.
+    strings = [str(x) for x in soup.find_all(string=True)]
+    strings += [x + " caf\N{LATIN SMALL LETTER E WITH ACUTE} & <b>" for x in strings]
+    substitutions = [
+        (
+            "substitute_xml",
+            EntitySubstitution.AMPERSAND_OR_BRACKET,
+            EntitySubstitution._substitute_xml_entity,
+        ),
+        (
+            "substitute_html",
+            EntitySubstitution.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE,
+            EntitySubstitution._substitute_html_entity,
+        ),
+    ]
+    for method, regex, replace in substitutions:
+        substitute = getattr(EntitySubstitution, method)
+        a = time.time()
+        expect = [regex.sub(replace, x) for x in strings]
+        b = time.time()
+        got = [substitute(x) for x in strings]
+        c = time.time()
+        assert got == expect
+        print(
+            (
+                "%s() on %d strings. Regular expression: %.3fs, %s(): %.3fs."
+                % (method, len(strings), b - a, method, c - b)
+            )
+        )
+
+
+def benchmark_text_layout(
+    num_elements: int = 100000, parser: str = "html.parser"
+) -> None:
+    """Compare `TextRenderer` with putting each string of a document on
+    the line for its closest block-level ancestor, found with
+    `PageElement.find_parent`.
+    """
+    from bs4.text import TextRenderer
+
+    print(("Text layout benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(data, parser)
+    renderer = TextRenderer()
+    blocks = list(renderer.block_elements)
+
+    a = time.time()
+    lines = []
+    line: List[str] = []
+    block = None
+    for string in soup.strings:
+        parent = string.find_parent(blocks)
+        if parent is not block:
+            lines.append(" ".join(line))
+            line = []
+            block = parent
+        line.extend(string.split())
+    lines.append(" ".join(line))
+    b = time.time()
+    renderer.lines(soup)
+    c = time.time()
+    print(("find_parent(): %.3fs. TextRenderer: %.3fs." % (b - a, c - b)))
+
+
+def benchmark_wide_tags(num_children: int = 50000, parser: str = "html.parser") -> None:
+    """Time taking every child out of a `Tag` with a lot of children,
+    with `Tag.clear` and one child at a time.
+    """
+    print(("Wide tag benchmark on Beautiful Soup %s" % __version__))
+    data = "<ul>%s</ul>" % ("<li>item</li>" * num_children)
+    print(("Generated a <ul> tag with %d children." % num_children))
+
+    def each_child(method: str, reverse: bool) -> Callable[[Tag], None]:
+        def remove(tag: Tag) -> None:
+            children = list(tag.contents)
+            if reverse:
+                children.reverse()
+            for child in children:
+                getattr(child, method)()
+
+        return remove
+
+    removals: List[Tuple[str, Callable[[Tag], None]]] = [
+        ("clear()", lambda tag: tag.clear()),
+        ("clear(decompose=True)", lambda tag: tag.clear(decompose=True)),
+        ("extract() each child", each_child("extract", False)),
+        ("extract() each child, last first", each_child("extract", True)),
+        ("decompose() each child, last first", each_child("decompose", True)),
+    ]
+    for description, remove in removals:
+        soup = BeautifulSoup(data, parser)
+        ul = cast(Tag, soup.ul)
+        a = time.time()
+        remove(ul)
+        b = time.time()
+        assert not ul.contents
+        print(("%s: %.3fs." % (description, b - a)))
+
+
+def benchmark_release(
+    num_elements: int = 50000, cycles: int = 10, parser: str = "html.parser"
+) -> None:
+    """Parse and throw away the same document over and over, and see how
+    much time goes to the cyclic garbage collector and how much memory
+    is used, with and without the ``pause_gc`` constructor argument
+    and `BeautifulSoup.release`.
+    """
+    import gc
+    import tracemalloc
+
+    print(("Parse/discard benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+
+    pauses: List[float] = []
+    started = [0.0]
+
+    def callback(phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            started[0] = time.time()
+        else:
+            pauses.append(time.time() - started[0])
+
+    def cycle(pause_gc: bool, release: bool) -> None:
+        for i in range(cycles):
+            soup = BeautifulSoup(data, parser, pause_gc=pause_gc)
+            if release:
+                soup.release()
+            del soup
+
+    for pause_gc, release in ((False, False), (True, False), (False, True), (True, True)):
+        gc.collect()
+        del pauses[:]
+        gc.callbacks.append(callback)
+        try:
+            a = time.time()
+            cycle(pause_gc, release)
+            b = time.time()
+        finally:
+            gc.callbacks.remove(callback)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            cycle(pause_gc, release)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        print(
+            (
+                "pause_gc=%s, release()=%s: %.3fs. %d collections took %.3fs"
+                " (longest %.3fs). Peak memory: %.1f MB."
+                % (
+                    pause_gc,
+                    release,
+                    b - a,
+                    len(pauses),
+                    sum(pauses),
+                    max(pauses or [0]),
+                    peak / 1024 / 1024,
+                )
+            )
+        )
+
+
+def benchmark_frozen_queries(
+    num_elements: int = 50000,
+    threads: int = 8,
+    rounds: int = 20,
+    parser: str = "html.parser",
+) -> None:
+    """Run the same queries against a frozen document (see
+    `BeautifulSoup.freeze`) from one thread and from several threads
+    at once, and make sure every thread gets the same answers.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    print(("Frozen document benchmark on Beautiful Soup %s" % __version__))
+    data = rdoc(num_elements)
+    print(("Generated a large invalid HTML document (%d bytes)." % len(data)))
+    soup = BeautifulSoup(
+        data, parser, use_index=True, query_cache_size=64, cache_rendering=True
+    )
+    a = time.time()
+    soup.freeze()
+    b = time.time()
+    print(("freeze(): %.3fs." % (b - a)))
+
+    def queries(i: int) -> List[Any]:
+        tag = ["p", "b", "i", "a", "div", "span", "table"][i % 7]
+        return [
+            len(soup.find_all(tag)),
+            len(soup.find_all(tag, limit=10)),
+            len(soup.get_text()),
+            len(soup.decode()),
+        ]
+
+    a = time.time()
+    expect = [queries(i) for i in range(rounds * threads)]
+    b = time.time()
+    print(("%d rounds in one thread: %.3fs." % (rounds * threads, b - a)))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        a = time.time()
+        got = list(executor.map(queries, range(rounds * threads)))
+        b = time.time()
+    assert got == expect
+    print(("%d rounds in %d threads: %.3fs." % (rounds * threads, threads, b - a)))
+
+
 def profile(num_elements: int = 100000, parser: str = "lxml") -> None:
     """Use Python's profiler on a randomly generated document."""
     filehandle = tempfile.NamedTemporaryFile()
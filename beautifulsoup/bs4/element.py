@@ -3,10 +3,14 @@ from __future__ import annotations
 # Use of this source code is governed by the MIT license.
 __license__ = "MIT"
 
+import codecs
+import io
+import itertools
 import re
 import warnings
 
 from bs4.css import CSS
+from bs4._positions import ChildPositions
 from bs4._deprecation import (
     _deprecated,
     _deprecated_alias,
@@ -24,10 +28,13 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    Hashable,
+    IO,
     Iterable,
     Iterator,
     List,
     Mapping,
+    NamedTuple,
     Optional,
     Pattern,
     Set,
@@ -45,6 +52,9 @@ from typing_extensions import (
 
 if TYPE_CHECKING:
     from bs4 import BeautifulSoup
+    from bs4._batch import TreeBatch
+    from bs4._index import TagIndex
+    from bs4.cache import QueryCache
     from bs4.builder import TreeBuilder
     from bs4.filter import ElementFilter
     from bs4.formatter import (
@@ -97,6 +107,12 @@ DEFAULT_OUTPUT_ENCODING: str = "utf-8"
 #: A regular expression that can be used to split on whitespace.
 nonwhitespace_re: Pattern[str] = re.compile(r"\S+")
 
+#: Matches the runs of whitespace that
+#: ``get_text(collapse_whitespace=True)`` turns into single spaces.
+#:
+#: :meta private:
+_collapsible_whitespace_re: Pattern[str] = re.compile(r"\s+")
+
 #: These encodings are recognized by Python (so `Tag.encode`
 #: could theoretically support them) but XML and HTML don't recognize
 #: them (so they should not show up in an XML or HTML document as that
@@ -343,6 +359,63 @@ class ContentMetaAttributeValue(AttributeValueWithCharsetSubstitution):
         return self.CHARSET_RE.sub(rewrite, self.original_value)
 
 
+_slot_names_cache: Dict[type, Tuple[str, ...]] = {}
+
+
+def _slot_names(cls: type) -> Tuple[str, ...]:
+    """Find the names of all the data slots defined by a class and its
+    superclasses.
+
+    :meta private:
+    """
+    names = _slot_names_cache.get(cls)
+    if names is None:
+        collected: List[str] = []
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in ("__dict__", "__weakref__") and name not in collected:
+                    collected.append(name)
+        names = _slot_names_cache[cls] = tuple(collected)
+    return names
+
+
+def _hashable_attribute_value(value: Any) -> Hashable:
+    """Convert an attribute value into something that can be part of
+    a `Tag.fingerprint`. Values that are equal must give equal results.
+
+    :meta private:
+    """
+    if isinstance(value, list):
+        return tuple(_hashable_attribute_value(x) for x in value)
+    try:
+        hash(value)
+    except TypeError:
+        # An unusual value, probably set by hand. All values of this
+        # type get the same fingerprint, which is always safe.
+        return type(value).__name__
+    return value
+
+
+def _string_classes(types: _OneOrMoreStringTypes) -> Optional[Set[type]]:
+    """Turn the ``types`` argument to a text extraction method like
+    `Tag.get_text` into a set of `NavigableString` subclasses.
+
+    :return: A set of classes, or None if every kind of string is
+        interesting.
+
+    :meta private:
+    """
+    if types is None:
+        return None
+    if isinstance(types, type):
+        types = [types]
+    # Only strings count, even if a Tag class is mentioned in
+    # ``types``.
+    return set(
+        x for x in types if isinstance(x, type) and issubclass(x, NavigableString)
+    )
+
+
 class PageElement(object):
     """An abstract class representing a single element in the parse tree.
 
@@ -353,6 +426,11 @@ class PageElement(object):
     meaning "a `Tag` or a `NavigableString`."
     """
 
+    # PageElement can't define any slots of its own, since it's mixed
+    # in with `str` to make `NavigableString`. The concrete subclasses
+    # define the slots for the attributes listed below.
+    __slots__ = ()
+
     #: In general, we can't tell just by looking at an element whether
     #: it's contained in an XML document or an HTML document. But for
     #: `Tag` objects (q.v.) we can store this information at parse time.
@@ -373,6 +451,18 @@ class PageElement(object):
     #: Only the `BeautifulSoup` object itself is hidden.
     hidden: bool = False
 
+    #: The open `BeautifulSoup.batch_edit` block, if any, that's
+    #: changing the tree this element is at the top of. Only the
+    #: `BeautifulSoup` object and elements taken out of a document
+    #: inside the block have one.
+    #: :meta private:
+    _batch: Optional[TreeBatch] = None
+
+    #: This is True for the `BeautifulSoup` object at the top of a
+    #: document that has been frozen with `BeautifulSoup.freeze`.
+    #: :meta private:
+    _frozen: bool = False
+
     def setup(
         self,
         parent: Optional[Tag] = None,
@@ -526,6 +616,8 @@ class PageElement(object):
         separator: str = "",
         strip: bool = False,
         types: Iterable[Type[NavigableString]] = default,
+        collapse_whitespace: bool = False,
+        layout: str = "inline",
     ) -> str:
         """Get all child strings of this PageElement, concatenated using the
         given separator.
@@ -542,9 +634,33 @@ class PageElement(object):
             and CData objects. That means no comments, processing
             instructions, etc.
 
+        :param collapse_whitespace: If True, every run of whitespace
+            within a string will be replaced with a single space. This
+            happens after stripping, if ``strip`` is also True.
+
+        :param layout: If this is "block", the text is laid out
+            with one line per block-level element, the way a web
+            browser would show it, by a `bs4.text.TextRenderer` with
+            the default settings. In that case ``separator``, ``strip``
+            and ``collapse_whitespace`` are ignored. The default,
+            "inline", just puts the strings together.
+
         :return: A string.
         """
-        return separator.join([s for s in self._all_strings(strip, types=types)])
+        if layout == "block":
+            from bs4.text import TextRenderer
+
+            return TextRenderer().render(self, types)
+        elif layout != "inline":
+            raise ValueError('layout must be "inline" or "block", not %r.' % layout)
+        strings: Iterable[str] = self._all_strings(types=types)
+        if strip:
+            # Strip all the strings at once, and drop the ones that
+            # were nothing but whitespace.
+            strings = [x for x in map(str.strip, strings) if x]
+        if collapse_whitespace:
+            strings = [_collapsible_whitespace_re.sub(" ", x) for x in strings]
+        return separator.join(strings)
 
     getText = get_text
     text = property(get_text)
@@ -593,11 +709,48 @@ class PageElement(object):
 
         :return: this `PageElement`, no longer part of the tree.
         """
-        if self.parent is not None:
+        batch = self._tree_batch()
+        parent = self.parent
+        if parent is None and self._frozen:
+            self._check_mutable()
+        if parent is not None:
+            if batch is None:
+                parent._tree_changed()
+            else:
+                batch.changed[id(parent)] = parent
             if _self_index is None:
-                _self_index = self.parent.index(self)
-            del self.parent.contents[_self_index]
+                _self_index = parent.index(self)
+            del parent.contents[_self_index]
+            if parent._positions is not None:
+                parent._positions.removed_child(self)
+
+        if batch is None:
+            self._unlink_elements()
+        else:
+            # The next_element chain will be repaired when the batch
+            # is flushed.
+            batch.detach(self)
+
+        self.parent = None
+        if (
+            self.previous_sibling is not None
+            and self.previous_sibling is not self.next_sibling
+        ):
+            self.previous_sibling.next_sibling = self.next_sibling
+        if (
+            self.next_sibling is not None
+            and self.next_sibling is not self.previous_sibling
+        ):
+            self.next_sibling.previous_sibling = self.previous_sibling
+        self.previous_sibling = self.next_sibling = None
+        return self
+
+    def _unlink_elements(self) -> None:
+        """Take this element, and everything beneath it, out of the
+        next_element chain.
 
+        :meta private:
+        """
         # Find the two elements that would be next to each other if
         # this element (and any children) hadn't been parsed. Connect
         # the two.
@@ -618,20 +771,6 @@ class PageElement(object):
         self.previous_element = None
         last_child.next_element = None
 
-        self.parent = None
-        if (
-            self.previous_sibling is not None
-            and self.previous_sibling is not self.next_sibling
-        ):
-            self.previous_sibling.next_sibling = self.next_sibling
-        if (
-            self.next_sibling is not None
-            and self.next_sibling is not self.previous_sibling
-        ):
-            self.next_sibling.previous_sibling = self.previous_sibling
-        self.previous_sibling = self.next_sibling = None
-        return self
-
     def decompose(self) -> None:
         """Recursively destroys this `PageElement` and its children.
 
@@ -643,17 +782,203 @@ class PageElement(object):
         whether an element has been decomposed, you can use the
         `PageElement.decomposed` property.
         """
+        batch = self._tree_batch()
         self.extract()
+        if batch is not None:
+            # The next_element chain inside this element may be out
+            # of date, so go by .contents instead.
+            for e in list(batch.elements(self)):
+                # A decomposed element doesn't need to be brought up
+                # to date.
+                batch.changed.pop(id(e), None)
+                batch.detached.pop(id(e), None)
+                e._clear_instance_attributes()
+                if isinstance(e, Tag):
+                    e.contents = []
+                e._decomposed = True
+            return
         e: _AtMostOneElement = self
         next_up: _AtMostOneElement = None
         while e is not None:
             next_up = e.next_element
-            e.__dict__.clear()
+            e._clear_instance_attributes()
             if isinstance(e, Tag):
                 e.contents = []
             e._decomposed = True
             e = next_up
 
+    def __setstate__(self, state: Any) -> None:
+        # The state is a (__dict__, slots) 2-tuple, or, for an object
+        # pickled before PageElement subclasses used __slots__, a
+        # plain dictionary.
+        if isinstance(state, tuple):
+            instance_state, slot_state = state
+            state = dict(instance_state or {})
+            state.update(slot_state or {})
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def _clear_instance_attributes(self) -> None:
+        """Reset every attribute of this object that's stored in a
+        slot to its default value, and empty the instance dictionary.
+
+        :meta private:
+        """
+        # An empty slot would make Tag.__getattr__ treat the
+        # attribute name as the name of a tag to look for, so every
+        # slot gets a value, the same one a missing attribute used to
+        # fall back on.
+        for name in _slot_names(type(self)):
+            setattr(self, name, None)
+        self.hidden = False
+        try:
+            self.__dict__.clear()
+        except AttributeError:
+            pass
+
+    def _tree_changed(self) -> None:
+        """Called whenever the tree containing this element is modified,
+        so that anything calculated from the tree can be thrown away.
+
+        :meta private:
+        """
+        self._check_mutable()
+
+        # Every fingerprint and rendering between here and the root
+        # is out of date.
+        root = self
+        while True:
+            if isinstance(root, Tag):
+                root._fingerprint = None
+                if root._render_cache:
+                    root._render_cache.clear()
+            if root.parent is None:
+                break
+            root = root.parent
+        root._document_changed()
+
+        if (
+            isinstance(root, Tag)
+            and root._render_cache is not None
+            and root._document_caches_rendering()
+        ):
+            # The document has been rendered before. An empty render
+            # cache marks a tag that will be rendered piece by piece
+            # next time, reusing the renderings of the parts that
+            # didn't change.
+            tag: Optional[PageElement] = self
+            while tag is not None:
+                if isinstance(tag, Tag) and tag._render_cache is None:
+                    tag._render_cache = {}
+                tag = tag.parent
+
+    def _check_mutable(self) -> None:
+        """Make sure the tree containing this element hasn't been
+        frozen.
+
+        :raise ValueError: If the tree is frozen.
+
+        :meta private:
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root._frozen:
+            raise ValueError(
+                "This document has been frozen and can't be modified."
+                " Make a copy of it if you need to change it."
+            )
+
+    def _document_changed(self) -> None:
+        """Called on the root of a tree when the tree is modified.
+        `BeautifulSoup` overrides this.
+
+        :meta private:
+        """
+        pass
+
+    def _tree_index(self) -> Optional[TagIndex]:
+        """Find the `TagIndex` for the tree containing this element, if
+        it has one.
+
+        :meta private:
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root._document_index()
+
+    def _document_index(self) -> Optional[TagIndex]:
+        """Called on the root of a tree to find its `TagIndex`.
+        `BeautifulSoup` overrides this.
+
+        :meta private:
+        """
+        return None
+
+    def _tree_batch(self) -> Optional[TreeBatch]:
+        """Find the `BeautifulSoup.batch_edit` block, if any, that's
+        changing the tree containing this element.
+
+        :meta private:
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        batch = root._batch
+        if batch is not None and batch.depth > 0:
+            return batch
+        return None
+
+    def _flush_tree_batch(self) -> None:
+        """If the tree containing this element is being changed in a
+        `BeautifulSoup.batch_edit` block, bring it up to date, so that
+        its next_element chain can be followed.
+
+        :meta private:
+        """
+        batch = self._tree_batch()
+        if batch is not None:
+            batch.flush()
+
+    def _tree_caches_rendering(self) -> bool:
+        """Should the renderings of the tags in this element's tree be
+        cached?
+
+        :meta private:
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root._document_caches_rendering()
+
+    def _document_caches_rendering(self) -> bool:
+        """Called on the root of a tree to find out whether renderings
+        of its tags should be cached. `BeautifulSoup` overrides this.
+
+        :meta private:
+        """
+        return False
+
+    def _tree_query_cache(self) -> Optional[QueryCache]:
+        """Find the `QueryCache` for the tree containing this element,
+        if it has one.
+
+        :meta private:
+        """
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root._document_query_cache()
+
+    def _document_query_cache(self) -> Optional[QueryCache]:
+        """Called on the root of a tree to find its `QueryCache`.
+        `BeautifulSoup` overrides this.
+
+        :meta private:
+        """
+        return None
+
     def _last_descendant(
         self, is_initialized: bool = True, accept_self: bool = True
     ) -> _AtMostOneElement:
@@ -1147,6 +1472,7 @@ class PageElement(object):
     @property
     def next_elements(self) -> Iterator[PageElement]:
         """All PageElements that were parsed after this one."""
+        self._flush_tree_batch()
         i = self.next_element
         while i is not None:
             successor = i.next_element
@@ -1180,6 +1506,7 @@ class PageElement(object):
 
         :yield: A sequence of PageElements.
         """
+        self._flush_tree_batch()
         i = self.previous_element
         while i is not None:
             successor = i.previous_element
@@ -1278,6 +1605,20 @@ class NavigableString(str, PageElement):
     create a `NavigableString` for the string "penguin".
     """
 
+    # Giving strings a fixed layout instead of an instance dictionary
+    # saves a lot of memory in a large parse tree. The __dict__ slot
+    # is only filled in if someone sets an unexpected attribute.
+    __slots__ = (
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "hidden",
+        "__dict__",
+        "__weakref__",
+    )
+
     #: A string prepended to the body of the 'real' string
     #: when formatting it as part of a document, such as the '<!--'
     #: in an HTML comment.
@@ -1428,6 +1769,8 @@ class PreformattedString(NavigableString):
     as comments (`Comment`) and CDATA blocks (`CData`).
     """
 
+    __slots__ = ()
+
     PREFIX: str = ""
     SUFFIX: str = ""
 
@@ -1451,6 +1794,8 @@ class PreformattedString(NavigableString):
 class CData(PreformattedString):
     """A `CDATA section <https://dev.w3.org/html5/spec-LC/syntax.html#cdata-sections>`_."""
 
+    __slots__ = ()
+
     PREFIX: str = "<![CDATA["
     SUFFIX: str = "]]>"
 
@@ -1458,6 +1803,8 @@ class CData(PreformattedString):
 class ProcessingInstruction(PreformattedString):
     """A SGML processing instruction."""
 
+    __slots__ = ()
+
     PREFIX: str = "<?"
     SUFFIX: str = ">"
 
@@ -1465,6 +1812,8 @@ class ProcessingInstruction(PreformattedString):
 class XMLProcessingInstruction(ProcessingInstruction):
     """An `XML processing instruction <https://www.w3.org/TR/REC-xml/#sec-pi>`_."""
 
+    __slots__ = ()
+
     PREFIX: str = "<?"
     SUFFIX: str = "?>"
 
@@ -1472,6 +1821,8 @@ class XMLProcessingInstruction(ProcessingInstruction):
 class Comment(PreformattedString):
     """An `HTML comment <https://dev.w3.org/html5/spec-LC/syntax.html#comments>`_ or `XML comment <https://www.w3.org/TR/REC-xml/#sec-comments>`_."""
 
+    __slots__ = ()
+
     PREFIX: str = "<!--"
     SUFFIX: str = "-->"
 
@@ -1479,6 +1830,8 @@ class Comment(PreformattedString):
 class Declaration(PreformattedString):
     """An `XML declaration <https://www.w3.org/TR/REC-xml/#sec-prolog-dtd>`_."""
 
+    __slots__ = ()
+
     PREFIX: str = "<?"
     SUFFIX: str = "?>"
 
@@ -1486,6 +1839,8 @@ class Declaration(PreformattedString):
 class Doctype(PreformattedString):
     """A `document type declaration <https://www.w3.org/TR/REC-xml/#dt-doctype>`_."""
 
+    __slots__ = ()
+
     @classmethod
     def for_name_and_ids(
         cls, name: str, pub_id: Optional[str], system_id: Optional[str]
@@ -1531,6 +1886,8 @@ class Stylesheet(NavigableString):
     Used to distinguish embedded stylesheets from textual content.
     """
 
+    __slots__ = ()
+
 
 class Script(NavigableString):
     """A `NavigableString` representing the contents of a `<script>
@@ -1541,6 +1898,8 @@ class Script(NavigableString):
     Used to distinguish executable code from textual content.
     """
 
+    __slots__ = ()
+
 
 class TemplateString(NavigableString):
     """A `NavigableString` representing a string found inside an `HTML
@@ -1550,6 +1909,8 @@ class TemplateString(NavigableString):
     Used to distinguish such strings from the main body of the document.
     """
 
+    __slots__ = ()
+
 
 class RubyTextString(NavigableString):
     """A NavigableString representing the contents of an `<rt> HTML
@@ -1559,12 +1920,82 @@ class RubyTextString(NavigableString):
     annotating.
     """
 
+    __slots__ = ()
+
 
 class RubyParenthesisString(NavigableString):
     """A NavigableString representing the contents of an `<rp> HTML
     tag <https://dev.w3.org/html5/spec-LC/text-level-semantics.html#the-rp-element>`_.
     """
 
+    __slots__ = ()
+
+
+class TagProfile(NamedTuple):
+    """Facts about a tag that depend only on its name and on the
+    `TreeBuilder` that created it.
+
+    A `TreeBuilder` calculates the profile for a given tag name once
+    (see `TreeBuilder.tag_profile`) and every `Tag` with that name
+    shares the same profile object. Changing one of these values on
+    an individual `Tag` gives that `Tag` a profile of its own.
+    """
+
+    #: Whether a tag with this name should be represented as <tag/>
+    #: when it has no contents. See `Tag.can_be_empty_element`.
+    can_be_empty_element: Optional[bool]
+
+    #: Attributes whose values should be treated as lists of strings.
+    #: See `Tag.cdata_list_attributes`.
+    cdata_list_attributes: Optional[Dict[str, Set[str]]]
+
+    #: Names of tags whose whitespace should be preserved.
+    #: See `Tag.preserve_whitespace_tags`.
+    preserve_whitespace_tags: Optional[Set[str]]
+
+    #: The string types considered by `Tag.strings` and
+    #: `PageElement.get_text`. See `Tag.interesting_string_types`.
+    interesting_string_types: Optional[Set[Type[NavigableString]]]
+
+    #: The class used to store the value of a multi-valued attribute.
+    attribute_value_list_class: Type[AttributeValueList] = AttributeValueList
+
+    #: Whether `TreeBuilder.set_up_substitutions` needs to be called
+    #: on a new tag with this name.
+    has_substitutions: bool = False
+
+    @classmethod
+    def for_builder(cls, builder: TreeBuilder, tag_name: str) -> TagProfile:
+        """Calculate the profile of a tag with the given name, as
+        created by the given `TreeBuilder`.
+
+        You probably want `TreeBuilder.tag_profile` instead, which
+        calculates each profile only once.
+        """
+        interesting_string_types: Set[Type[NavigableString]]
+        if tag_name in builder.string_containers:
+            # This sort of tag uses a special string container
+            # subclass for most of its strings. We need to be able
+            # to look up the proper container subclass.
+            interesting_string_types = {builder.string_containers[tag_name]}
+        else:
+            interesting_string_types = Tag.MAIN_CONTENT_STRING_TYPES
+
+        may_set_up_substitutions = getattr(builder, "may_set_up_substitutions", None)
+        if may_set_up_substitutions is None:
+            has_substitutions = True
+        else:
+            has_substitutions = may_set_up_substitutions(tag_name)
+
+        return cls(
+            can_be_empty_element=builder.can_be_empty_element(tag_name),
+            cdata_list_attributes=builder.cdata_list_attributes,
+            preserve_whitespace_tags=builder.preserve_whitespace_tags,
+            interesting_string_types=interesting_string_types,
+            attribute_value_list_class=builder.attribute_value_list_class,
+            has_substitutions=has_substitutions,
+        )
+
 
 class Tag(PageElement):
     """An HTML or XML tag that is part of a parse tree, along with its
@@ -1615,6 +2046,36 @@ class Tag(PageElement):
 
     """
 
+    # Giving tags a fixed layout instead of an instance dictionary
+    # saves a lot of memory in a large parse tree. The __dict__ slot
+    # is only filled in if someone sets an unexpected attribute, so
+    # subclasses (including `BeautifulSoup` itself) can still add
+    # attributes of their own.
+    __slots__ = (
+        "parser_class",
+        "name",
+        "namespace",
+        "_namespaces",
+        "prefix",
+        "sourceline",
+        "sourcepos",
+        "attrs",
+        "known_xml",
+        "contents",
+        "parent",
+        "next_element",
+        "previous_element",
+        "next_sibling",
+        "previous_sibling",
+        "hidden",
+        "_profile",
+        "_fingerprint",
+        "_render_cache",
+        "_positions",
+        "__dict__",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         parser: Optional[BeautifulSoup] = None,
@@ -1646,6 +2107,9 @@ class Tag(PageElement):
         if name is None:
             raise ValueError("No value provided for new tag's name.")
         self.name = name
+        self._fingerprint = None
+        self._render_cache = None
+        self._positions = None
         self.namespace = namespace
         self._namespaces = namespaces or {}
         self.prefix = prefix
@@ -1659,17 +2123,37 @@ class Tag(PageElement):
             self.sourcepos = sourcepos
 
         attr_dict_class: type[AttributeDict]
-        attribute_value_list_class: type[AttributeValueList]
+        profile: TagProfile
         if builder is None:
             if is_xml:
                 attr_dict_class = XMLAttributeDict
             else:
                 attr_dict_class = HTMLAttributeDict
-            attribute_value_list_class = AttributeValueList
+
+            # In the absence of a TreeBuilder, use whatever values were
+            # passed in here. They're probably None, unless this is a copy of some
+            # other tag.
+            profile = TagProfile(
+                can_be_empty_element,
+                cdata_list_attributes,
+                preserve_whitespace_tags,
+                interesting_string_types,
+            )
         else:
             attr_dict_class = builder.attribute_dict_class
-            attribute_value_list_class = builder.attribute_value_list_class
-        self.attribute_value_list_class = attribute_value_list_class
+
+            # Everything else we need to know from the TreeBuilder
+            # depends only on the name of the tag, so it's calculated
+            # once per tag name and shared.
+            try:
+                tag_profile = builder.tag_profile
+            except AttributeError:
+                # This is an object that acts like a TreeBuilder
+                # without subclassing it.
+                profile = TagProfile.for_builder(builder, name)
+            else:
+                profile = tag_profile(name)
+        self._profile = profile
 
         if attrs is None:
             self.attrs = attr_dict_class()
@@ -1698,44 +2182,10 @@ class Tag(PageElement):
         self.setup(parent, previous)
         self.hidden = False
 
-        if builder is None:
-            # In the absence of a TreeBuilder, use whatever values were
-            # passed in here. They're probably None, unless this is a copy of some
-            # other tag.
-            self.can_be_empty_element = can_be_empty_element
-            self.cdata_list_attributes = cdata_list_attributes
-            self.preserve_whitespace_tags = preserve_whitespace_tags
-            self.interesting_string_types = interesting_string_types
-        else:
+        if builder is not None and profile.has_substitutions:
             # Set up any substitutions for this tag, such as the charset in a META tag.
-            self.attribute_value_list_class = builder.attribute_value_list_class
             builder.set_up_substitutions(self)
 
-            # Ask the TreeBuilder whether this tag might be an empty-element tag.
-            self.can_be_empty_element = builder.can_be_empty_element(name)
-
-            # Keep track of the list of attributes of this tag that
-            # might need to be treated as a list.
-            #
-            # For performance reasons, we store the whole data structure
-            # rather than asking the question of every tag. Asking would
-            # require building a new data structure every time, and
-            # (unlike can_be_empty_element), we almost never need
-            # to check this.
-            self.cdata_list_attributes = builder.cdata_list_attributes
-
-            # Keep track of the names that might cause this tag to be treated as a
-            # whitespace-preserved tag.
-            self.preserve_whitespace_tags = builder.preserve_whitespace_tags
-
-            if self.name in builder.string_containers:
-                # This sort of tag uses a special string container
-                # subclass for most of its strings. We need to be able
-                # to look up the proper container subclass.
-                self.interesting_string_types = {builder.string_containers[self.name]}
-            else:
-                self.interesting_string_types = self.MAIN_CONTENT_STRING_TYPES
-
     parser_class: Optional[type[BeautifulSoup]]
     name: str
     namespace: Optional[str]
@@ -1746,11 +2196,62 @@ class Tag(PageElement):
     known_xml: Optional[bool]
     contents: List[PageElement]
     hidden: bool
-    interesting_string_types: Optional[Set[Type[NavigableString]]]
+    _profile: TagProfile
 
-    can_be_empty_element: Optional[bool]
-    cdata_list_attributes: Optional[Dict[str, Set[str]]]
-    preserve_whitespace_tags: Optional[Set[str]]
+    @property
+    def can_be_empty_element(self) -> Optional[bool]:
+        """Whether this tag should be represented as <tag/> when it
+        has no contents, according to the `TreeBuilder` that created it.
+        """
+        return self._profile.can_be_empty_element
+
+    @can_be_empty_element.setter
+    def can_be_empty_element(self, value: Optional[bool]) -> None:
+        self._profile = self._profile._replace(can_be_empty_element=value)
+
+    @property
+    def cdata_list_attributes(self) -> Optional[Dict[str, Set[str]]]:
+        """The attributes of this tag that might need to be treated as
+        a list of strings rather than a single string.
+        """
+        return self._profile.cdata_list_attributes
+
+    @cdata_list_attributes.setter
+    def cdata_list_attributes(self, value: Optional[Dict[str, Set[str]]]) -> None:
+        self._profile = self._profile._replace(cdata_list_attributes=value)
+
+    @property
+    def preserve_whitespace_tags(self) -> Optional[Set[str]]:
+        """The names that might cause this tag to be treated as a
+        whitespace-preserved tag.
+        """
+        return self._profile.preserve_whitespace_tags
+
+    @preserve_whitespace_tags.setter
+    def preserve_whitespace_tags(self, value: Optional[Set[str]]) -> None:
+        self._profile = self._profile._replace(preserve_whitespace_tags=value)
+
+    @property
+    def interesting_string_types(self) -> Optional[Set[Type[NavigableString]]]:
+        """The types of strings considered by methods like `Tag.strings`
+        and `PageElement.get_text`.
+        """
+        return self._profile.interesting_string_types
+
+    @interesting_string_types.setter
+    def interesting_string_types(
+        self, value: Optional[Set[Type[NavigableString]]]
+    ) -> None:
+        self._profile = self._profile._replace(interesting_string_types=value)
+
+    @property
+    def attribute_value_list_class(self) -> Type[AttributeValueList]:
+        """The class used to store the value of a multi-valued attribute."""
+        return self._profile.attribute_value_list_class
+
+    @attribute_value_list_class.setter
+    def attribute_value_list_class(self, value: Type[AttributeValueList]) -> None:
+        self._profile = self._profile._replace(attribute_value_list_class=value)
 
     #: :meta private:
     parserClass = _deprecated_alias("parserClass", "parser_class", "4.0.0")
@@ -1761,26 +2262,83 @@ class Tag(PageElement):
         """
         clone = self.copy_self()
 
-        if recursive:
-            # Clone this tag's descendants recursively, but without
-            # making any recursive function calls.
-            tag_stack: List[Tag] = [clone]
-            for event, element in self._event_stream(self.descendants):
-                if event is Tag.END_ELEMENT_EVENT:
-                    # Stop appending incoming Tags to the Tag that was
-                    # just closed.
-                    tag_stack.pop()
+        if recursive and self.contents:
+            # Clone this tag's descendants without making any
+            # recursive function calls, and without going through
+            # append(): every link between the new elements is set
+            # as they're created, in a single pass.
+            previous: PageElement = clone
+            # Each entry is an original element and the clone of its
+            # parent.
+            stack: List[Tuple[PageElement, Tag]] = [
+                (child, clone) for child in reversed(self.contents)
+            ]
+            while stack:
+                element, parent = stack.pop()
+                copier = _fast_copiers.get(type(element))
+                if copier is None:
+                    copier = _fast_copier(type(element))
+                if copier is not None:
+                    descendant_clone = copier(element, parent)
                 else:
                     descendant_clone = element.__deepcopy__(memo, recursive=False)
-                    # Add to its parent's .contents
-                    tag_stack[-1].append(descendant_clone)
-
-                    if event is Tag.START_ELEMENT_EVENT:
-                        # Add the Tag itself to the stack so that its
-                        # children will be .appended to it.
-                        tag_stack.append(cast(Tag, descendant_clone))
+                descendant_clone.parent = parent
+                siblings = parent.contents
+                if siblings:
+                    descendant_clone.previous_sibling = siblings[-1]
+                    siblings[-1].next_sibling = descendant_clone
+                else:
+                    descendant_clone.previous_sibling = None
+                descendant_clone.next_sibling = None
+                siblings.append(descendant_clone)
+                descendant_clone.previous_element = previous
+                previous.next_element = descendant_clone
+                previous = descendant_clone
+                if isinstance(element, Tag) and element.contents:
+                    stack.extend(
+                        (child, descendant_clone) for child in reversed(element.contents)
+                    )
+            previous.next_element = None
         return clone
 
+    def dumps(self) -> bytes:
+        """Serialize this `Tag` and its contents in a compact binary
+        format.
+
+        Use `bs4.loads` to turn the result back into a parse tree. This
+        is a lot faster than rendering the tree as markup and parsing
+        it again. See `bs4.serialize` for details.
+        """
+        # Import here to avoid circular import
+        from bs4.serialize import dumps
+
+        return dumps(self)
+
+    def __reduce__(self) -> Tuple[Callable[[bytes], Tag], Tuple[bytes]]:
+        # A pickled Tag is a copy of the Tag and its contents, without
+        # the rest of the tree.
+        from bs4.serialize import loads
+
+        return (loads, (self.dumps(),))
+
+    def __setstate__(self, state: Any) -> None:
+        # This is only called for a Tag pickled by an older version
+        # of Beautiful Soup, which stored the information that's now
+        # in the Tag's profile in the Tag itself.
+        self._fingerprint = None
+        self._render_cache = None
+        self._positions = None
+        if isinstance(state, dict) and "_profile" not in state:
+            state = dict(state)
+            self._profile = TagProfile(
+                state.pop("can_be_empty_element", None),
+                state.pop("cdata_list_attributes", None),
+                state.pop("preserve_whitespace_tags", None),
+                state.pop("interesting_string_types", None),
+                state.pop("attribute_value_list_class", AttributeValueList),
+            )
+        super(Tag, self).__setstate__(state)
+
     def copy_self(self) -> Self:
         """Create a new Tag just like this one, but with no
         contents and unattached to any parse tree.
@@ -1805,8 +2363,10 @@ class Tag(PageElement):
             interesting_string_types=self.interesting_string_types,
             namespaces=self._namespaces,
         )
-        for attr in ("can_be_empty_element", "hidden"):
-            setattr(clone, attr, getattr(self, attr))
+        # The clone gets everything it needs to know from the
+        # original's TreeBuilder through the original's profile.
+        clone._profile = self._profile
+        clone.hidden = self.hidden
         return clone
 
     @property
@@ -1892,24 +2452,32 @@ class Tag(PageElement):
             else:
                 types = self.interesting_string_types
 
-        for descendant in self.descendants:
-            if not isinstance(descendant, NavigableString):
-                continue
-            descendant_type = type(descendant)
-            if isinstance(types, type):
-                if descendant_type is not types:
-                    # We're not interested in strings of this type.
-                    continue
-            elif types is not None and descendant_type not in types:
-                # We're not interested in strings of this type.
-                continue
-            if strip:
-                stripped = descendant.strip()
-                if len(stripped) == 0:
-                    continue
-                yield stripped
-            else:
-                yield descendant
+        # Work out the set of interesting classes once, so that each
+        # element only needs a single set lookup.
+        wanted = _string_classes(types)
+
+        if not self.contents:
+            return
+        self._flush_tree_batch()
+        # Walk the next_element chain, the same way self.descendants
+        # does, but without a generator per element.
+        last_descendant = cast(PageElement, self._last_descendant(accept_self=True))
+        stop_node = last_descendant.next_element
+        current: _AtMostOneElement = self.contents[0]
+        while current is not stop_node and current is not None:
+            successor = current.next_element
+            if (
+                isinstance(current, NavigableString)
+                if wanted is None
+                else type(current) in wanted
+            ):
+                if strip:
+                    stripped = current.strip()
+                    if stripped:
+                        yield stripped
+                else:
+                    yield current
+            current = successor
 
     strings = property(_all_strings)
 
@@ -1937,6 +2505,9 @@ class Tag(PageElement):
             raise ValueError("Cannot insert None into a tag.")
         if new_child is self:
             raise ValueError("Cannot insert a tag into itself.")
+        batch = self._tree_batch()
+        if batch is None:
+            self._tree_changed()
         if isinstance(new_child, str) and not isinstance(new_child, NavigableString):
             new_child = NavigableString(new_child)
 
@@ -1964,6 +2535,34 @@ class Tag(PageElement):
                     return [new_child]
             new_child.extract()
 
+        if batch is not None:
+            # Only .contents and the sibling links change now; the
+            # next_element chain will be repaired when the batch is
+            # flushed.
+            batch.changed[id(self)] = self
+            batch.attach(new_child)
+            new_child.parent = self
+            if position == 0:
+                new_child.previous_sibling = None
+            else:
+                new_child.previous_sibling = self.contents[position - 1]
+                new_child.previous_sibling.next_sibling = new_child
+            if position >= len(self.contents):
+                new_child.next_sibling = None
+            else:
+                new_child.next_sibling = self.contents[position]
+                new_child.next_sibling.previous_sibling = new_child
+            self.contents.insert(position, new_child)
+            if self._positions is not None:
+                self._positions.inserted(self.contents, position)
+            return [new_child]
+
+        child_batch = new_child._tree_batch()
+        if child_batch is not None:
+            # The element is coming out of a tree that's being changed
+            # in a batch, and its next_element chain may be out of date.
+            child_batch.flush()
+
         new_child.parent = self
         previous_child = None
         if position == 0:
@@ -2016,6 +2615,8 @@ class Tag(PageElement):
                 new_childs_last_element
             )
         self.contents.insert(position, new_child)
+        if self._positions is not None:
+            self._positions.inserted(self.contents, position)
 
         return [new_child]
 
@@ -2091,18 +2692,47 @@ class Tag(PageElement):
         return results
 
     def clear(self, decompose: bool = False) -> None:
-        """Destroy all children of this `Tag` by calling
-           `PageElement.extract` on them.
+        """Destroy all children of this `Tag`, as though
+           `PageElement.extract` had been called on each of them.
 
         :param decompose: If this is True, `PageElement.decompose` (a
             more destructive method) will be called instead of
             `PageElement.extract`.
         """
-        for element in self.contents[:]:
-            if decompose:
-                element.decompose()
-            else:
-                element.extract()
+        if not self.contents:
+            return
+        children = self.contents[:]
+        if self._tree_batch() is not None:
+            for element in children:
+                if decompose:
+                    element.decompose()
+                else:
+                    element.extract()
+            return
+
+        # Taking the children out one at a time would repair the
+        # next_element chain, and shift the rest of .contents, once
+        # per child. Instead, cut the chain once on either side of
+        # the children, and once between each pair of children.
+        self._tree_changed()
+        last = cast(PageElement, self._last_descendant(accept_self=False))
+        following = last.next_element
+        for child in children[1:]:
+            if child.previous_element is not None:
+                child.previous_element.next_element = None
+        last.next_element = None
+        for child in children:
+            child.parent = None
+            child.previous_element = None
+            child.previous_sibling = child.next_sibling = None
+        del self.contents[:]
+        self._positions = None
+        self.next_element = following
+        if following is not None:
+            following.previous_element = self
+        if decompose:
+            for child in children:
+                child.decompose()
 
     def smooth(self) -> None:
         """Smooth out the children of this `Tag` by consolidating consecutive
@@ -2112,37 +2742,87 @@ class Tag(PageElement):
         calling this method afterwards can make pretty-printed output
         look more natural.
         """
-        # Mark the first position of every pair of children that need
-        # to be consolidated.  Do this rather than making a copy of
-        # self.contents, since in most cases very few strings will be
-        # affected.
-        marked = []
-        for i, a in enumerate(self.contents):
-            if isinstance(a, Tag):
-                # Recursively smooth children.
-                a.smooth()
-            if i == len(self.contents) - 1:
-                # This is the last item in .contents, and it's not a
-                # tag. There's no chance it needs any work.
+        batch = self._tree_batch()
+        if batch is None:
+            self._check_mutable()
+        # Go through the tags with a stack rather than by recursion,
+        # so a deeply nested tree can't hit the recursion limit.
+        stack: List[Tag] = [self]
+        while stack:
+            tag = stack.pop()
+            contents = tag.contents
+            new_contents: List[PageElement] = []
+            run: List[NavigableString] = []
+            for child in contents:
+                if isinstance(child, NavigableString) and not isinstance(
+                    child, PreformattedString
+                ):
+                    run.append(child)
+                    continue
+                if run:
+                    new_contents.append(tag._merge_strings(run, batch))
+                    run = []
+                new_contents.append(child)
+                if isinstance(child, Tag):
+                    stack.append(child)
+            if run:
+                new_contents.append(tag._merge_strings(run, batch))
+            if len(new_contents) == len(contents):
+                # Nothing was merged.
                 continue
-            b = self.contents[i + 1]
-            if (
-                isinstance(a, NavigableString)
-                and isinstance(b, NavigableString)
-                and not isinstance(a, PreformattedString)
-                and not isinstance(b, PreformattedString)
-            ):
-                marked.append(i)
-
-        # Go over the marked positions in reverse order, so that
-        # removing items from .contents won't affect the remaining
-        # positions.
-        for i in reversed(marked):
-            a = cast(NavigableString, self.contents[i])
-            b = cast(NavigableString, self.contents[i + 1])
-            b.extract()
-            n = NavigableString(a + b)
-            a.replace_with(n)
+
+            # Connect each child to its new siblings.
+            previous: Optional[PageElement] = None
+            for child in new_contents:
+                child.previous_sibling = previous
+                if previous is not None:
+                    previous.next_sibling = child
+                previous = child
+            if previous is not None:
+                previous.next_sibling = None
+            contents[:] = new_contents
+            tag._positions = None
+            if batch is None:
+                tag._tree_changed()
+            else:
+                batch.changed[id(tag)] = tag
+
+    def _merge_strings(
+        self, run: List[NavigableString], batch: Optional[TreeBatch]
+    ) -> NavigableString:
+        """Replace a run of consecutive strings from this tag's
+        contents with a single string.
+
+        The new string takes the place of the run in the next_element
+        chain, but the caller has to put it into `Tag.contents` and
+        connect it to its siblings.
+
+        :meta private:
+        """
+        if len(run) == 1:
+            return run[0]
+        first = run[0]
+        last = run[-1]
+        merged = NavigableString("".join(run))
+        merged.parent = self
+        if batch is None:
+            # Strings have no children, so the strings in the run
+            # follow each other in the next_element chain.
+            merged.previous_element = first.previous_element
+            if merged.previous_element is not None:
+                merged.previous_element.next_element = merged
+            merged.next_element = last.next_element
+            if merged.next_element is not None:
+                merged.next_element.previous_element = merged
+        else:
+            # The next_element chain will be repaired when the batch
+            # is flushed.
+            merged.previous_element = merged.next_element = None
+        for string in run:
+            string.parent = None
+            string.next_element = string.previous_element = None
+            string.next_sibling = string.previous_sibling = None
+        return merged
 
     def index(self, element: PageElement) -> int:
         """Find the index of a child of this `Tag` (by identity, not value).
@@ -2152,9 +2832,19 @@ class Tag(PageElement):
 
         :param element: Look for this `PageElement` in this object's contents.
         """
-        for i, child in enumerate(self.contents):
-            if child is element:
-                return i
+        contents = self.contents
+        if len(contents) < ChildPositions.MIN_CHILDREN:
+            for i, child in enumerate(contents):
+                if child is element:
+                    return i
+        else:
+            # For a tag with a lot of children, going through the list
+            # every time makes bulk changes quadratic.
+            if self._positions is None:
+                self._positions = ChildPositions(contents)
+            position = self._positions.find(contents, element)
+            if position is not None:
+                return position
         raise ValueError("Tag.index: element not in tag")
 
     def get(
@@ -2198,7 +2888,93 @@ class Tag(PageElement):
         return key in self.attrs
 
     def __hash__(self) -> int:
-        return str(self).__hash__()
+        # Tags that are equal have the same fingerprint, so this is
+        # consistent with __eq__, and it doesn't require rendering the
+        # tag as a string. The remembered fingerprints can't be used,
+        # since they don't notice changes made directly to Tag.name
+        # or Tag.attrs, and a hash has to agree with __eq__ no matter
+        # how the tag was changed.
+        return self._calculate_fingerprint(remember=False)
+
+    def fingerprint(self, recalculate: bool = False) -> int:
+        """Calculate a hash of this `Tag`'s name, attributes and
+        contents (recursively).
+
+        Two tags that are equal according to ``==`` always have the
+        same fingerprint, so a fingerprint can be used to quickly tell
+        that two tags are different, or to find duplicate tags.
+
+        The fingerprint of every `Tag` is remembered, so it only has
+        to be calculated again for the parts of the tree that have
+        changed. Changes made through methods like `Tag.append`,
+        `PageElement.extract` and ``tag[attribute] = value`` are
+        noticed automatically. If you change a tag's `Tag.name` or
+        modify `Tag.attrs` directly, the fingerprints of that tag and
+        the tags that contain it will be out of date; call
+        ``fingerprint(recalculate=True)`` on the tag you changed to
+        fix them. (``hash(tag)`` and ``==`` don't use the remembered
+        fingerprints, so they're never out of date.)
+
+        :param recalculate: If this is True, forget the fingerprints of
+            this tag, everything beneath it, and everything that
+            contains it, and calculate this tag's fingerprint again
+            from scratch.
+        """
+        if recalculate:
+            self._tree_changed()
+            for descendant in self.descendants:
+                if isinstance(descendant, Tag):
+                    descendant._fingerprint = None
+        elif self._fingerprint is not None:
+            return self._fingerprint
+        return self._calculate_fingerprint(remember=True)
+
+    def _calculate_fingerprint(self, remember: bool) -> int:
+        """Calculate the fingerprint of this `Tag`.
+
+        :param remember: If this is True, the remembered fingerprints
+            of the tags beneath this one are used where they exist,
+            and every fingerprint calculated is remembered. If it's
+            False, everything is calculated from scratch and nothing
+            is remembered.
+
+        :meta private:
+        """
+        calculated: Dict[int, int] = {}
+
+        # Calculate the fingerprint of every tag beneath this one
+        # that needs it, children before parents, without using
+        # recursive function calls.
+        stack: List[Tuple[Tag, bool]] = [(self, False)]
+        while stack:
+            tag, children_done = stack.pop()
+            if not children_done:
+                stack.append((tag, True))
+                for child in tag.contents:
+                    if isinstance(child, Tag) and not (
+                        remember and child._fingerprint is not None
+                    ):
+                        stack.append((child, False))
+                continue
+            contents = tuple(
+                (child._fingerprint if remember else calculated[id(child)])
+                if isinstance(child, Tag)
+                else str(child)
+                for child in tag.contents
+            )
+            attrs = frozenset(
+                (key, _hashable_attribute_value(value))
+                for key, value in tag.attrs.items()
+            )
+            fingerprint = hash((tag.name, attrs, contents))
+            if remember:
+                tag._fingerprint = fingerprint
+            else:
+                calculated[id(tag)] = fingerprint
+        if remember:
+            assert self._fingerprint is not None
+            return self._fingerprint
+        return calculated[id(self)]
 
     def __getitem__(self, key: str) -> _AttributeValue:
         """tag[key] returns the value of the 'key' attribute for the Tag,
@@ -2223,10 +2999,12 @@ class Tag(PageElement):
     def __setitem__(self, key: str, value: _AttributeValue) -> None:
         """Setting tag[key] sets the value of the 'key' attribute for the
         tag."""
+        self._tree_changed()
         self.attrs[key] = value
 
     def __delitem__(self, key: str) -> None:
         "Deleting tag[key] deletes all 'key' attributes for the tag."
+        self._tree_changed()
         self.attrs.pop(key, None)
 
     def __call__(
@@ -2260,8 +3038,14 @@ class Tag(PageElement):
                 stacklevel=2,
             )
             result = self.find(tag_name)
-        # We special case contents to avoid recursion.
-        elif not subtag.startswith("__") and not subtag == "contents":
+        # We special case contents and the other slots to avoid
+        # recursion; a slot is only missing if the tag hasn't been
+        # set up properly.
+        elif (
+            not subtag.startswith("__")
+            and not subtag == "contents"
+            and subtag not in _slot_names(type(self))
+        ):
             result = self.find(subtag)
         else:
             raise AttributeError(
@@ -2326,10 +3110,150 @@ class Tag(PageElement):
             handling constants defined by Python's codecs module
             <https://docs.python.org/3/library/codecs.html#error-handlers>`_.
         """
-        # Turn the data structure into Unicode, then encode the
-        # Unicode.
-        u = self.decode(indent_level, encoding, formatter)
-        return u.encode(encoding, errors)
+        # Encode the output as it's generated, instead of turning the
+        # whole tree into a Unicode string and encoding that, so the
+        # document is only ever in memory once, as a bytestring.
+        return self._encode(encoding, indent_level, formatter, errors)
+
+    def iter_encode(
+        self,
+        encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[bytes]:
+        """Render this `Tag` and its contents as a series of
+        bytestrings.
+
+        Put together, the bytestrings are the same as the output of
+        `Tag.encode`, but the whole document is never held in memory
+        as a single string. The output is encoded as it's generated,
+        using an incremental encoder from Python's codecs module.
+
+        :param encoding: The encoding to use. This may also affect
+           the text of the document, as with `Tag.encode`.
+        :param indent_level: Each line of the rendering will be
+           indented this many levels, as with `Tag.encode`. Pass in 0
+           to get the same output as `Tag.prettify`.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy such as
+            'xmlcharrefreplace', as with `Tag.encode`.
+        :param chunk_size: Collect about this many characters of
+            output before encoding them and yielding the result.
+        """
+        return self._iter_encode(encoding, indent_level, formatter, errors, chunk_size)
+
+    def _iter_encode(
+        self,
+        encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        chunk_size: int = 64 * 1024,
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[bytes]:
+        """The implementation of `Tag.iter_encode`, which can also
+        encode just the contents of this `Tag`.
+
+        :param iterator: Passed into `Tag._decode_pieces`.
+
+        :meta private:
+        """
+        encoder = codecs.getincrementalencoder(encoding)(errors)
+        for chunk in self._decode_chunks(
+            indent_level, encoding, formatter, chunk_size, iterator
+        ):
+            data = encoder.encode(chunk)
+            if data:
+                yield data
+        data = encoder.encode("", True)
+        if data:
+            yield data
+
+    def _encode(
+        self,
+        encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> bytes:
+        """Collect the output of `Tag._iter_encode` into a single
+        bytestring.
+
+        :meta private:
+        """
+        buffer = io.BytesIO()
+        for data in self._iter_encode(
+            encoding, indent_level, formatter, errors, iterator=iterator
+        ):
+            buffer.write(data)
+        return buffer.getvalue()
+
+    def write(
+        self,
+        fp: Union[IO[bytes], IO[str]],
+        encoding: Optional[_Encoding] = DEFAULT_OUTPUT_ENCODING,
+        indent_level: Optional[int] = None,
+        formatter: _FormatterOrName = "minimal",
+        errors: str = "xmlcharrefreplace",
+    ) -> None:
+        """Render this `Tag` and its contents directly into a file.
+
+        This writes the same thing as ``fp.write(tag.encode(...))``,
+        but it uses a lot less memory, since the output is written a
+        piece at a time. See `Tag.iter_encode`.
+
+        :param fp: A file-like object opened in binary mode, or, if
+            ``encoding`` is None, in text mode.
+        :param encoding: The encoding to use, or None to write a
+            Unicode string (the same as the output of `Tag.decode`)
+            to a text file.
+        :param indent_level: Each line of the rendering will be
+           indented this many levels, as with `Tag.encode`. Pass in 0
+           to get the same output as `Tag.prettify`.
+        :param formatter: Either a `Formatter` object, or a string naming one of
+            the standard formatters.
+        :param errors: An error handling strategy such as
+            'xmlcharrefreplace', as with `Tag.encode`.
+        """
+        if encoding is None:
+            text_fp = cast(IO[str], fp)
+            for chunk in self._decode_chunks(indent_level, formatter=formatter):
+                text_fp.write(chunk)
+        else:
+            binary_fp = cast(IO[bytes], fp)
+            for data in self.iter_encode(encoding, indent_level, formatter, errors):
+                binary_fp.write(data)
+
+    def _decode_chunks(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: _FormatterOrName = "minimal",
+        chunk_size: int = 64 * 1024,
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Join the output of `Tag._decode_pieces` into strings of at
+        least ``chunk_size`` characters (except for the last one).
+
+        :meta private:
+        """
+        buffered: List[str] = []
+        buffered_size = 0
+        for piece in self._decode_pieces(
+            indent_level, eventual_encoding, formatter, iterator
+        ):
+            buffered.append(piece)
+            buffered_size += len(piece)
+            if buffered_size >= chunk_size:
+                yield "".join(buffered)
+                buffered = []
+                buffered_size = 0
+        if buffered:
+            yield "".join(buffered)
 
     def decode(
         self,
@@ -2357,7 +3281,22 @@ class Tag(PageElement):
             parse tree. This is only used by `Tag.decode_contents` and
             you probably won't need to use it.
         """
-        pieces = []
+        return "".join(
+            self._decode_pieces(indent_level, eventual_encoding, formatter, iterator)
+        )
+
+    def _decode_pieces(
+        self,
+        indent_level: Optional[int] = None,
+        eventual_encoding: _Encoding = DEFAULT_OUTPUT_ENCODING,
+        formatter: _FormatterOrName = "minimal",
+        iterator: Optional[Iterator[PageElement]] = None,
+    ) -> Iterator[str]:
+        """Render this `Tag` and its contents as a sequence of strings
+        which, put together, are the same as the output of `Tag.decode`.
+
+        :meta private:
+        """
         # First off, turn a non-Formatter `formatter` into a Formatter
         # object. This will stop the lookup from happening over and
         # over again.
@@ -2367,6 +3306,13 @@ class Tag(PageElement):
         if indent_level is True:
             indent_level = 0
 
+        minify = formatter.minify
+        if iterator is None and not minify and self._tree_caches_rendering():
+            # A minified string depends on its neighbors, which the
+            # render cache doesn't keep track of.
+            yield self._decode_cached(indent_level, eventual_encoding, formatter)
+            return
+
         # The currently active tag that put us into string literal
         # mode. Until this element is closed, children will be treated
         # as string literals and not pretty-printed. String literal
@@ -2375,6 +3321,14 @@ class Tag(PageElement):
         # will be whitespace before and after the tag itself.
         string_literal_tag = None
 
+        if minify:
+            # If this tag is inside a tag like <pre>, none of its
+            # whitespace can be touched.
+            for parent in self.parents:
+                if not parent._should_pretty_print():
+                    string_literal_tag = parent
+                    break
+
         for event, element in self._event_stream(iterator):
             if event in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
                 element = cast(Tag, element)
@@ -2386,7 +3340,14 @@ class Tag(PageElement):
                     indent_level -= 1
             else:
                 element = cast(NavigableString, element)
-                piece = element.output_ready(formatter)
+                if (
+                    minify
+                    and string_literal_tag is None
+                    and element.__class__ is NavigableString
+                ):
+                    piece = formatter.minified_string(element)
+                else:
+                    piece = element.output_ready(formatter)
 
             # Now we need to apply the 'prettiness' -- extra
             # whitespace before and/or after this tag. This can get
@@ -2437,8 +3398,112 @@ class Tag(PageElement):
                         )
                 if event == Tag.START_ELEMENT_EVENT:
                     indent_level += 1
+            yield piece
+
+    def _decode_cached(
+        self,
+        indent_level: Optional[int],
+        eventual_encoding: _Encoding,
+        formatter: Formatter,
+        rebuild: bool = True,
+    ) -> str:
+        """Render this `Tag` the same way as `Tag.decode`, using and
+        updating the render cache (see `BeautifulSoup.cache_rendering`).
+
+        Only tags that have been modified since the document was last
+        rendered are rebuilt from the renderings of their children;
+        any other tag is rendered all at once and stored. This keeps
+        the number of renderings of small tags from growing out of
+        hand.
+
+        :param rebuild: If this is True, build the rendering out of the
+            renderings of this tag's children, even if this tag has
+            never been rendered before.
+
+        :meta private:
+        """
+        key = (formatter, indent_level, eventual_encoding)
+        cache = self._render_cache
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        if cache is None:
+            cache = self._render_cache = {}
+            if not rebuild:
+                rendered = "".join(
+                    self._decode_pieces(
+                        indent_level,
+                        eventual_encoding,
+                        formatter,
+                        self._self_and(self.descendants),
+                    )
+                )
+                cache[key] = rendered
+                return rendered
+
+        # This mirrors the logic of _decode_pieces, one level at a
+        # time.
+        pretty = indent_level is not None
+        literal = pretty and not self._should_pretty_print()
+        child_level = indent_level
+        pieces = []
+        if not self.hidden:
+            piece = self._format_tag(eventual_encoding, formatter, opening=True)
+            if pretty and piece:
+                piece = self._indent_string(
+                    piece,
+                    cast(int, indent_level),
+                    formatter,
+                    True,
+                    not literal or self.is_empty_element,
+                )
+            pieces.append(piece)
+            if child_level is not None:
+                child_level += 1
+        if literal:
+            # Nothing inside this tag gets pretty-printed.
+            child_level = None
+
+        for child in self.contents:
+            if isinstance(child, Tag):
+                if child.hidden:
+                    # A hidden tag takes up an indentation level when
+                    # it's not the tag being rendered, so render it the
+                    # long way.
+                    piece = "".join(
+                        child._decode_pieces(
+                            child_level,
+                            eventual_encoding,
+                            formatter,
+                            itertools.chain([child], child.descendants),
+                        )
+                    )
+                else:
+                    piece = child._decode_cached(
+                        child_level, eventual_encoding, formatter, rebuild=False
+                    )
+            else:
+                piece = cast(NavigableString, child).output_ready(formatter)
+                if child_level is not None:
+                    piece = piece.strip()
+                    if piece:
+                        piece = self._indent_string(
+                            piece, child_level, formatter, True, True
+                        )
+            pieces.append(piece)
+
+        if not self.hidden and not self.is_empty_element:
+            piece = self._format_tag(eventual_encoding, formatter, opening=False)
+            if pretty and piece:
+                piece = self._indent_string(
+                    piece, cast(int, indent_level), formatter, not literal, True
+                )
             pieces.append(piece)
-        return "".join(pieces)
+
+        rendered = "".join(pieces)
+        cache[key] = rendered
+        return rendered
 
     class _TreeTraversalEvent(object):
         """An internal class representing an event in the process
@@ -2479,12 +3544,14 @@ class Tag(PageElement):
             # If the parent of the element we're about to yield is not
             # the tag currently on the stack, it means that the tag on
             # the stack closed before this element appeared.
-            while tag_stack and c.parent != tag_stack[-1]:
+            while tag_stack and c.parent is not tag_stack[-1]:
                 now_closed_tag = tag_stack.pop()
                 yield Tag.END_ELEMENT_EVENT, now_closed_tag
 
             if isinstance(c, Tag):
-                if c.is_empty_element:
+                # Checking c.contents first saves a property lookup
+                # for most tags.
+                if not c.contents and c.is_empty_element:
                     yield Tag.EMPTY_ELEMENT_EVENT, c
                 else:
                     yield Tag.START_ELEMENT_EVENT, c
@@ -2565,7 +3632,7 @@ class Tag(PageElement):
                         val = val.substitute_encoding(eventual_encoding)
 
                     text = formatter.attribute_value(val)
-                    decoded = str(key) + "=" + formatter.quoted_attribute_value(text)
+                    decoded = str(key) + "=" + formatter.quoted_attribute(text)
                 attrs.append(decoded)
             if attrs:
                 attribute_string = " " + " ".join(attrs)
@@ -2661,8 +3728,9 @@ class Tag(PageElement):
             the standard formatters.
         :param encoding: The bytestring will be in this encoding.
         """
-        contents = self.decode_contents(indent_level, encoding, formatter)
-        return contents.encode(encoding)
+        return self._encode(
+            encoding, indent_level, formatter, "strict", iterator=self.descendants
+        )
 
     @_deprecated("encode_contents", "4.0.0")
     def renderContents(
@@ -2737,16 +3805,115 @@ class Tag(PageElement):
         :param _stacklevel: Used internally to improve warning messages.
         :kwargs: Additional filters on attribute values.
         """
-        generator = self.descendants
+        cache = self._tree_query_cache()
+        key = None
+        if cache is not None:
+            key = cache.key(
+                self, "find_all", name, attrs, recursive, string, limit, kwargs
+            )
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+
+        generator: Iterator[PageElement] = self.descendants
         if not recursive:
             generator = self.children
-        return self._find_all(
+        else:
+            index = self._tree_index()
+            if index is not None:
+                candidates = index.find_all_candidates(self, name, attrs, kwargs)
+                if candidates is not None:
+                    generator = candidates
+        results = self._find_all(
             name, attrs, string, limit, generator, _stacklevel=_stacklevel + 1, **kwargs
         )
+        if key is not None:
+            assert cache is not None
+            cache.add(key, results)
+        return results
 
     findAll = _deprecated_function_alias("findAll", "find_all", "4.0.0")
     findChildren = _deprecated_function_alias("findChildren", "find_all", "3.0.0")
 
+    def find_all_many(
+        self,
+        queries: Mapping[str, Union[ElementFilter, str]],
+        limit: Optional[Union[int, Mapping[str, int]]] = None,
+        namespaces: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, _QueryResults]:
+        """Run several searches at once, looking at each of this
+        `Tag`'s descendants only one time.
+
+        This is faster than calling `Tag.find_all` or `Tag.select`
+        over and over when you need many different things from the
+        same document::
+
+            results = soup.find_all_many({
+                "links": SoupStrainer("a", href=True),
+                "images": "img[src]",
+                "prices": ".price",
+            })
+            for link in results["links"]:
+                ...
+
+        :param queries: A dictionary of searches. Each value is an
+            `ElementFilter` (such as a `SoupStrainer`), which finds the
+            same things as passing it into `Tag.find_all`, or a CSS
+            selector, which finds the same things as `Tag.select`.
+        :param limit: Stop looking for matches for a search once this
+            many have been found. This can be a number, which applies to
+            every search, or a dictionary with the limit for some of
+            the searches. None or 0 means there's no limit.
+        :param namespaces: A dictionary mapping the namespace prefixes
+            used in the CSS selectors to namespace URIs, as with
+            `Tag.select`.
+        :return: A dictionary with the same keys as ``queries``, where
+            each value is a `ResultSet` of that search's matches, in
+            document order.
+        """
+        results: Dict[str, _QueryResults] = {}
+
+        # For each search that's still going on: the match function,
+        # whether it can only match tags, its limit, and its results.
+        active: List[Tuple[Callable[[PageElement], Any], bool, int, _QueryResults]] = []
+        for key, query in queries.items():
+            if isinstance(limit, Mapping):
+                query_limit = limit.get(key) or 0
+            else:
+                query_limit = limit or 0
+            found: _QueryResults
+            if isinstance(query, str):
+                if ":scope" in query:
+                    # This selector depends on where the search
+                    # started, so it can't be checked against one
+                    # element at a time.
+                    results[key] = self.select(query, namespaces, query_limit)
+                    continue
+                match = self.css.compile(query, namespaces).match
+                tags_only = True
+                found = ResultSet(None)
+            else:
+                match = query.compile()
+                tags_only = False
+                found = ResultSet(query)
+            results[key] = found
+            active.append((match, tags_only, query_limit, found))
+
+        for element in self.descendants:
+            if not active:
+                break
+            is_tag = isinstance(element, Tag)
+            finished = False
+            for match, tags_only, query_limit, found in active:
+                if (is_tag or not tags_only) and element and match(element):
+                    found.append(element)
+                    if len(found) == query_limit:
+                        finished = True
+            if finished:
+                active = [x for x in active if not x[2] or len(x[3]) < x[2]]
+        return results
+
     # Generator methods
     @property
     def children(self) -> Iterator[PageElement]:
@@ -2758,7 +3925,9 @@ class Tag(PageElement):
         """Iterate over this `Tag` and its children in a
         breadth-first sequence.
         """
-        return self._self_and(self.descendants)
+        if not self.hidden:
+            yield self
+        yield from self.descendants
 
     @property
     def descendants(self) -> Iterator[PageElement]:
@@ -2767,6 +3936,7 @@ class Tag(PageElement):
         """
         if not len(self.contents):
             return
+        self._flush_tree_batch()
         # _last_descendant() can't return None here because
         # accept_self is True. Worst case, last_descendant will end up
         # as self.
@@ -2855,6 +4025,90 @@ class Tag(PageElement):
         return self.has_attr(key)
 
 
+_ElementCopier = Callable[[Any, Tag], PageElement]
+
+# The functions that Tag.__deepcopy__ uses to copy the elements of
+# each class, or None for a class whose elements have to be copied
+# with their own __deepcopy__.
+_fast_copiers: Dict[type, Optional[_ElementCopier]] = {}
+
+
+def _fast_copier(cls: type) -> Optional[_ElementCopier]:
+    """Find a function that copies an element of the given class by
+    setting its attributes directly, instead of going through its
+    constructor.
+
+    That's only possible for a class that doesn't override any of the
+    methods involved in copying an element.
+
+    :meta private:
+    """
+    copier: Optional[_ElementCopier] = None
+    if issubclass(cls, Tag):
+        if (
+            cls.__init__ is Tag.__init__
+            and cls.copy_self is Tag.copy_self
+            and cls.__deepcopy__ is Tag.__deepcopy__
+        ):
+            copier = _copy_tag
+    elif issubclass(cls, NavigableString):
+        if (
+            cls.__new__ is NavigableString.__new__
+            and cls.__init__ is NavigableString.__init__
+            and cls.__deepcopy__ is NavigableString.__deepcopy__
+        ):
+            copier = _copy_string
+    _fast_copiers[cls] = copier
+    return copier
+
+
+def _copy_tag(tag: Tag, parent: Tag) -> Tag:
+    """Make the same copy of a `Tag` as `Tag.copy_self`, given a copy
+    of its parent. The caller connects the copy to the tree.
+
+    :meta private:
+    """
+    clone = Tag.__new__(type(tag))
+    is_xml = tag.known_xml
+    if is_xml is None:
+        # The copy of the parent knows what the original tag would
+        # have found out by asking its parent.
+        is_xml = parent.known_xml
+    clone.parser_class = None
+    clone.name = tag.name
+    clone.namespace = tag.namespace
+    clone._namespaces = tag._namespaces or {}
+    clone.prefix = tag.prefix
+    clone.sourceline = tag.sourceline
+    clone.sourcepos = tag.sourcepos
+    attrs: AttributeDict = XMLAttributeDict() if is_xml else HTMLAttributeDict()
+    for key, value in tag.attrs.items():
+        if isinstance(value, list):
+            value = value.__class__(value)
+        attrs[key] = value
+    clone.attrs = attrs
+    clone.known_xml = is_xml
+    clone._profile = tag._profile
+    clone.contents = []
+    clone.hidden = tag.hidden
+    clone._fingerprint = None
+    clone._render_cache = None
+    clone._positions = None
+    return clone
+
+
+def _copy_string(string: NavigableString, parent: Tag) -> NavigableString:
+    """Make the same copy of a `NavigableString` as
+    `NavigableString.__deepcopy__`. The caller connects the copy to
+    the tree.
+
+    :meta private:
+    """
+    clone = str.__new__(type(string), string)
+    clone.hidden = False
+    return clone
+
+
 _PageElementT = TypeVar("_PageElementT", bound=PageElement)
 
 
@@ -2872,6 +4126,26 @@ class ResultSet(List[_PageElementT], Generic[_PageElementT]):
         super(ResultSet, self).__init__(result)
         self.source = source
 
+    def get_text(
+        self,
+        separator: str = "",
+        strip: bool = False,
+        types: Iterable[Type[NavigableString]] = PageElement.default,
+        collapse_whitespace: bool = False,
+        layout: str = "inline",
+    ) -> List[str]:
+        """Get the text of every element in this ResultSet.
+
+        The arguments are the same as for `PageElement.get_text`.
+
+        :return: A list containing one string for each element, the
+            same as calling `PageElement.get_text` on each one.
+        """
+        return [
+            element.get_text(separator, strip, types, collapse_whitespace, layout)
+            for element in self
+        ]
+
     def __getattr__(self, key: str) -> None:
         """Raise a helpful exception to explain a common code fix."""
         raise AttributeError(
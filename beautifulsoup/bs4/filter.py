@@ -25,6 +25,7 @@ from bs4.element import (
     Tag,
 )
 from bs4._typing import (
+    _AllowTagCreationFunction,
     _AtMostOneElement,
     _AttributeValue,
     _OneElement,
@@ -105,20 +106,37 @@ class ElementFilter(object):
             return True
         return self.match_function(element)
 
+    def compile(self) -> _PageElementMatchFunction:
+        """Get a function that gives the same answers as
+        `ElementFilter.match`, but may be faster, because it was built
+        for this filter in particular.
+
+        This is called once at the start of every search, so whatever
+        work it does is shared by all the elements being checked.
+        The base implementation just returns `ElementFilter.match`.
+        """
+        return self.match
+
+    def _compile_tag_creation(self) -> _AllowTagCreationFunction:
+        """Get a function that gives the same answers as
+        `ElementFilter.allow_tag_creation`.
+
+        This is called once at the start of parsing a document.
+
+        :meta private:
+        """
+        return self.allow_tag_creation
+
     def filter(self, generator: Iterator[PageElement]) -> Iterator[_OneElement]:
         """The most generic search method offered by Beautiful Soup.
 
         Acts like Python's built-in `filter`, using
         `ElementFilter.match` as the filtering function.
         """
-        while True:
-            try:
-                i = next(generator)
-            except StopIteration:
-                break
-            if i:
-                if self.match(i):
-                    yield cast("_OneElement", i)
+        match = self.compile()
+        for i in generator:
+            if i and match(i):
+                yield cast("_OneElement", i)
 
     def find(self, generator: Iterator[PageElement]) -> _AtMostOneElement:
         """A lower-level equivalent of :py:meth:`Tag.find`.
@@ -310,6 +328,129 @@ class StringMatchRule(MatchRule):
     function: Optional[_StringMatchFunction]
 
 
+def _compile_value_rules(
+    rules: Sequence[MatchRule],
+) -> Callable[[Optional[str]], bool]:
+    """Combine a list of `MatchRule` into one function that does the
+    same job as calling `MatchRule.matches_string` on each rule until
+    one of them matches.
+
+    Exact strings are looked up in a set, and user-defined functions
+    are only called if nothing else matched.
+    """
+    strings = frozenset(rule.string for rule in rules if rule.string is not None)
+    patterns = [rule.pattern for rule in rules if rule.pattern is not None]
+    functions = [rule.function for rule in rules if rule.function is not None]
+    present = any(rule.present is True for rule in rules)
+    absent = any(rule.present is False for rule in rules)
+
+    if not (patterns or functions or present or absent):
+        # The most common case: a list of strings, or just one.
+        def match_strings(value: Optional[str]) -> bool:
+            try:
+                return value in strings
+            except TypeError:
+                # An unhashable value can't be equal to a string.
+                return False
+
+        return match_strings
+
+    def match(value: Optional[str]) -> bool:
+        if value is None:
+            if absent:
+                return True
+        else:
+            if present:
+                return True
+            try:
+                if value in strings:
+                    return True
+            except TypeError:
+                pass
+            for pattern in patterns:
+                if pattern.search(value) is not None:
+                    return True
+        for function in functions:
+            if function(value):
+                return True
+        return False
+
+    return match
+
+
+def _compile_attribute_rules(
+    rules: Sequence[AttributeValueMatchRule],
+) -> Callable[[Optional[_AttributeValue]], bool]:
+    """Combine the rules for one attribute into a function that does
+    the same job as `SoupStrainer._attribute_match`.
+    """
+    value_matches = _compile_value_rules(rules)
+
+    def match(value: Optional[_AttributeValue]) -> bool:
+        if isinstance(value, list):
+            for item in value:
+                if value_matches(item):
+                    return True
+            # Try again, treating the attribute value as a single
+            # string.
+            if len(value) > 1:
+                return value_matches(" ".join(value))
+            return False
+        return value_matches(value)
+
+    return match
+
+
+def _compile_name_rules(
+    rules: Sequence[TagNameMatchRule],
+) -> Optional[Callable[[Any, str, Optional[str]], bool]]:
+    """Combine a list of `TagNameMatchRule` into one function.
+
+    The function takes the object to pass into any user-defined
+    functions (a `Tag`, or the name of a tag that hasn't been created
+    yet), the tag's name, and its prefixed name (or None), and returns
+    True if any rule matches either name.
+
+    :return: None if every tag name will match.
+    """
+    if any(rule.present is True for rule in rules):
+        return None
+    strings = frozenset(rule.string for rule in rules if rule.string is not None)
+    patterns = [rule.pattern for rule in rules if rule.pattern is not None]
+    functions = [rule.function for rule in rules if rule.function is not None]
+
+    def match(obj: Any, name: str, prefixed_name: Optional[str]) -> bool:
+        if name in strings or (
+            prefixed_name is not None and prefixed_name in strings
+        ):
+            return True
+        for pattern in patterns:
+            if pattern.search(name) is not None or (
+                prefixed_name is not None
+                and pattern.search(prefixed_name) is not None
+            ):
+                return True
+        for function in functions:
+            if function(obj) or (
+                prefixed_name is not None and function(prefixed_name)
+            ):
+                return True
+        return False
+
+    return match
+
+
+def _rule_cost(rules: Sequence[MatchRule]) -> int:
+    """Roughly how expensive is it to check these rules? Used to
+    decide which rules to check first.
+    """
+    if any(rule.function is not None for rule in rules):
+        return 2
+    if any(rule.pattern is not None for rule in rules):
+        return 1
+    return 0
+
+
 class SoupStrainer(ElementFilter):
     """The `ElementFilter` subclass used internally by Beautiful Soup.
 
@@ -647,6 +788,129 @@ class SoupStrainer(ElementFilter):
                 return True
         return False
 
+    def compile(self) -> _PageElementMatchFunction:
+        """Build a function that gives the same answers as
+        `SoupStrainer.match`, but faster.
+
+        The rules are combined into a single function: tag names and
+        attribute values that must match exactly are looked up in
+        sets, the cheapest checks are made first, and `Tag.string`
+        is only calculated if everything else matched. Every search
+        done by a method like `Tag.find_all` compiles its
+        `SoupStrainer` this way.
+
+        If a subclass overrides `SoupStrainer.match` or
+        `SoupStrainer.matches_tag`, this returns the subclass's
+        `SoupStrainer.match` instead.
+        """
+        cls = type(self)
+        if (
+            cls.match is not SoupStrainer.match
+            or cls.matches_tag is not SoupStrainer.matches_tag
+        ):
+            return self.match
+
+        string_matches: Optional[Callable[[Optional[str]], bool]] = None
+        if self.string_rules:
+            string_matches = _compile_value_rules(self.string_rules)
+
+        if not self.name_rules and not self.attribute_rules:
+            # Only a NavigableString can match.
+            if string_matches is None:
+                return lambda element: False
+            only_strings = string_matches
+
+            def match_string(element: PageElement) -> bool:
+                return not isinstance(element, Tag) and only_strings(element)
+
+            return match_string
+
+        # Tag names that must match exactly are checked right here;
+        # any other kind of name rule is only checked if none of
+        # those match.
+        check_names = bool(self.name_rules) and not any(
+            rule.present is True for rule in self.name_rules
+        )
+        names = frozenset(
+            rule.string for rule in self.name_rules if rule.string is not None
+        )
+        other_name_matches = None
+        other_name_rules = [rule for rule in self.name_rules if rule.string is None]
+        if other_name_rules:
+            other_name_matches = _compile_name_rules(other_name_rules)
+
+        attribute_checks = [
+            (attr, _compile_attribute_rules(rules))
+            for attr, rules in sorted(
+                self.attribute_rules.items(), key=lambda item: _rule_cost(item[1])
+            )
+        ]
+
+        def match(element: PageElement) -> bool:
+            if not isinstance(element, Tag):
+                return False
+            if check_names:
+                name = element.name
+                if name not in names:
+                    prefix = element.prefix
+                    prefixed_name = f"{prefix}:{name}" if prefix else None
+                    if prefixed_name is None or prefixed_name not in names:
+                        if other_name_matches is None or not other_name_matches(
+                            element, name, prefixed_name
+                        ):
+                            return False
+            if attribute_checks:
+                get = element.get
+                for attr, attribute_matches in attribute_checks:
+                    if not attribute_matches(get(attr)):
+                        return False
+            if string_matches is not None:
+                string = element.string
+                if string is None or not string_matches(string):
+                    return False
+            return True
+
+        return match
+
+    def _compile_tag_creation(self) -> _AllowTagCreationFunction:
+        """Build a function that gives the same answers as
+        `SoupStrainer.allow_tag_creation`, the same way
+        `SoupStrainer.compile` does for `SoupStrainer.match`.
+
+        :meta private:
+        """
+        if type(self).allow_tag_creation is not SoupStrainer.allow_tag_creation:
+            return self.allow_tag_creation
+        if self.string_rules:
+            return lambda nsprefix, name, attrs: False
+
+        name_matches = None
+        if self.name_rules:
+            name_matches = _compile_name_rules(self.name_rules)
+        attribute_checks = [
+            (attr, _compile_attribute_rules(rules))
+            for attr, rules in sorted(
+                self.attribute_rules.items(), key=lambda item: _rule_cost(item[1])
+            )
+        ]
+
+        def allow_tag_creation(
+            nsprefix: Optional[str], name: str, attrs: Optional[_RawAttributeValues]
+        ) -> bool:
+            if name_matches is not None:
+                prefixed_name = f"{nsprefix}:{name}" if nsprefix else None
+                if not name_matches(name, name, prefixed_name):
+                    return False
+            if attribute_checks:
+                if attrs is None:
+                    attrs = AttributeDict()
+                for attr, attribute_matches in attribute_checks:
+                    if not attribute_matches(attrs.get(attr)):
+                        return False
+            return True
+
+        return allow_tag_creation
+
     def match(self, element: PageElement) -> bool:
         """Does the given `PageElement` match the rules set down by this
         `SoupStrainer`?
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import re
 from typing import Callable, Dict, Iterable, Optional, Set, Tuple, TYPE_CHECKING, Union
 from typing_extensions import TypeAlias
 from bs4.dammit import EntitySubstitution
@@ -27,6 +28,9 @@ class Formatter(EntitySubstitution):
                         Beautiful Soup 4.13.0.
      * 'minimal' - Only make the substitutions necessary to guarantee
                    valid HTML.
+     * 'minify' - Like 'minimal', but also leave out whitespace and
+                  quotation marks that make no difference to how the
+                  document is displayed.
      * None - Do not perform any substitution. This will be faster
               but may result in invalid markup.
 
@@ -49,12 +53,91 @@ class Formatter(EntitySubstitution):
     #: markup language is HTML.
     HTML_DEFAULTS: Dict[str, Set[str]] = dict(
         cdata_containing_tags=set(["script", "style"]),
+        block_elements=set(
+            [
+                "address",
+                "article",
+                "aside",
+                "blockquote",
+                "body",
+                "br",
+                "caption",
+                "dd",
+                "details",
+                "dialog",
+                "div",
+                "dl",
+                "dt",
+                "fieldset",
+                "figcaption",
+                "figure",
+                "footer",
+                "form",
+                "h1",
+                "h2",
+                "h3",
+                "h4",
+                "h5",
+                "h6",
+                "head",
+                "header",
+                "hgroup",
+                "hr",
+                "html",
+                "legend",
+                "li",
+                "main",
+                "menu",
+                "nav",
+                "ol",
+                "p",
+                "pre",
+                "section",
+                "summary",
+                "table",
+                "tbody",
+                "td",
+                "tfoot",
+                "th",
+                "thead",
+                "title",
+                "tr",
+                "ul",
+            ]
+        ),
     )
 
+    #: A run of whitespace, as HTML defines it. This doesn't include
+    #: characters like the non-breaking space, which are never
+    #: collapsed by a browser.
+    HTML_WHITESPACE_RE = re.compile("[ \t\n\r\f]+")
+
+    #: Tags whose whitespace-only strings are never displayed, such
+    #: as the whitespace between two <meta> tags in a <head>.
+    IGNORED_WHITESPACE_CONTAINERS: Set[str] = set(
+        [
+            "colgroup",
+            "dl",
+            "head",
+            "html",
+            "ol",
+            "table",
+            "tbody",
+            "tfoot",
+            "thead",
+            "tr",
+            "ul",
+        ]
+    )
+
+    #: An attribute value that doesn't need to be quoted.
+    UNQUOTED_ATTRIBUTE_VALUE_RE = re.compile("[^ \t\n\r\f\"'=<>`]+")
+
     language: Optional[str]  #: :meta private:
     entity_substitution: Optional[_EntitySubstitutionFunction]  #: :meta private:
     void_element_close_prefix: str  #: :meta private:
     cdata_containing_tags: Set[str]  #: :meta private:
+    block_elements: Set[str]  #: :meta private:
     indent: str  #: :meta private:
 
     #: If this is set to true by the constructor, then attributes whose
@@ -63,6 +146,11 @@ class Formatter(EntitySubstitution):
     #: rendered this way.)
     empty_attributes_are_booleans: bool
 
+    #: If this is set to true by the constructor, then whitespace and
+    #: quotation marks that make no difference to how an HTML document
+    #: is displayed will be left out of the output.
+    minify: bool
+
     def _default(
         self, language: str, value: Optional[Set[str]], kwarg: str
     ) -> Set[str]:
@@ -84,6 +172,8 @@ class Formatter(EntitySubstitution):
         cdata_containing_tags: Optional[Set[str]] = None,
         empty_attributes_are_booleans: bool = False,
         indent: int = 1,
+        minify: bool = False,
+        block_elements: Optional[Set[str]] = None,
     ):
         r"""Constructor.
 
@@ -113,7 +203,18 @@ class Formatter(EntitySubstitution):
             level. If indent is a string (such as "\t"), that string
             is used to indent each level. The default behavior is to
             indent one space per level.
-
+        :param minify: If this is true, runs of whitespace in strings
+            are collapsed into a single space, whitespace next to the
+            start or end of a block-level element is left out, and
+            attribute values are only quoted if they need to be. This
+            is done as the tree is written out, so the tree itself
+            isn't changed. Whitespace inside tags like <pre>, and
+            inside any string that's not a plain `NavigableString`,
+            is left alone.
+        :param block_elements: The set of tags that a browser displays
+           as blocks of their own, for the purposes of `minify`. Any
+           other tag is assumed to be displayed inline, where the
+           whitespace around it matters.
         """
         self.language = language or self.HTML
         self.entity_substitution = entity_substitution
@@ -122,6 +223,10 @@ class Formatter(EntitySubstitution):
             self.language, cdata_containing_tags, "cdata_containing_tags"
         )
         self.empty_attributes_are_booleans = empty_attributes_are_booleans
+        self.minify = minify
+        self.block_elements = self._default(
+            self.language, block_elements, "block_elements"
+        )
         if indent is None:
             indent = 0
         indent_str: str
@@ -146,13 +251,10 @@ class Formatter(EntitySubstitution):
         """
         if not self.entity_substitution:
             return ns
-        from .element import NavigableString
-
-        if (
-            isinstance(ns, NavigableString)
-            and ns.parent is not None
-            and ns.parent.name in self.cdata_containing_tags
-        ):
+        # Only a NavigableString has a parent. Looking for one is a lot
+        # cheaper than importing NavigableString on every call.
+        parent = getattr(ns, "parent", None)
+        if parent is not None and parent.name in self.cdata_containing_tags:
             # Do nothing.
             return ns
         # Substitute.
@@ -167,6 +269,74 @@ class Formatter(EntitySubstitution):
         """
         return self.substitute(value)
 
+    def quoted_attribute(self, value: str) -> str:
+        """Put quotation marks around an attribute value that has
+        already been through `Formatter.attribute_value`.
+
+        When minifying, the quotation marks are left out if the HTML
+        standard allows it. (This is never done if
+        `void_element_close_prefix` is set, since a value at the end
+        of a void element would run into the slash.)
+        """
+        if (
+            self.minify
+            and not self.void_element_close_prefix
+            and self.UNQUOTED_ATTRIBUTE_VALUE_RE.fullmatch(value) is not None
+        ):
+            return value
+        return self.quoted_attribute_value(value)
+
+    def minified_string(self, string: bs4.element.NavigableString) -> str:
+        """Prepare a string for output with insignificant whitespace
+        taken out.
+
+        Runs of whitespace are collapsed into a single space. A space
+        at the start or end of the string is dropped altogether if it
+        comes next to the start or end of a block-level element (see
+        `block_elements`), since a browser won't display it. Whitespace
+        between two inline elements, as in "<b>a</b> <i>b</i>", is
+        kept. A string that's nothing but whitespace, inside one of the
+        `IGNORED_WHITESPACE_CONTAINERS`, is dropped.
+
+        This is only called on plain `NavigableString` objects outside
+        of tags like <pre>; everything else is output as usual. A string
+        inside a tag like <script> is also output as usual.
+        """
+        parent = string.parent
+        if parent is not None and parent.name in self.cdata_containing_tags:
+            return string.output_ready(self)
+        text = self.HTML_WHITESPACE_RE.sub(" ", string)
+        if (
+            text == " "
+            and parent is not None
+            and self.language == self.HTML
+            and parent.name in self.IGNORED_WHITESPACE_CONTAINERS
+        ):
+            return ""
+        if text[:1] == " " and self._at_block_boundary(
+            string.previous_sibling, parent
+        ):
+            text = text[1:]
+        if text[-1:] == " " and self._at_block_boundary(string.next_sibling, parent):
+            text = text[:-1]
+        return self.substitute(text)
+
+    def _at_block_boundary(
+        self,
+        neighbor: Optional[bs4.element.PageElement],
+        parent: Optional[bs4.element.Tag],
+    ) -> bool:
+        """Is whitespace next to `neighbor`, inside `parent`, going to be
+        dropped by a browser?
+        """
+        if neighbor is None:
+            # The string is at the start or end of its parent.
+            return (
+                parent is None or parent.hidden or parent.name in self.block_elements
+            )
+        # A NavigableString's name is None, which is never a block element.
+        return neighbor.name in self.block_elements
+
     def attributes(
         self, tag: bs4.element.Tag
     ) -> Iterable[Tuple[str, Optional[_AttributeValue]]]:
@@ -202,6 +372,8 @@ class HTMLFormatter(Formatter):
         cdata_containing_tags: Optional[Set[str]] = None,
         empty_attributes_are_booleans: bool = False,
         indent: int = 1,
+        minify: bool = False,
+        block_elements: Optional[Set[str]] = None,
     ):
         super(HTMLFormatter, self).__init__(
             self.HTML,
@@ -209,6 +381,8 @@ class HTMLFormatter(Formatter):
             void_element_close_prefix,
             cdata_containing_tags,
             empty_attributes_are_booleans,
+            minify=minify,
+            block_elements=block_elements,
         )
 
 
@@ -252,6 +426,12 @@ HTMLFormatter.REGISTRY["html5-4.12"] = HTMLFormatter(
 HTMLFormatter.REGISTRY["minimal"] = HTMLFormatter(
     entity_substitution=EntitySubstitution.substitute_xml
 )
+HTMLFormatter.REGISTRY["minify"] = HTMLFormatter(
+    entity_substitution=EntitySubstitution.substitute_xml,
+    void_element_close_prefix="",
+    empty_attributes_are_booleans=True,
+    minify=True,
+)
 HTMLFormatter.REGISTRY[None] = HTMLFormatter(entity_substitution=None)
 XMLFormatter.REGISTRY["html"] = XMLFormatter(
     entity_substitution=EntitySubstitution.substitute_html
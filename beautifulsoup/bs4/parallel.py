@@ -0,0 +1,262 @@
+"""Parse a large number of documents at once, using a pool of worker
+processes.
+
+Call `parse_many` with an iterable of documents and a function that
+pulls the information you need out of a `BeautifulSoup` object. Each
+worker process parses documents and runs the function, and only the
+return values of the function are sent back, so the parse trees
+never need to be pickled.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+import os
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    TYPE_CHECKING,
+)
+
+from bs4.builder import builder_registry, TreeBuilder
+from bs4.exceptions import FeatureNotFound, ParserRejectedMarkup
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4._typing import _RawMarkup
+    from bs4.filter import SoupStrainer
+
+
+class ParseResult(NamedTuple):
+    """The outcome of parsing one of the documents passed into
+    `parse_many`.
+    """
+
+    #: The position of the document in the input.
+    index: int
+
+    #: The return value of the extraction function, or the
+    #: `BeautifulSoup` object itself if there was no extraction
+    #: function. None if the document couldn't be parsed.
+    result: Any
+
+    #: If the document couldn't be parsed, the exception that was
+    #: raised.
+    error: Optional[BaseException]
+
+
+#: These arguments to `parse_many` are passed into the
+#: `BeautifulSoup` constructor; the rest go to the tree builder.
+_SOUP_ARGUMENTS = ("from_encoding", "exclude_encodings", "element_classes", "replacer")
+
+
+class _BatchParser(object):
+    """Parses documents with a single `TreeBuilder`, which is reused
+    for every document.
+    """
+
+    def __init__(
+        self,
+        builder_class: Type[TreeBuilder],
+        builder_kwargs: Dict[str, Any],
+        soup_kwargs: Dict[str, Any],
+        parse_only: Optional[SoupStrainer],
+        extract: Optional[Callable[[BeautifulSoup], Any]],
+        catch: Tuple[Type[BaseException], ...],
+    ):
+        self.builder = builder_class(**builder_kwargs)
+        self.soup_kwargs = soup_kwargs
+        self.parse_only = parse_only
+        self.extract = extract
+        self.catch = catch
+
+    def parse(self, batch: Sequence[Tuple[int, _RawMarkup]]) -> List[ParseResult]:
+        # Import here to avoid circular import
+        from bs4 import BeautifulSoup
+
+        results = []
+        for index, markup in batch:
+            try:
+                soup = BeautifulSoup(
+                    markup,
+                    builder=self.builder,
+                    parse_only=self.parse_only,
+                    **self.soup_kwargs,
+                )
+                result = soup if self.extract is None else self.extract(soup)
+            except self.catch as e:
+                results.append(ParseResult(index, None, e))
+            else:
+                results.append(ParseResult(index, result, None))
+            finally:
+                # If the markup was rejected, the builder still has a
+                # reference to the half-built BeautifulSoup object.
+                self.builder.soup = None
+        return results
+
+
+# The _BatchParser used by the current worker process.
+_worker: Optional[_BatchParser] = None
+
+
+def _start_worker(*args: Any) -> None:
+    global _worker
+    _worker = _BatchParser(*args)
+
+
+def _parse_in_worker(batch: Sequence[Tuple[int, _RawMarkup]]) -> List[ParseResult]:
+    assert _worker is not None
+    return _worker.parse(batch)
+
+
+def _batches(
+    markups: Iterable[_RawMarkup], size: int
+) -> Iterator[List[Tuple[int, _RawMarkup]]]:
+    batch: List[Tuple[int, _RawMarkup]] = []
+    for item in enumerate(markups):
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_many(
+    markups: Iterable[_RawMarkup],
+    extract: Optional[Callable[[BeautifulSoup], Any]] = None,
+    features: Optional[Union[str, Sequence[str]]] = None,
+    workers: Optional[int] = None,
+    parse_only: Optional[SoupStrainer] = None,
+    ordered: bool = True,
+    chunksize: int = 1,
+    catch: Tuple[Type[BaseException], ...] = (ParserRejectedMarkup,),
+    **kwargs: Any,
+) -> Iterator[ParseResult]:
+    """Parse many documents in parallel, using a pool of worker processes.
+
+    Each document is parsed in a worker process and passed into
+    ``extract``; the return value is sent back as the `ParseResult.result`
+    of a `ParseResult`::
+
+        def title(soup):
+            return soup.title.get_text()
+
+        for r in parse_many(pages, title, features="lxml", workers=8):
+            if r.error is None:
+                titles[r.index] = r.result
+
+    ``extract``, ``parse_only`` and the other arguments must all be
+    picklable, so ``extract`` should be a module-level function, not
+    a lambda. ``extract`` should return plain Python objects: a `Tag`
+    or `NavigableString` is connected to the rest of its parse tree,
+    and the whole tree would be pickled along with it. The documents are consumed lazily, and only a few
+    batches of documents are waiting to be parsed at any one time.
+
+    Each worker process looks up its tree builder once and uses it for
+    every document it parses.
+
+    :param markups: The documents, as strings or bytestrings.
+    :param extract: A function that takes a `BeautifulSoup` object and
+        returns some small, picklable value. If this is None, the
+        `BeautifulSoup` objects themselves are pickled and sent back,
+        which is a lot slower.
+    :param features: The tree builder to use, as with the
+        `BeautifulSoup` constructor.
+    :param workers: The number of worker processes. Defaults to the
+        number of CPUs. If this is 1 or less, the documents are parsed
+        in this process, which is useful for debugging.
+    :param parse_only: A `SoupStrainer` to use for every document.
+    :param ordered: If this is True, results are yielded in the same
+        order as the documents. If it's False, results are yielded as
+        soon as they're ready.
+    :param chunksize: Send documents to the workers in batches of this
+        size. Larger batches mean less communication overhead when the
+        documents are small.
+    :param catch: If parsing a document or calling ``extract`` raises
+        one of these exceptions, it's captured as the
+        `ParseResult.error` for that document. Any other exception is
+        propagated, and stops the whole batch.
+    :param kwargs: Other arguments to the `BeautifulSoup` constructor,
+        such as ``from_encoding``, or arguments to the tree builder.
+    :raise FeatureNotFound: If no tree builder has the given features.
+    """
+    # Import here to avoid circular import
+    from bs4 import BeautifulSoup
+
+    if isinstance(features, str):
+        features = [features]
+    if not features:
+        features = BeautifulSoup.DEFAULT_BUILDER_FEATURES
+    builder_class = builder_registry.lookup(*features)
+    if builder_class is None:
+        raise FeatureNotFound(
+            "Couldn't find a tree builder with the features you "
+            "requested: %s. Do you need to install a parser library?"
+            % ",".join(features)
+        )
+    soup_kwargs = {}
+    for name in _SOUP_ARGUMENTS:
+        if name in kwargs:
+            soup_kwargs[name] = kwargs.pop(name)
+    args = (builder_class, kwargs, soup_kwargs, parse_only, extract, catch)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = _batches(markups, max(chunksize, 1))
+    if workers <= 1:
+        parser = _BatchParser(*args)
+        for batch in batches:
+            yield from parser.parse(batch)
+        return
+
+    # Keep every worker busy, but don't read the whole input at once.
+    window = workers * 2
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_start_worker, initargs=args
+    )
+    queue: Deque[Future[List[ParseResult]]] = deque()
+    pending: Set[Future[List[ParseResult]]] = set()
+    try:
+        for batch in batches:
+            future = executor.submit(_parse_in_worker, batch)
+            if ordered:
+                queue.append(future)
+                if len(queue) >= window:
+                    yield from queue.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+        while queue:
+            yield from queue.popleft().result()
+        for future in as_completed(pending):
+            yield from future.result()
+    finally:
+        # If we stopped early, don't wait for work nobody will look at.
+        for future in queue:
+            future.cancel()
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
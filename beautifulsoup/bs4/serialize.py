@@ -0,0 +1,496 @@
+"""A compact binary format for parse trees.
+
+`Tag.dumps` turns a `Tag` (or a whole `BeautifulSoup` object) into a
+bytestring, and `loads` turns it back into an equivalent tree. This
+is much faster than rendering a tree as markup and parsing it again,
+which is how pickling used to work, so it's suitable for caching
+parsed documents and sending them between processes.
+
+The tree is stored as an array of integers describing each node in
+document order, plus a table of all the distinct strings (attribute
+names and values, and text) used in the tree, and a table of the
+distinct kinds of tag (name, namespace, class, and so on). Nothing is
+tokenized when the tree is loaded; the nodes are created directly
+and connected to each other.
+
+A few objects that are shared by many nodes, such as the `TagProfile`
+objects that describe how a tree builder treats each tag, are stored
+with :py:mod:`pickle`, and only the classes Beautiful Soup uses to
+build a parse tree can be loaded from them. Even so, you should only
+load data you created yourself.
+"""
+
+from __future__ import annotations
+
+from array import array
+import copy
+from io import BytesIO
+import pickle
+import sys
+from types import MappingProxyType
+from typing import (
+    Any,
+    cast,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
+
+from bs4.builder import TreeBuilder
+from bs4.builder._htmlparser import HTMLParserTreeBuilder
+from bs4.element import (
+    AttributeDict,
+    AttributeValueList,
+    AttributeValueWithCharsetSubstitution,
+    HTMLAttributeDict,
+    NamespacedAttribute,
+    NavigableString,
+    PageElement,
+    Tag,
+    TagProfile,
+    XMLAttributeDict,
+)
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+#: Every serialized tree starts with these bytes.
+MAGIC: bytes = b"bs4tree"
+
+#: The version of the format written by `dumps`. `loads` can only
+#: read this version.
+FORMAT_VERSION: int = 1
+
+# Tags and strings are described by a sequence of integers, in
+# document order. A tag is described by:
+#
+#  * An index into the table of tag kinds (see _Writer.tag_kind)
+#  * The number of attributes, then each attribute's key and value
+#  * The number of children
+#
+# A string is described by the index of its class in the table of
+# string classes (as a negative number) and the index of its text in
+# the string table.
+#
+# Each tag's sourceline and sourcepos are stored separately, since
+# they're frequently much larger numbers, or missing altogether.
+#
+# An attribute key or value is an index into the string table, or one
+# of these:
+_NONE = -1
+_LIST = -2  # Then a class, a length, and the items of the list.
+_FIRST_OBJECT = -3  # And below: an object in the object table.
+
+# Only these classes (and their subclasses) can be loaded.
+_LOADABLE_CLASSES = (
+    PageElement,
+    TreeBuilder,
+    TagProfile,
+    AttributeDict,
+    AttributeValueList,
+    AttributeValueWithCharsetSubstitution,
+    NamespacedAttribute,
+)
+
+# These other objects may be needed to recreate a tree builder or a
+# TagProfile.
+_LOADABLE_OBJECTS = {
+    ("builtins", "dict"),
+    ("builtins", "frozenset"),
+    ("builtins", "list"),
+    ("builtins", "set"),
+    ("collections", "defaultdict"),
+}
+
+
+class _Writer(object):
+    """Builds the tables and the node array for one tree."""
+
+    def __init__(self) -> None:
+        self.nodes: List[int] = []
+        self.positions: List[int] = []
+        self.strings: List[str] = []
+        self.string_index: Dict[str, int] = {}
+        self.tag_kinds: List[Tuple[Any, ...]] = []
+        self.tag_kind_index: Dict[Tuple[Any, ...], int] = {}
+        self.string_classes: List[type] = []
+        self.string_class_index: Dict[type, int] = {}
+        self.objects: List[Any] = []
+        self.object_index: Dict[int, int] = {}
+
+    def string(self, value: str) -> int:
+        index = self.string_index.get(value)
+        if index is None:
+            index = self.string_index[value] = len(self.strings)
+            # Store a plain str, not a NavigableString that knows
+            # about the rest of the tree.
+            self.strings.append(str(value))
+        return index
+
+    def object(self, value: Any) -> int:
+        index = self.object_index.get(id(value))
+        if index is None:
+            index = self.object_index[id(value)] = len(self.objects)
+            self.objects.append(value)
+        return index
+
+    def attribute(self, value: Any) -> None:
+        nodes = self.nodes
+        if value is None:
+            nodes.append(_NONE)
+        elif type(value) is str:
+            nodes.append(self.string(value))
+        elif isinstance(value, AttributeValueList):
+            nodes.append(_LIST)
+            nodes.append(self.object(type(value)))
+            nodes.append(len(value))
+            for item in value:
+                nodes.append(self.string(item))
+        else:
+            nodes.append(_FIRST_OBJECT - self.object(value))
+
+    def tag_kind(self, tag: Tag) -> int:
+        """Find the index of everything about a tag that's likely to
+        be shared with other tags of the same name.
+        """
+        attrs_class: type = type(tag.attrs)
+        if attrs_class is MappingProxyType:
+            # This tag is part of a frozen document, but the tree
+            # created by loads() won't be.
+            attrs_class = XMLAttributeDict if tag._is_xml else HTMLAttributeDict
+        key = (
+            type(tag),
+            tag.parser_class,
+            tag.name,
+            tag.prefix,
+            tag.namespace,
+            id(tag._namespaces) if tag._namespaces else None,
+            id(tag._profile),
+            attrs_class,
+            tag.hidden,
+            tag.known_xml,
+        )
+        index = self.tag_kind_index.get(key)
+        if index is None:
+            index = self.tag_kind_index[key] = len(self.tag_kinds)
+            self.tag_kinds.append(
+                (
+                    type(tag),
+                    tag.parser_class,
+                    tag.name,
+                    tag.prefix,
+                    tag.namespace,
+                    tag._namespaces or None,
+                    tag._profile,
+                    attrs_class,
+                    tag.hidden,
+                    tag.known_xml,
+                )
+            )
+        return index
+
+    def tag(self, tag: Tag) -> None:
+        nodes = self.nodes
+        nodes.append(self.tag_kind(tag))
+        self.positions.append(_NONE if tag.sourceline is None else tag.sourceline)
+        self.positions.append(_NONE if tag.sourcepos is None else tag.sourcepos)
+        nodes.append(len(tag.attrs))
+        for key, value in tag.attrs.items():
+            self.attribute(key)
+            self.attribute(value)
+        nodes.append(len(tag.contents))
+
+    def navigable_string(self, string: NavigableString) -> None:
+        cls = type(string)
+        index = self.string_class_index.get(cls)
+        if index is None:
+            index = self.string_class_index[cls] = len(self.string_classes)
+            self.string_classes.append(cls)
+        self.nodes.append(-1 - index)
+        self.nodes.append(self.string(string))
+
+    def tree(self, root: Tag) -> None:
+        # Visit the nodes in document order without making any
+        # recursive function calls.
+        todo: List[PageElement] = [root]
+        while todo:
+            element = todo.pop()
+            if isinstance(element, Tag):
+                self.tag(element)
+                todo.extend(reversed(element.contents))
+            else:
+                self.navigable_string(cast(NavigableString, element))
+
+    @classmethod
+    def pack(cls, numbers: List[int]) -> Tuple[str, bytes]:
+        """Store a list of numbers in the smallest possible array."""
+        if not numbers or max(numbers) == min(numbers) == _NONE:
+            return "h", b""
+        if min(numbers) < -32768 or max(numbers) > 32767:
+            typecode = "i"
+        else:
+            typecode = "h"
+        return typecode, array(typecode, numbers).tobytes()
+
+
+def dumps(tag: Tag) -> bytes:
+    """Serialize a `Tag`, its contents, and (if it's a
+    `BeautifulSoup` object) information about how it was parsed.
+
+    You'll probably want to call `Tag.dumps` instead.
+    """
+    # Import here to avoid circular import
+    from bs4 import BeautifulSoup
+
+    soup_state: Optional[Dict[str, Any]] = None
+    if isinstance(tag, BeautifulSoup):
+        builder: Optional[Union[TreeBuilder, Type[TreeBuilder]]]
+        if tag.builder is None:
+            builder = None
+        elif tag.builder.picklable:
+            builder = copy.copy(tag.builder)
+            builder.soup = None
+        else:
+            # Frequently a tree builder can't be pickled; we'll make
+            # a new one when the tree is loaded.
+            builder = type(tag.builder)
+        soup_state = dict(
+            builder=builder,
+            is_xml=tag.is_xml,
+            element_classes=tag.element_classes,
+            original_encoding=tag.original_encoding,
+            declared_html_encoding=tag.declared_html_encoding,
+            contains_replacement_characters=tag.contains_replacement_characters,
+        )
+
+    writer = _Writer()
+    writer.tree(tag)
+    payload = (
+        FORMAT_VERSION,
+        sys.byteorder,
+        writer.tag_kinds,
+        writer.string_classes,
+        writer.objects,
+        writer.strings,
+        writer.pack(writer.nodes),
+        writer.pack(writer.positions),
+        soup_state,
+    )
+    # Protocol 4 can be read by every version of Python that can run
+    # Beautiful Soup.
+    return MAGIC + pickle.dumps(payload, 4)
+
+
+class _Unpickler(pickle.Unpickler):
+    """An Unpickler that will only create the kinds of objects found
+    in a Beautiful Soup parse tree.
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        value = super(_Unpickler, self).find_class(module, name)
+        if (module, name) in _LOADABLE_OBJECTS or (
+            isinstance(value, type) and issubclass(value, _LOADABLE_CLASSES)
+        ):
+            return value
+        raise pickle.UnpicklingError(
+            f"{module}.{name} can't be part of a serialized parse tree."
+        )
+
+
+def loads(data: bytes) -> Tag:
+    """Rebuild a tree serialized by `Tag.dumps`.
+
+    :param data: A bytestring created by `Tag.dumps`.
+    :return: A `BeautifulSoup` object, if that's what was serialized,
+        or else a `Tag` that isn't part of any tree.
+    :raise ValueError: If ``data`` isn't a serialized parse tree.
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("This is not a serialized Beautiful Soup parse tree.")
+    try:
+        # BytesIO shares the bytestring's memory instead of copying it.
+        fh = BytesIO(data)
+        fh.seek(len(MAGIC))
+        payload = _Unpickler(fh).load()
+        version = payload[0]
+    except (pickle.UnpicklingError, EOFError, TypeError, ValueError) as e:
+        raise ValueError(f"Could not load serialized parse tree: {e}")
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f"Can't load version {version} of the serialized parse tree format."
+        )
+    (
+        _,
+        byteorder,
+        tag_kinds,
+        string_classes,
+        objects,
+        strings,
+        packed_nodes,
+        packed_positions,
+        soup_state,
+    ) = payload
+
+    def unpack(typecode: str, packed: bytes) -> List[int]:
+        numbers = array(typecode)
+        numbers.frombytes(packed)
+        if byteorder != sys.byteorder:
+            numbers.byteswap()
+        return numbers.tolist()
+
+    nodes = unpack(*packed_nodes)
+    positions = unpack(*packed_positions)
+    # The number of tags loaded so far.
+    tag_count = 0
+
+    new_tag = Tag.__new__
+    new_string = str.__new__
+
+    def attribute(pos: int) -> Tuple[Any, int]:
+        code = nodes[pos]
+        if code >= 0:
+            return strings[code], pos + 1
+        if code == _NONE:
+            return None, pos + 1
+        if code == _LIST:
+            end = pos + 3 + nodes[pos + 2]
+            value = objects[nodes[pos + 1]](strings[i] for i in nodes[pos + 3 : end])
+            return value, end
+        return objects[_FIRST_OBJECT - code], pos + 1
+
+    def tag(pos: int, element: Optional[Tag] = None) -> Tuple[Tag, int, int]:
+        nonlocal tag_count
+        (
+            cls,
+            parser_class,
+            name,
+            prefix,
+            namespace,
+            namespaces,
+            profile,
+            attrs_class,
+            hidden,
+            known_xml,
+        ) = tag_kinds[nodes[pos]]
+        if element is None:
+            element = new_tag(cls)
+            element.contents = []
+        element.parser_class = parser_class
+        element.name = name
+        element.prefix = prefix
+        element.namespace = namespace
+        element._namespaces = {} if namespaces is None else namespaces
+        element._profile = profile
+        element._fingerprint = None
+        element._render_cache = None
+        element._positions = None
+        element.hidden = hidden
+        element.known_xml = known_xml
+        if positions:
+            sourceline = positions[tag_count * 2]
+            sourcepos = positions[tag_count * 2 + 1]
+            element.sourceline = None if sourceline < 0 else sourceline
+            element.sourcepos = None if sourcepos < 0 else sourcepos
+        else:
+            element.sourceline = element.sourcepos = None
+        tag_count += 1
+        attribute_count = nodes[pos + 1]
+        pos += 2
+        attrs = attrs_class()
+        for i in range(attribute_count):
+            key, pos = attribute(pos)
+            value, pos = attribute(pos)
+            attrs[key] = value
+        element.attrs = attrs
+        element.next_element = element.previous_element = None
+        element.next_sibling = element.previous_sibling = None
+        element.parent = None
+        return element, nodes[pos], pos + 1
+
+    root: Tag
+    previous: PageElement
+    if soup_state is None:
+        root, child_count, pos = tag(0)
+        previous = root
+    else:
+        soup = _new_soup(tag_kinds[nodes[0]][0], soup_state)
+        root, child_count, pos = tag(0, soup)
+        # The BeautifulSoup object isn't part of the
+        # next_element/previous_element chain.
+        previous = root
+
+    # Each item on the stack is a Tag whose contents are still being
+    # loaded, and the number of children it has left to load.
+    stack: List[Tuple[Tag, int]] = []
+    parent = root
+    remaining = child_count
+    element: PageElement
+    while True:
+        if remaining == 0:
+            if not stack:
+                break
+            parent, remaining = stack.pop()
+            continue
+        remaining -= 1
+        code = nodes[pos]
+        if code >= 0:
+            element, child_count, pos = tag(pos)
+        else:
+            element = new_string(string_classes[-1 - code], strings[nodes[pos + 1]])
+            element.hidden = False
+            element.next_sibling = None
+            child_count = 0
+            pos += 2
+        element.parent = parent
+        contents = parent.contents
+        if contents:
+            sibling = contents[-1]
+            sibling.next_sibling = element
+            element.previous_sibling = sibling
+        else:
+            element.previous_sibling = None
+        contents.append(element)
+        if previous is root and soup_state is not None:
+            element.previous_element = None
+        else:
+            previous.next_element = element
+            element.previous_element = previous
+        previous = element
+        if child_count:
+            stack.append((parent, remaining))
+            parent = cast(Tag, element)
+            remaining = child_count
+    previous.next_element = None
+    if soup_state is not None:
+        root.next_element = None
+        cast("BeautifulSoup", root)._most_recent_element = (
+            None if previous is root else previous
+        )
+    return root
+
+
+def _new_soup(cls: Type[BeautifulSoup], state: Dict[str, Any]) -> BeautifulSoup:
+    """Create an empty BeautifulSoup object from the state stored by `dumps`."""
+    soup = cls.__new__(cls)
+    builder = state.pop("builder")
+    if isinstance(builder, type):
+        builder = builder()
+    elif builder is None:
+        # We don't know which builder was used to build this
+        # parse tree, so use a default we know is always available.
+        builder = HTMLParserTreeBuilder()
+    soup.__dict__.update(state)
+    soup.builder = builder
+    soup.known_xml = soup.is_xml
+    soup.parse_only = None
+    soup.replacer = None
+    soup.markup = None
+    soup._can_feed = False
+    soup.reset()
+    builder.soup = None
+    return soup
+
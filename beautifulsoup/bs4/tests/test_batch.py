@@ -0,0 +1,221 @@
+import pytest
+
+from bs4 import BeautifulSoup
+from . import (
+    SOUP_SIEVE_PRESENT,
+    SoupTest,
+)
+
+
+class TestBatchEdit(SoupTest):
+    markup = (
+        "<div><p>1<span>a<i>b</i></span>2<script>x</script></p>"
+        "<p>3<span>c</span><script>y</script></p></div><p>4</p>"
+    )
+
+    def edit(self, soup):
+        for script in soup.find_all("script"):
+            script.decompose()
+        for span in soup.find_all("span"):
+            span.unwrap()
+        soup.div.insert(0, soup.new_tag("h1", string="title"))
+        soup.div.p.wrap(soup.new_tag("section"))
+        soup.find_all("p")[-1].extract()
+        soup.div.append("end")
+
+    def test_same_results_as_without_a_batch(self):
+        expect = self.soup(self.markup)
+        self.edit(expect)
+
+        soup = self.soup(self.markup)
+        with soup.batch_edit():
+            # Look everything up first, so nothing is brought up to
+            # date before the block ends.
+            scripts = soup.find_all("script")
+            spans = soup.find_all("span")
+            paragraphs = soup.find_all("p")
+            div = soup.div
+            for script in scripts:
+                script.decompose()
+            for span in spans:
+                span.unwrap()
+            div.insert(0, soup.new_tag("h1", string="title"))
+            paragraphs[0].wrap(soup.new_tag("section"))
+            paragraphs[-1].extract()
+            div.append("end")
+        assert soup.decode() == expect.decode()
+        self.linkage_validator(soup)
+        assert [str(x) for x in soup.descendants] == [
+            str(x) for x in expect.descendants
+        ]
+
+    def test_links_are_repaired_when_the_batch_ends(self):
+        soup = self.soup("<p>a</p><p>b</p>")
+        first, second = soup.find_all("p")
+        with soup.batch_edit():
+            first.append(second)
+            b = soup.new_tag("b")
+            second.insert(0, b)
+            # The next_element chain hasn't been touched yet.
+            assert first.contents[0].next_element is second
+            assert b.next_element is None
+        self.linkage_validator(soup)
+        assert first.contents[0].next_element is second
+        assert second.next_element is b
+        assert b.next_element is second.contents[1]
+
+    def test_traversal_inside_a_batch(self):
+        soup = self.soup(self.markup)
+        with soup.batch_edit():
+            self.edit(soup)
+            # Each of these brings the tree up to date before looking
+            # at it.
+            assert [x.name for x in soup.div.find_all(True)] == [
+                "h1",
+                "section",
+                "p",
+                "i",
+                "p",
+            ]
+            assert soup.get_text() == "title1ab23cend"
+            assert soup.i.next_element == "b"
+            assert [str(x) for x in soup.i.previous_elements][:2] == ["a", "1"]
+            assert len(list(soup.descendants)) == 14
+            assert soup.div.decode() == (
+                "<div><h1>title</h1><section><p>1a<i>b</i>2</p></section>"
+                "<p>3c</p>end</div>"
+            )
+            self.linkage_validator(soup)
+
+            # Changes made after that are held back again.
+            soup.i.decompose()
+            assert soup.get_text() == "title1a23cend"
+        self.linkage_validator(soup)
+
+    def test_detached_elements(self):
+        soup = self.soup(self.markup)
+        with soup.batch_edit():
+            div = soup.div
+            first = div.p
+            div.extract()
+            first.extract()
+            first.span.append(soup.new_tag("b"))
+        self.linkage_validator(soup)
+        self.linkage_validator(div)
+        self.linkage_validator(first)
+        assert first.previous_element is None
+        assert list(first.next_elements)[-1] == "x"
+        assert first.script.string.next_element is None
+
+    def test_moving_elements_between_documents(self):
+        soup = self.soup(self.markup)
+        other = self.soup("<ul><li>1</li></ul>")
+        with soup.batch_edit():
+            span = soup.span
+            span.i.append("c")
+            # The other document isn't part of the batch, so the span
+            # has to be brought up to date before it can go in.
+            other.li.append(span)
+            other.ul.append(soup.script)
+        self.linkage_validator(soup)
+        self.linkage_validator(other)
+        assert other.decode() == (
+            "<ul><li>1<span>a<i>bc</i></span></li><script>x</script></ul>"
+        )
+
+        other = self.soup("<ul><li>1</li></ul>")
+        with soup.batch_edit():
+            # The other way around, the element joins the batch.
+            soup.div.append(other.li)
+        self.linkage_validator(soup)
+        self.linkage_validator(other)
+        assert other.decode() == "<ul></ul>"
+        assert soup.div.contents[-1].name == "li"
+
+    def test_batches_belong_to_one_document(self):
+        soup = self.soup("<p>a</p>")
+        other = self.soup("<p>b</p>")
+        p = soup.p
+        with soup.batch_edit():
+            p.append("c")
+            # Looking at another document doesn't bring this one up
+            # to date.
+            assert len(list(other.descendants)) == 2
+            assert other.p.decode() == "<p>b</p>"
+            assert p.contents[0].next_element is None
+        assert p.contents[0].next_element == "c"
+        self.linkage_validator(soup)
+
+    def test_detached_elements_leave_the_batch(self):
+        soup = self.soup(self.markup)
+        span = soup.span
+        i = span.i
+        script = soup.script
+        div = soup.div
+        with soup.batch_edit() as batch:
+            span.extract()
+            script.extract()
+            assert span._batch is batch
+            assert i._tree_batch() is batch
+            div.append(script)
+            assert script._batch is None
+        assert span._batch is None
+        assert i._tree_batch() is None
+        self.linkage_validator(span)
+
+    def test_nested_batches(self):
+        soup = self.soup("<p>a</p>")
+        p = soup.p
+        with soup.batch_edit() as batch:
+            with soup.batch_edit() as inner:
+                assert inner is batch
+                p.append("b")
+            assert p.contents[0].next_element is None
+            assert soup._batch is batch
+        assert soup._batch is None
+        assert p.contents[0].next_element == "b"
+        self.linkage_validator(soup)
+
+    def test_exception_inside_a_batch(self):
+        soup = self.soup("<p>a</p>")
+        with pytest.raises(ZeroDivisionError):
+            with soup.batch_edit():
+                soup.p.append("b")
+                1 / 0
+        assert soup._batch is None
+        assert soup.p.contents[0].next_element == "b"
+        self.linkage_validator(soup)
+
+    def test_tree_version(self):
+        soup = self.soup(self.markup)
+        version = soup.tree_version
+        with soup.batch_edit():
+            self.edit(soup)
+        assert soup.tree_version > version
+
+    def test_caches(self):
+        soup = BeautifulSoup(
+            self.markup,
+            "html.parser",
+            use_index=True,
+            query_cache_size=16,
+            cache_rendering=True,
+        )
+        soup.find_all("span")
+        soup.decode()
+        with soup.batch_edit():
+            for span in soup.find_all("span"):
+                span.unwrap()
+            assert soup.find_all("span") == []
+            assert "<span>" not in soup.decode()
+            soup.p.append(soup.new_tag("span"))
+            assert len(soup.find_all("span")) == 1
+        assert soup.decode() == soup.decode(formatter="minimal")
+        assert soup.div.p.decode() == "<p>1a<i>b</i>2<script>x</script><span></span></p>"
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_select(self):
+        soup = self.soup(self.markup)
+        with soup.batch_edit():
+            soup.p.append(soup.new_tag("b"))
+            assert len(soup.select("p > b")) == 1
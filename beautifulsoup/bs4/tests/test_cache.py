@@ -0,0 +1,304 @@
+import io
+import os
+import pytest
+
+from bs4 import (
+    BeautifulSoup,
+    ParseCache,
+)
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.cache import (
+    CacheStats,
+    QueryCache,
+    QueryCacheStats,
+)
+from bs4.exceptions import FeatureNotFound
+from bs4.filter import SoupStrainer
+from . import (
+    LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
+    SoupTest,
+)
+
+
+class TestParseCache(SoupTest):
+    markup = "<title>title</title><p class='a b'>paragraph <b>bold</b></p>"
+
+    def test_hit_and_miss(self):
+        cache = ParseCache()
+        soup = cache.parse(self.markup, "html.parser")
+        assert cache.stats == CacheStats(0, 0, 1, 0, 1, len(soup.dumps()))
+
+        soup2 = cache.parse(self.markup, "html.parser")
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert soup2.decode() == soup.decode()
+        assert isinstance(soup2.builder, HTMLParserTreeBuilder)
+
+        # Each copy is independent of the others.
+        soup2.p.decompose()
+        soup3 = cache.parse(self.markup, "html.parser")
+        assert soup3.decode() == soup.decode()
+        assert soup3.p is not soup.p
+
+    def test_file_and_bytes(self):
+        cache = ParseCache()
+        cache.parse(io.BytesIO(self.markup.encode("utf8")), "html.parser")
+        soup = cache.parse(self.markup.encode("utf8"), "html.parser")
+        assert cache.stats.hits == 1
+        assert soup.original_encoding == "utf-8"
+
+        # A string is not the same document as its encoding.
+        cache.parse(self.markup, "html.parser")
+        assert cache.stats.misses == 2
+
+    def test_key(self):
+        cache = ParseCache()
+        key = cache.key(self.markup, HTMLParserTreeBuilder)
+        assert len(key) == 40
+        assert key == cache.key(self.markup, HTMLParserTreeBuilder)
+        different = [
+            cache.key(self.markup + " ", HTMLParserTreeBuilder),
+            cache.key(self.markup.encode("utf8"), HTMLParserTreeBuilder),
+            cache.key(self.markup, HTMLParserTreeBuilder, SoupStrainer("p")),
+            cache.key(self.markup, HTMLParserTreeBuilder, from_encoding="utf8"),
+            cache.key(self.markup, HTMLParserTreeBuilder, multi_valued_attributes=None),
+        ]
+        assert len(set(different + [key])) == len(different) + 1
+
+    def test_options_are_part_of_the_key(self):
+        cache = ParseCache()
+        soup = cache.parse(self.markup, "html.parser", parse_only=SoupStrainer("p"))
+        assert soup.decode() == '<p class="a b">paragraph <b>bold</b></p>'
+        soup = cache.parse(self.markup, "html.parser", multi_valued_attributes=None)
+        assert soup.p["class"] == "a b"
+        soup = cache.parse(self.markup, "html.parser", multi_valued_attributes=None)
+        assert soup.p["class"] == "a b"
+        soup = cache.parse(self.markup, "html.parser")
+        assert soup.p["class"] == ["a", "b"]
+        assert (cache.stats.hits, cache.stats.misses) == (1, 3)
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_features_are_resolved(self):
+        # Different ways of asking for the same tree builder find the
+        # same tree.
+        cache = ParseCache()
+        cache.parse(self.markup, "lxml")
+        cache.parse(self.markup, ["lxml", "html"])
+        assert cache.stats.hits == 1
+        cache.parse(self.markup, "html.parser")
+        assert cache.stats.misses == 2
+
+    def test_eviction(self):
+        documents = ["<p>%d</p>" % i * 10 for i in range(5)]
+        size = len(BeautifulSoup(documents[0], "html.parser").dumps())
+        cache = ParseCache(max_size=size * 3)
+        for markup in documents:
+            cache.parse(markup, "html.parser")
+        assert cache.stats.evictions == 2
+        assert cache.stats.entries == 3
+        assert cache.stats.size <= size * 3
+
+        # The oldest documents were dropped.
+        cache.parse(documents[0], "html.parser")
+        assert cache.stats.misses == 6
+
+        # Looking up a document makes it the most recently used.
+        cache.parse(documents[3], "html.parser")
+        cache.parse(documents[1], "html.parser")
+        cache.parse(documents[3], "html.parser")
+        assert cache.stats.hits == 2
+
+    def test_tree_too_big_for_the_cache(self):
+        cache = ParseCache(max_size=10)
+        cache.parse(self.markup, "html.parser")
+        cache.parse(self.markup, "html.parser")
+        assert cache.stats == CacheStats(0, 0, 2, 0, 0, 0)
+
+    def test_disk(self, tmpdir):
+        directory = os.path.join(str(tmpdir), "cache")
+        cache = ParseCache(directory=directory)
+        soup = cache.parse(self.markup, "html.parser")
+        [filename] = os.listdir(directory)
+        assert filename.endswith(ParseCache.SUFFIX)
+
+        # Another cache can find the tree on disk.
+        cache2 = ParseCache(directory=directory)
+        assert cache2.parse(self.markup, "html.parser").decode() == soup.decode()
+        assert cache2.stats.disk_hits == 1
+        assert cache2.stats.misses == 0
+
+        # And now it's in memory, too.
+        cache2.parse(self.markup, "html.parser")
+        assert cache2.stats.hits == 1
+
+        cache2.clear()
+        assert os.listdir(directory) == []
+        assert cache2.stats.entries == 0
+        cache2.parse(self.markup, "html.parser")
+        assert cache2.stats.misses == 1
+
+    def test_unknown_features(self):
+        with pytest.raises(FeatureNotFound):
+            ParseCache().parse(self.markup, "no-such-parser")
+
+
+class TestQueryCache(SoupTest):
+    markup = "<div><p class='a'>1</p><p class='b'>2</p></div><p class='a'>3</p>"
+
+    def cached(self, markup=None, size=16):
+        return self.soup(markup or self.markup, query_cache_size=size)
+
+    def test_no_cache_by_default(self):
+        soup = self.soup(self.markup)
+        assert soup.query_cache is None
+        assert soup.find_all("p") == soup.find_all("p")
+
+    def test_hit_and_miss(self):
+        soup = self.cached()
+        # Looking up soup.div is a search in itself; start over
+        # after doing it.
+        div = soup.div
+        soup.query_cache.clear()
+        soup.query_cache.misses = 0
+        results = soup.find_all("p", class_="a")
+        assert soup.query_cache.stats == QueryCacheStats(0, 1, 0, 1)
+        again = soup.find_all("p", class_="a")
+        assert soup.query_cache.stats == QueryCacheStats(1, 1, 0, 1)
+        assert again == results
+        assert again.source is results.source
+
+        # The caller gets a copy of the cached results.
+        assert again is not results
+        again.pop()
+        assert len(soup.find_all("p", class_="a")) == 2
+
+        # A different search, or the same search somewhere else, is
+        # a different entry.
+        soup.find_all("p", class_="b")
+        div.find_all("p", class_="a")
+        soup.find_all("p", class_="a", limit=1)
+        soup.find_all("p", {"class": "a"})
+        assert soup.query_cache.stats.misses == 5
+        assert soup.query_cache.stats.hits == 2
+
+        # find() is a find_all() with a limit, and is cached the same way.
+        assert soup.find("p", class_="a") is results[0]
+        assert soup.query_cache.stats.hits == 3
+
+    def test_strainer(self):
+        soup = self.cached()
+        strainer = SoupStrainer("p", class_="a")
+        soup.find_all(strainer)
+        soup.find_all(strainer)
+        assert soup.query_cache.stats.hits == 1
+
+        # An ElementFilter is compared by identity.
+        soup.find_all(SoupStrainer("p", class_="a"))
+        assert soup.query_cache.stats.misses == 2
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_select(self):
+        soup = self.cached()
+        assert soup.select("div > p.a") == soup.select("div > p.a")
+        assert soup.select_one("p.b") is soup.select_one("p.b")
+        assert soup.select_one("p.nosuchclass") is None
+        assert soup.select_one("p.nosuchclass") is None
+        assert soup.query_cache.stats == QueryCacheStats(3, 3, 0, 3)
+        soup.p["class"] = "b"
+        assert soup.select_one("p.b").string == "1"
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda soup: soup.div.append(soup.new_tag("p", attrs={"class": "a"})),
+            lambda soup: soup.div.insert(0, "text"),
+            lambda soup: soup.div.p.extract(),
+            lambda soup: soup.div.p.decompose(),
+            lambda soup: soup.div.p.replace_with(soup.new_tag("b")),
+            lambda soup: soup.div.unwrap(),
+            lambda soup: soup.div.p.wrap(soup.new_tag("span")),
+            lambda soup: soup.div.clear(),
+            lambda soup: setattr(soup.div, "string", "text"),
+            lambda soup: soup.div.p.__setitem__("class", "b"),
+            lambda soup: soup.div.p.__delitem__("class"),
+        ],
+    )
+    def test_modifications_are_noticed(self, modify):
+        soup = self.cached()
+        plain = self.soup(self.markup)
+        version = soup.tree_version
+        soup.find_all("p", class_="a")
+        soup.div.find_all(string=True)
+
+        modify(plain)
+        modify(soup)
+        assert soup.tree_version > version
+        assert soup.find_all("p", class_="a") == plain.find_all("p", class_="a")
+        if soup.div is not None:
+            assert soup.div.find_all(string=True) == plain.div.find_all(string=True)
+
+    def test_smooth(self):
+        soup = self.cached()
+        soup.div.p.append("a")
+        assert soup.div.p.find_all(string=True) == ["1", "a"]
+        soup.smooth()
+        assert soup.div.p.find_all(string=True) == ["1a"]
+
+    def test_tree_version(self):
+        soup = self.soup(self.markup)
+        version = soup.tree_version
+        soup.find_all("p")
+        soup.p.get_text()
+        assert soup.tree_version == version
+        soup.p.append("!")
+        assert soup.tree_version > version
+
+    def test_eviction(self):
+        soup = self.cached(size=2)
+        soup.find_all("p")
+        soup.find_all("div")
+        soup.find_all("p")
+        soup.find_all("b")
+        assert soup.query_cache.stats == QueryCacheStats(1, 3, 1, 2)
+
+        # The least recently used search was dropped.
+        soup.find_all("p")
+        soup.find_all("div")
+        assert soup.query_cache.stats.hits == 2
+        assert soup.query_cache.stats.misses == 4
+
+    def test_key(self):
+        cache = QueryCache()
+        soup = self.soup(self.markup)
+        key = cache.key(soup, "find_all", "p", {"class": ["a", "b"]}, {"id": {"x"}})
+        assert key == cache.key(
+            soup, "find_all", "p", {"class": ["a", "b"]}, {"id": {"x"}}
+        )
+        assert key != cache.key(soup.div, "find_all", "p", {"class": ["a", "b"]})
+        assert cache.key(soup, "find_all", True) != cache.key(soup, "find_all", 1)
+
+        class Unhashable(object):
+            __hash__ = None
+
+        assert cache.key(soup, "find_all", [Unhashable()]) is None
+        self_referential = []
+        self_referential.append(self_referential)
+        assert cache.key(soup, "find_all", self_referential) is None
+
+    def test_incremental_parsing(self):
+        soup = BeautifulSoup(features="html.parser", query_cache_size=16)
+        soup.feed("<p>1</p><p>")
+        assert len(soup.find_all("p")) == 2
+        soup.feed("2</p><p>3</p>")
+        assert len(soup.find_all("p")) == 3
+        soup.close()
+        assert len(soup.find_all("p")) == 3
+        assert len(soup.find_all("p")) == 3
+        assert soup.query_cache.stats == QueryCacheStats(1, 1, 0, 1)
+
+    def test_with_index(self):
+        soup = self.soup(self.markup, use_index=True, query_cache_size=16)
+        assert len(soup.find_all(class_="a")) == 2
+        soup.div.p["class"] = "b"
+        assert len(soup.find_all(class_="a")) == 1
@@ -431,3 +431,51 @@ class TestEntitySubstitution(object):
     def test_ambiguous_ampersands_escaped(self, markup, expect):
         assert self.sub.substitute_html(markup) == expect
         assert self.sub.substitute_html5_raw(markup) == expect
+
+    @pytest.mark.parametrize(
+        "s",
+        [
+            "",
+            "plain ASCII",
+            "AT&T <b> & &amp; &nosuchentity;",
+            "café & crème brûlée",
+            "日本語 <テキスト>",
+            # Characters outside the Basic Multilingual Plane.
+            "\U0001d504 \U0001d51e\U0001d538 \U0001f600",
+            # Multi-character sequences, alone and next to the
+            # single characters they start with.
+            "≧̸ ≧ ⊔︀⊔",
+            "<⃒ < >⃒ > =⃥ =",
+            "\u205f\u200a \u205f \u200a",
+        ],
+    )
+    def test_fast_paths_match_regular_expressions(self, s):
+        # The substitute_* methods avoid regular expressions whenever
+        # they can, but the result is the same.
+        sub = self.sub
+        html = sub.CHARACTER_TO_HTML_ENTITY_RE
+        html_with_ampersand = sub.CHARACTER_TO_HTML_ENTITY_WITH_AMPERSAND_RE
+        assert sub.substitute_html(s) == html_with_ampersand.sub(
+            sub._substitute_html_entity, s
+        )
+        assert sub.substitute_html5(s) == html.sub(
+            sub._substitute_html_entity,
+            sub.ANY_ENTITY_RE.sub(sub._escape_entity_name, s),
+        )
+        assert sub.substitute_html5_raw(s) == html.sub(
+            sub._substitute_html_entity,
+            sub.ANY_ENTITY_RE.sub(sub._escape_unrecognized_entity_name, s),
+        )
+        assert sub.substitute_xml(s) == sub.AMPERSAND_OR_BRACKET.sub(
+            sub._substitute_xml_entity, s
+        )
+        assert sub.substitute_xml_containing_entities(
+            s
+        ) == sub.BARE_AMPERSAND_OR_BRACKET.sub(sub._substitute_xml_entity, s)
+
+    def test_characters_outside_the_bmp(self):
+        s = "\U0001d504 & \U0001d51e"
+        assert self.sub.substitute_html(s) == "&Afr; &amp; &afr;"
+        assert self.sub.substitute_html5(s) == "&Afr; & &afr;"
+        # An astral character with no named entity is left alone.
+        assert self.sub.substitute_html("\U0001f600") == "\U0001f600"
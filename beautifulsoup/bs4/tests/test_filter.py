@@ -655,3 +655,83 @@ and they lived at the bottom of a well.</p>
         )
         string_soup = self.soup(html_doc, parse_only=only_short_strings)
         assert "\n\n\nElsie,\nLacie and\nTillie\n...\n" == string_soup.decode()
+
+    # A variety of SoupStrainers, used to check that compiling a
+    # SoupStrainer doesn't change its behavior.
+    compile_strainers = [
+        SoupStrainer(),
+        SoupStrainer("a"),
+        SoupStrainer(["a", "b", "ns:tag"]),
+        SoupStrainer("tag"),
+        SoupStrainer(True),
+        SoupStrainer(False),
+        SoupStrainer(re.compile("^[ab]")),
+        SoupStrainer(["b", re.compile("ta")]),
+        SoupStrainer(lambda tag: getattr(tag, "name", tag) in ("b", "ns:tag")),
+        SoupStrainer(lambda tag: isinstance(tag, str) and tag.startswith("ns:")),
+        SoupStrainer(class_="x"),
+        SoupStrainer(class_="x y"),
+        SoupStrainer(class_=["y", "z"]),
+        SoupStrainer(class_=re.compile("^y")),
+        SoupStrainer(class_=True),
+        SoupStrainer(class_=False),
+        SoupStrainer(class_=lambda value: value is None),
+        SoupStrainer(id=True, class_="x"),
+        SoupStrainer("a", id="1"),
+        SoupStrainer("a", attrs={"data-x": ["1", re.compile("2")]}),
+        SoupStrainer(string="text"),
+        SoupStrainer(string=["text", "other"]),
+        SoupStrainer(string=re.compile("x")),
+        SoupStrainer(string=lambda s: s is not None and len(s) < 5),
+        SoupStrainer("a", string="text"),
+        SoupStrainer(["a", "b"], class_="x", string=re.compile("t")),
+    ]
+
+    compile_markup = (
+        '<a class="x y" id="1">text</a><a id="2">other</a><b class="x"><a>long text</a></b>'
+        '<b data-x="12">y</b><b class="yy z">text</b>'
+    )
+
+    @pytest.mark.parametrize("strainer", compile_strainers)
+    def test_compile(self, strainer):
+        soup = self.soup(self.compile_markup)
+        prefixed = Tag(name="tag", prefix="ns", attrs={"class": "x"})
+        elements = list(soup.descendants) + [prefixed]
+        match = strainer.compile()
+        assert [match(e) for e in elements] == [strainer.match(e) for e in elements]
+
+    @pytest.mark.parametrize("strainer", compile_strainers)
+    def test_compile_tag_creation(self, strainer):
+        allow_tag_creation = strainer._compile_tag_creation()
+        for nsprefix, name, attrs in [
+            (None, "a", {"class": "x y", "id": "1"}),
+            (None, "b", {"class": ["x"]}),
+            (None, "b", {"data-x": "12"}),
+            (None, "c", None),
+            ("ns", "tag", {}),
+        ]:
+            assert allow_tag_creation(nsprefix, name, attrs) == (
+                strainer.allow_tag_creation(nsprefix, name, attrs)
+            )
+
+    def test_compiled_strainer_is_used_for_searches(self):
+        class CountingStrainer(SoupStrainer):
+            compiled = 0
+
+            def compile(self):
+                self.compiled += 1
+                return super().compile()
+
+        strainer = CountingStrainer("a")
+        soup = self.soup(self.compile_markup)
+        assert len(soup.find_all(strainer)) == 3
+        assert strainer.compiled == 1
+
+    def test_subclass_match_is_respected(self):
+        class NothingStrainer(SoupStrainer):
+            def match(self, element):
+                return False
+
+        strainer = NothingStrainer("a")
+        assert strainer.compile() == strainer.match
+        assert self.soup(self.compile_markup).find_all(strainer) == []
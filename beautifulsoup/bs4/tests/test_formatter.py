@@ -157,3 +157,82 @@ class TestFormatter(SoupTest):
         soup = self.soup(markup)
         assert "<p>a &amp; b</p>" == soup.p.decode(formatter="html")
         assert "<p>a & b</p>" == soup.p.decode(formatter="html5")
+
+    @pytest.mark.parametrize(
+        "markup,expect",
+        [
+            # Runs of whitespace are collapsed.
+            ("<p>a  \n\t b</p>", "<p>a b</p>"),
+            # Whitespace next to the start or end of a block is dropped.
+            ("<div>\n <p> a </p>\n</div>", "<div><p>a</p></div>"),
+            ("<p>a</p> b <p>c</p>", "<p>a</p>b<p>c</p>"),
+            ("<p>a<br>\n b</p>", "<p>a<br>b</p>"),
+            # But whitespace between inline elements is kept.
+            ("<p><b>a</b> <i>b</i></p>", "<p><b>a</b> <i>b</i></p>"),
+            ("<span> a </span>", "<span> a </span>"),
+            ("<p>a <!--b--> c</p>", "<p>a <!--b--> c</p>"),
+            # A non-breaking space isn't whitespace as far as HTML is
+            # concerned.
+            ("<p>\xa0a\xa0\xa0</p>", "<p>\xa0a\xa0\xa0</p>"),
+            # Whitespace inside these tags is never displayed.
+            ("<ul>\n <li>a</li>\n <li>b</li>\n</ul>", "<ul><li>a</li><li>b</li></ul>"),
+            (
+                "<table> <tr> <td> 1 </td> </tr> </table>",
+                "<table><tr><td>1</td></tr></table>",
+            ),
+            # Whitespace inside <pre>, <textarea> and <script> is left
+            # alone, and so are comments.
+            ("<div> <pre> a\n  b </pre> </div>", "<div><pre> a\n  b </pre></div>"),
+            ("<textarea> a  b </textarea>", "<textarea> a  b </textarea>"),
+            ("<script> var a  =  1; </script>", "<script> var a  =  1; </script>"),
+            ("<div><!--  a  --></div>", "<div><!--  a  --></div>"),
+        ],
+    )
+    def test_minify_whitespace(self, markup, expect):
+        soup = self.soup(markup)
+        assert soup.decode(formatter="minify") == expect
+        assert soup.encode(formatter="minify") == expect.encode("utf8")
+
+        # The tree itself hasn't changed.
+        assert soup.decode() == self.soup(markup).decode()
+
+    def test_minify_attributes(self):
+        soup = self.soup(
+            '<input name="q" value="" disabled>'
+            '<a href="/a/b" class="e f" title="it\'s" data-x="&lt;" data-y="c=d">g</a>'
+        )
+        assert soup.decode(formatter="minify") == (
+            "<input disabled name=q value>"
+            '<a class="e f" data-x=&lt; data-y="c=d" href=/a/b title="it\'s">g</a>'
+        )
+
+        # If void elements are closed with a slash, an unquoted
+        # value could run into the slash, so values are always quoted.
+        formatter = HTMLFormatter(void_element_close_prefix="/", minify=True)
+        assert (
+            soup.input.decode(formatter=formatter)
+            == '<input disabled="" name="q" value=""/>'
+        )
+
+    def test_minify_part_of_a_document(self):
+        soup = self.soup("<pre> <b> a  b </b> </pre><p> <b> a  b </b> </p>")
+        # The <b> tag is inside a <pre> tag, so its whitespace is
+        # significant even when it's rendered on its own.
+        assert soup.pre.b.decode(formatter="minify") == "<b> a  b </b>"
+        assert soup.p.b.decode(formatter="minify") == "<b> a b </b>"
+        assert soup.p.decode(formatter="minify") == "<p><b> a b </b></p>"
+
+    def test_minify_with_render_cache(self):
+        soup = self.soup("<div> <p> a </p> </div>", cache_rendering=True)
+        assert soup.decode() == "<div> <p> a </p> </div>"
+        assert soup.decode(formatter="minify") == "<div><p>a</p></div>"
+        soup.p.string.replace_with("  b  ")
+        assert soup.decode(formatter="minify") == "<div><p>b</p></div>"
+
+    def test_block_elements(self):
+        formatter = HTMLFormatter(minify=True, block_elements=set(["span"]))
+        soup = self.soup("<p> <span> a </span> </p>")
+        assert soup.decode(formatter=formatter) == "<p><span>a</span></p>"
+        assert soup.decode(formatter="minify") == "<p><span> a </span></p>"
+        assert "p" in HTMLFormatter.REGISTRY["minify"].block_elements
+        assert Formatter(Formatter.XML).block_elements == set()
@@ -0,0 +1,150 @@
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4._index import TagIndex
+from bs4.filter import SoupStrainer
+from . import (
+    LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
+    SoupTest,
+)
+
+
+class TestTagIndex(SoupTest):
+    markup = (
+        "<div id='main' class='a b'><p class='a'>1</p><P>2</P>"
+        "<section><p id='x' class='b c'>3</p><span class='a'>4</span></section>"
+        "</div><p class='c'>5</p>"
+    )
+
+    def indexed(self, markup=None):
+        return self.soup(markup or self.markup, use_index=True)
+
+    def assert_same_results(self, method, *args, **kwargs):
+        """Make sure a search gives the same results with and without
+        an index.
+        """
+        plain = self.soup(self.markup)
+        indexed = self.indexed()
+        for start in ("soup", "div", "section", "span"):
+            if start == "soup":
+                a, b = plain, indexed
+            else:
+                a, b = plain.find(start), indexed.find(start)
+            expect = [str(x) for x in getattr(a, method)(*args, **kwargs)]
+            got = [str(x) for x in getattr(b, method)(*args, **kwargs)]
+            assert expect == got
+        assert isinstance(indexed._tag_index, TagIndex)
+
+    @pytest.mark.parametrize(
+        "args,kwargs",
+        [
+            (("p",), {}),
+            (("P",), {}),
+            (("p",), {"class_": "a"}),
+            (("p",), {"limit": 1}),
+            ((), {"class_": "b"}),
+            ((), {"class_": "b c"}),
+            ((), {"id": "x"}),
+            ((), {"attrs": {"id": "main"}}),
+            ((), {"attrs": "a"}),
+            (("p",), {"string": "3"}),
+            (("nosuchtag",), {}),
+            ((), {"class_": "nosuchclass"}),
+        ],
+    )
+    def test_find_all(self, args, kwargs):
+        self.assert_same_results("find_all", *args, **kwargs)
+
+    def test_find(self):
+        soup = self.indexed()
+        assert soup.find("p", class_="b").string == "3"
+        assert soup.section.find(class_="a").string == "4"
+        assert soup.section.find("div") is None
+        assert soup.section.span.find("p") is None
+
+    def test_searches_the_index_can_not_help_with(self):
+        # These searches don't use the index, but they still work.
+        self.assert_same_results("find_all", ["p", "span"])
+        self.assert_same_results("find_all", SoupStrainer("span"))
+        self.assert_same_results("find_all", string="3")
+        self.assert_same_results("find_all", "p", recursive=False)
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    @pytest.mark.parametrize(
+        "selector",
+        ["p", "P", "#x", ".a", "p.a", "p.b.c", ".b#x", "*", "div > p", "p:first-child"],
+    )
+    def test_select(self, selector):
+        self.assert_same_results("select", selector)
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_select_one_and_limit(self):
+        soup = self.indexed()
+        assert soup.select_one("p.b").string == "3"
+        assert soup.select_one("p.nosuchclass") is None
+        assert [x.name for x in soup.select(".a", limit=2)] == ["div", "p"]
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_namespaced_tags(self):
+        markup = '<root xmlns:a="http://a/"><a:item>1</a:item><item>2</item></root>'
+        plain = BeautifulSoup(markup, "lxml-xml")
+        indexed = BeautifulSoup(markup, "lxml-xml", use_index=True)
+        for name in ("a:item", "item"):
+            assert plain.find_all(name) == indexed.find_all(name)
+        if SOUP_SIEVE_PRESENT:
+            assert indexed.select("item") == plain.select("item")
+
+    def test_index_is_built_lazily(self):
+        soup = self.indexed()
+        assert soup._tag_index is None
+        soup.find_all("p")
+        index = soup._tag_index
+        assert index is not None
+        soup.find_all("span")
+        assert soup._tag_index is index
+
+        # No index unless it was asked for.
+        soup = self.soup(self.markup)
+        soup.find_all("p")
+        assert soup._tag_index is None
+
+    def test_modifications_are_noticed(self):
+        soup = self.indexed()
+        assert len(soup.find_all("p")) == 4
+
+        new = soup.new_tag("p", attrs={"class": "new"})
+        soup.section.append(new)
+        assert soup._tag_index is None
+        assert soup.section.find_all("p")[-1] is new
+        assert soup.find_all(class_="new") == [new]
+
+        new["id"] = "new"
+        assert soup.find(id="new") is new
+        del new["class"]
+        assert soup.find_all(class_="new") == []
+
+        soup.find(id="x").extract()
+        assert [p.string for p in soup.find_all("p")] == ["1", "2", None, "5"]
+        soup.find("p", class_="c").decompose()
+        assert [p.string for p in soup.find_all("p")] == ["1", "2", None]
+
+        soup.div.p.replace_with(soup.new_tag("span", attrs={"class": "a"}))
+        assert soup.find_all("p", class_="a") == []
+        assert len(soup.find_all("span", class_="a")) == 2
+
+    def test_detached_tags_are_not_indexed(self):
+        soup = self.indexed()
+        section = soup.section.extract()
+        assert [p.string for p in section.find_all("p")] == ["3"]
+        assert section.find(id="x").string == "3"
+
+    def test_incremental_parsing(self):
+        soup = BeautifulSoup(features="html.parser", use_index=True)
+        soup.feed("<p>1</p><p>")
+        assert len(soup.find_all("p")) == 2
+        assert soup._tag_index is None
+        soup.feed("2</p><p>3</p>")
+        soup.close()
+        assert len(soup.find_all("p")) == 3
+        assert soup._tag_index is not None
@@ -1,18 +1,25 @@
 """Tests of the bs4.element.PageElement class"""
 
 import copy
+import io
 import pickle
 import pytest
 import sys
 import warnings
+import weakref
 
 from bs4 import BeautifulSoup
 from bs4.element import (
     AttributeValueList,
     Comment,
+    NavigableString,
+    Tag,
+    XMLAttributeDict,
 )
 from bs4.filter import SoupStrainer
 from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
     SoupTest,
 )
 
@@ -79,6 +86,192 @@ class TestEncoding(SoupTest):
         soup = self.soup(html)
         assert html == repr(soup)
 
+    stream_markup = (
+        '<html><head><meta charset="ISO-8859-1"><title>title</title></head>'
+        "<body><p class='a b'>Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu"
+        " &amp; \N{SNOWMAN}</p><pre>  whitespace\n  </pre><br></body></html>"
+    )
+
+    @pytest.mark.parametrize("formatter", ["minimal", "html", "html5", None])
+    @pytest.mark.parametrize("encoding", ["utf-8", "ascii", "latin-1", "utf-16"])
+    @pytest.mark.parametrize("indent_level", [None, 0])
+    def test_encode_matches_decode(self, formatter, encoding, indent_level):
+        # encode() doesn't go through decode(), but the result is the
+        # same as encoding the output of decode().
+        soup = self.soup(self.stream_markup)
+        for tag in soup, soup.head, soup.p:
+            expect = tag.decode(indent_level, encoding, formatter).encode(
+                encoding, "xmlcharrefreplace"
+            )
+            assert tag.encode(encoding, indent_level, formatter) == expect
+
+        expect = soup.head.decode_contents(indent_level, encoding, formatter).encode(
+            encoding, "xmlcharrefreplace"
+        )
+        assert soup.head.encode_contents(indent_level, encoding, formatter) == expect
+
+    def test_encode_does_not_decode(self, monkeypatch):
+        soup = self.soup(self.stream_markup)
+
+        def decode(*args, **kwargs):
+            raise AssertionError("The whole document was decoded.")
+
+        monkeypatch.setattr(Tag, "decode", decode)
+        monkeypatch.setattr(BeautifulSoup, "decode", decode)
+        assert soup.encode("latin-1").startswith(
+            b'<html><head><meta charset="latin-1"/>'
+        )
+        assert soup.prettify("utf8").startswith(b"<html>\n <head>")
+        assert soup.p.encode_contents() == (
+            "Sacr\N{LATIN SMALL LETTER E WITH ACUTE} bleu &amp; \N{SNOWMAN}"
+        ).encode("utf8")
+
+    def test_encode_contents_errors(self):
+        # Unlike encode(), encode_contents() has always refused to
+        # encode characters the encoding can't handle.
+        soup = self.soup("<b>\N{SNOWMAN}</b>")
+        assert soup.encode("ascii") == b"<b>&#9731;</b>"
+        with pytest.raises(UnicodeEncodeError):
+            soup.b.encode_contents(encoding="ascii")
+
+    @pytest.mark.parametrize("formatter", ["minimal", "html", "html5", None])
+    @pytest.mark.parametrize("encoding", ["utf-8", "ascii", "latin-1", "utf-16"])
+    @pytest.mark.parametrize("indent_level", [None, 0])
+    def test_iter_encode(self, formatter, encoding, indent_level):
+        soup = self.soup(self.stream_markup)
+        expect = soup.encode(encoding, indent_level, formatter)
+        chunks = list(soup.iter_encode(encoding, indent_level, formatter, chunk_size=5))
+        assert len(chunks) > 1
+        assert b"".join(chunks) == expect
+        assert b"".join(soup.p.iter_encode(encoding, indent_level, formatter)) == (
+            soup.p.encode(encoding, indent_level, formatter)
+        )
+
+        # The meta tag mentions the encoding actually used.
+        if encoding != "utf-16":
+            assert ('charset="%s"' % encoding).encode(encoding) in expect
+
+    def test_iter_encode_prettify(self):
+        soup = self.soup(self.stream_markup)
+        assert b"".join(soup.iter_encode("utf8", indent_level=0)) == soup.prettify(
+            "utf8"
+        )
+
+    def test_iter_encode_errors(self):
+        soup = self.soup("<b>\N{SNOWMAN}</b>")
+        assert b"".join(soup.iter_encode("ascii")) == b"<b>&#9731;</b>"
+        with pytest.raises(UnicodeEncodeError):
+            list(soup.iter_encode("ascii", errors="strict"))
+
+    def test_iter_encode_deeply_nested_document(self):
+        limit = sys.getrecursionlimit() + 1
+        soup = self.soup("<span>" * limit)
+        assert b"".join(soup.iter_encode()) == soup.encode()
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_iter_encode_xml_declaration(self):
+        soup = BeautifulSoup("<root><a>\N{SNOWMAN}</a></root>", "xml")
+        for encoding in ("utf-8", "ascii"):
+            data = b"".join(soup.iter_encode(encoding))
+            assert data == soup.encode(encoding)
+            assert data.startswith(
+                ('<?xml version="1.0" encoding="%s"?>' % encoding).encode("ascii")
+            )
+
+    def test_write(self):
+        soup = self.soup(self.stream_markup)
+        binary = io.BytesIO()
+        soup.write(binary, "latin-1", formatter="html")
+        assert binary.getvalue() == soup.encode("latin-1", formatter="html")
+
+        text = io.StringIO()
+        soup.write(text, None, indent_level=0)
+        assert text.getvalue() == soup.prettify()
+
+
+class TestRenderCache(SoupTest):
+    markup = (
+        '<html><head><meta charset="ISO-8859-1"><title>title</title></head>'
+        "<body><div class='a'> text <br> <pre>  keep <b> this </b>\n</pre>"
+        "<p>para<i>graph</i><!-- comment --></p></div><p></p></body></html>"
+    )
+
+    def assert_same_output(self, plain, cached):
+        for formatter in ("minimal", "html", None):
+            for indent_level in (None, 0, 2):
+                for name in (None, "body", "div", "pre"):
+                    a = plain.find(name) if name else plain
+                    b = cached.find(name) if name else cached
+                    for i in range(2):
+                        assert a.decode(indent_level, formatter=formatter) == b.decode(
+                            indent_level, formatter=formatter
+                        )
+        assert plain.encode("latin-1") == cached.encode("latin-1")
+        assert plain.prettify("ascii") == cached.prettify("ascii")
+
+    def test_output_is_unchanged(self):
+        plain = self.soup(self.markup)
+        cached = self.soup(self.markup, cache_rendering=True)
+        self.assert_same_output(plain, cached)
+
+        for soup in plain, cached:
+            soup.div.p.i.string = "changed"
+            soup.pre["class"] = "new"
+            soup.body.append(soup.new_tag("footer"))
+        self.assert_same_output(plain, cached)
+
+        for soup in plain, cached:
+            soup.div.p.decompose()
+            soup.find("footer").replace_with("text")
+        self.assert_same_output(plain, cached)
+
+    def test_cache(self):
+        soup = self.soup(self.markup, cache_rendering=True)
+        assert soup.div._render_cache is None
+        output = soup.decode()
+
+        # The rendering of the document, and of its children, has
+        # been stored.
+        assert list(soup._render_cache.values()) == [output]
+        assert soup.html._render_cache is not None
+        assert soup.div._render_cache is None
+
+        # Changing the tree marks everything between the change and
+        # the root as needing to be rendered again.
+        soup.div.p.i.string = "changed"
+        for tag in (soup, soup.html, soup.body, soup.div, soup.div.p, soup.i):
+            assert tag._render_cache == {}
+        assert soup.decode() == output.replace("graph", "changed")
+
+        # This time, the unchanged parts were stored.
+        assert soup.head._render_cache
+        assert soup.pre._render_cache
+        soup.i.string = "again"
+        assert soup.head._render_cache
+        assert soup.decode() == output.replace("graph", "again")
+
+    def test_off_by_default(self):
+        soup = self.soup(self.markup)
+        soup.decode()
+        soup.div.p.i.string = "changed"
+        soup.decode()
+        assert soup._render_cache is None
+        assert soup.div._render_cache is None
+
+    def test_hidden_tag(self):
+        plain = self.soup(self.markup)
+        cached = self.soup(self.markup, cache_rendering=True)
+        for soup in plain, cached:
+            soup.div.hidden = True
+        self.assert_same_output(plain, cached)
+
+    def test_attribute_changed_directly(self):
+        soup = self.soup(self.markup, cache_rendering=True)
+        soup.decode()
+        soup.div.attrs["class"] = "new"
+        soup.div.fingerprint(recalculate=True)
+        assert '<div class="new">' in soup.decode()
+
 
 class TestFormatters(SoupTest):
     """Test the formatting feature, used by methods like decode() and
@@ -403,6 +596,144 @@ class TestPersistence(SoupTest):
         assert "a b c".split() == div_copy["class"]
         assert isinstance(div_copy["class"], AttributeValueList)
 
+    def test_copy_links_every_element(self):
+        soup = self.soup(
+            "<div class='a b'><p>Foo<b>bar</b><!--baz--></p><br/><p>x</p></div>end"
+        )
+        div = soup.div
+        div_copy = copy.copy(div)
+        self.linkage_validator(div_copy)
+        assert [str(x) for x in div_copy.descendants] == [
+            str(x) for x in div.descendants
+        ]
+        for original, copied in zip(div.descendants, div_copy.descendants):
+            assert original is not copied
+            assert type(original) is type(copied)
+        assert isinstance(div_copy.p.contents[-1], Comment)
+        assert div_copy.find_all("p")[-1].next_element == "x"
+        assert div_copy.br.is_empty_element
+        assert div_copy.p._is_xml is False
+
+    def test_copy_uses_subclass_deepcopy(self):
+        class MyTag(Tag):
+            def __deepcopy__(self, memo, recursive=True):
+                clone = super().__deepcopy__(memo, recursive)
+                clone.copied = True
+                return clone
+
+        class MyString(NavigableString):
+            def __deepcopy__(self, memo, recursive=False):
+                return type(self)(self.upper())
+
+        soup = self.soup(
+            "<div><p>a<b>b</b></p></div>",
+            element_classes={Tag: MyTag, NavigableString: MyString},
+        )
+        div_copy = copy.copy(soup.div)
+        assert div_copy.decode() == "<div><p>A<b>B</b></p></div>"
+        assert div_copy.p.copied is True
+        assert div_copy.b.copied is True
+        self.linkage_validator(div_copy)
+
+    @pytest.mark.skipif(not HTML5LIB_PRESENT, reason="html5lib not installed")
+    def test_copy_html5lib_document(self):
+        # html5lib creates <html>, <head> and <body> tags even for an
+        # empty document, but they don't end up in the copy.
+        soup = BeautifulSoup("<p>a</p>", "html5lib")
+        soup_copy = copy.copy(soup)
+        assert soup_copy.decode() == soup.decode()
+        assert len(soup_copy.find_all("html")) == 1
+        self.linkage_validator(soup_copy)
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_copy_xml(self):
+        soup = BeautifulSoup("<root><a x='1'>b</a></root>", "xml")
+        a_copy = copy.copy(soup.root).a
+        assert a_copy._is_xml is True
+        assert isinstance(a_copy.attrs, XMLAttributeDict)
+
+    def test_pickle_tag_and_string(self):
+        # Tag and NavigableString use __slots__, but they can still
+        # be pickled on their own.
+        soup = self.soup("<div class='a b'><b>Foo</b><!--Bar--></div>")
+        div = pickle.loads(pickle.dumps(soup.div, pickle.HIGHEST_PROTOCOL))
+        assert div.decode() == soup.div.decode()
+        assert div.b.string.parent is div.b
+        assert isinstance(div["class"], AttributeValueList)
+
+        comment = pickle.loads(pickle.dumps(soup.div.contents[1]))
+        assert isinstance(comment, Comment)
+        assert comment == "Bar"
+
+
+class TestCompactLayout(SoupTest):
+    """Test the __slots__-based layout of Tag and NavigableString."""
+
+    def test_nodes_have_no_instance_dictionary(self):
+        soup = self.soup("<p>Foo<b>bar</b><!--baz--></p>")
+        for node in [soup.p, soup.b, soup.p.contents[0], soup.p.contents[-1]]:
+            assert not vars(node)
+
+    def test_unexpected_attributes_can_still_be_set(self):
+        soup = self.soup("<p>Foo</p>")
+        soup.p.custom = "value"
+        soup.p.string.custom = "value"
+        assert soup.p.custom == "value"
+        assert soup.p.string.custom == "value"
+
+    def test_nodes_can_be_weakly_referenced(self):
+        soup = self.soup("<p>Foo</p>")
+        assert weakref.ref(soup.p)() is soup.p
+        assert weakref.ref(soup.p.string)() is soup.p.string
+
+    def test_element_classes_subclass(self):
+        class MyTag(Tag):
+            pass
+
+        class MyString(NavigableString):
+            pass
+
+        soup = self.soup(
+            "<p>Foo</p>", element_classes={Tag: MyTag, NavigableString: MyString}
+        )
+        assert isinstance(soup.p, MyTag)
+        assert isinstance(soup.p.string, MyString)
+        soup.p.custom = "value"
+        assert soup.p.custom == "value"
+
+        copied = copy.copy(soup.p)
+        assert isinstance(copied, MyTag)
+        assert copied == soup.p
+
+    def test_decompose_clears_slots(self):
+        soup = self.soup("<p>Foo<b>bar</b></p>")
+        b = soup.b
+        string = b.string
+        b.decompose()
+        assert b.decomposed
+        assert b.contents == []
+        assert string.decomposed
+
+        # The slots are reset to their defaults, not left empty.
+        for element in (b, string):
+            assert element.parent is None
+            assert element.next_element is None
+            assert element.previous_element is None
+            assert element.next_sibling is None
+            assert element.previous_sibling is None
+            assert element.hidden is False
+        assert b.name is None
+        assert b.attrs is None
+        assert b.get_text() == ""
+        assert str(string) == "bar"
+
+    def test_missing_slot_is_not_a_search(self):
+        tag = Tag.__new__(Tag)
+        with pytest.raises(AttributeError):
+            tag.name
+        with pytest.raises(AttributeError):
+            tag.parent
+
 
 class TestEquality(SoupTest):
 
@@ -435,3 +766,90 @@ class TestEquality(SoupTest):
         # NavigableStrings with the same contents hash to the value of
         # the contents.
         assert hash(first_string) == hash(second_string) == hash("string")
+
+    def test_hash_does_not_render_the_tag(self, monkeypatch):
+        soup = self.soup("<a>string</a>")
+
+        def decode(*args, **kwargs):
+            raise AssertionError("The tag was rendered.")
+
+        monkeypatch.setattr(Tag, "decode", decode)
+        assert {soup.a: 1}[soup.a] == 1
+
+    def test_fingerprint(self):
+        soup = self.soup(
+            "<div><p class='a b' id='1'>x<b>y</b></p><p id='1' class='a b'>x<b>y</b></p>"
+            "<p class='a'>x<b>y</b></p><p class='a b' id='1'>x<b>z</b></p></div>"
+        )
+        p1, p2, p3, p4 = soup.find_all("p")
+        assert p1 == p2
+        assert p1.fingerprint() == p2.fingerprint()
+        assert p1.fingerprint() != p3.fingerprint()
+        assert p1.fingerprint() != p4.fingerprint()
+        assert len({p1, p2, p3, p4}) == 3
+
+        # The fingerprints are remembered.
+        assert p1._fingerprint == p1.fingerprint()
+        assert p1.b._fingerprint == p1.b.fingerprint()
+        assert p1 != p4
+
+        # A comment is equal to a string with the same contents.
+        comment = self.soup("<b><!--y--></b>").b
+        assert comment == p1.b
+        assert comment.fingerprint() == p1.b.fingerprint()
+
+    def test_fingerprint_changes_with_tree(self):
+        soup = self.soup("<div><p>x<b>y</b></p><p>x<b>y</b></p></div>")
+        p1, p2 = soup.find_all("p")
+        div_fingerprint = soup.div.fingerprint()
+        assert p1.fingerprint() == p2.fingerprint()
+
+        p2.b.append("!")
+        assert p2._fingerprint is None
+        assert soup.div._fingerprint is None
+        assert p1._fingerprint is not None
+        assert p1 != p2
+        assert p1.fingerprint() != p2.fingerprint()
+        assert soup.div.fingerprint() != div_fingerprint
+
+        p2.b.string = "y"
+        assert p1 == p2
+        assert p1.fingerprint() == p2.fingerprint()
+
+        p2["class"] = "new"
+        assert p1.fingerprint() != p2.fingerprint()
+        del p2["class"]
+        assert p1.fingerprint() == p2.fingerprint()
+
+        # A change the tree doesn't know about needs to be pointed out.
+        p2.b.attrs["id"] = "new"
+        p2.b.fingerprint(recalculate=True)
+        assert p1.fingerprint() != p2.fingerprint()
+        assert p1 != p2
+
+    def test_hash_and_eq_notice_direct_changes(self):
+        soup = self.soup("<p>a</p><b>a</b><i id='1'>a</i><i>a</i>")
+        p, b, i1, i2 = soup.find_all(True)
+        for tag in (p, b, i1, i2):
+            hash(tag)
+            tag.fingerprint()
+
+        # These changes don't go through the Beautiful Soup API, so
+        # the remembered fingerprints are out of date, but hash()
+        # and == aren't fooled.
+        b.name = "p"
+        assert p == b
+        assert hash(p) == hash(b)
+        assert len({p, b}) == 1
+
+        i1.attrs.pop("id")
+        assert i1 == i2
+        assert hash(i1) == hash(i2)
+
+        i2.attrs["id"] = "2"
+        assert i1 != i2
+
+    def test_fingerprint_of_deeply_nested_tag(self):
+        soup = self.soup("<span>" * 2000)
+        assert soup.fingerprint() == self.soup("<span>" * 2000).fingerprint()
+        assert hash(soup) == hash(self.soup("<span>" * 2000))
@@ -0,0 +1,128 @@
+import pytest
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.exceptions import FeatureNotFound, ParserRejectedMarkup
+from bs4.filter import SoupStrainer
+from bs4.parallel import (
+    _BatchParser,
+    ParseResult,
+    parse_many,
+)
+from . import SoupTest
+
+
+# Extraction functions have to be defined at module level so they can
+# be pickled.
+def title(soup):
+    return soup.title.get_text()
+
+
+def tag_names(soup):
+    return [tag.name for tag in soup.find_all(True)]
+
+
+def builder_id(soup):
+    return id(soup.builder)
+
+
+def fail_on_b(soup):
+    if soup.b is not None:
+        raise ValueError("found a <b> tag")
+    return None
+
+
+class TestParseMany(SoupTest):
+    documents = ["<title>%d</title><p>paragraph</p>" % i for i in range(25)]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    @pytest.mark.parametrize("chunksize", [1, 4])
+    def test_ordered(self, workers, chunksize):
+        results = list(
+            parse_many(
+                self.documents,
+                title,
+                "html.parser",
+                workers=workers,
+                chunksize=chunksize,
+            )
+        )
+        assert results == [ParseResult(i, str(i), None) for i in range(25)]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_unordered(self, workers):
+        results = list(
+            parse_many(
+                iter(self.documents),
+                title,
+                "html.parser",
+                workers=workers,
+                ordered=False,
+                chunksize=3,
+            )
+        )
+        assert sorted(results) == [ParseResult(i, str(i), None) for i in range(25)]
+
+    def test_without_extraction_function(self):
+        [result] = list(parse_many(["<a>text</a>"], features="html.parser", workers=2))
+        assert isinstance(result.result, BeautifulSoup)
+        assert result.result.decode() == "<a>text</a>"
+
+    def test_parse_only(self):
+        results = parse_many(
+            self.documents[:2],
+            tag_names,
+            "html.parser",
+            workers=2,
+            parse_only=SoupStrainer("p"),
+        )
+        assert [r.result for r in results] == [["p"], ["p"]]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_rejected_markup_is_captured(self, workers):
+        documents = ["<title>a</title>", b"<![UNKNOWN[]]>", "<title>b</title>"]
+        results = list(parse_many(documents, title, "html.parser", workers=workers))
+        assert [r.result for r in results] == ["a", None, "b"]
+        assert isinstance(results[1].error, ParserRejectedMarkup)
+        assert results[0].error is None
+
+    def test_other_exceptions(self):
+        documents = ["<a>", "<b>"]
+
+        # By default, an exception raised by the extraction function
+        # is propagated.
+        with pytest.raises(ValueError):
+            list(parse_many(documents, fail_on_b, "html.parser", workers=1))
+
+        # But it can be captured instead.
+        results = list(
+            parse_many(
+                documents, fail_on_b, "html.parser", workers=2, catch=(ValueError,)
+            )
+        )
+        assert results[0].error is None
+        assert isinstance(results[1].error, ValueError)
+
+    def test_builder_is_reused(self):
+        results = parse_many(self.documents, builder_id, "html.parser", workers=1)
+        assert len(set(r.result for r in results)) == 1
+
+    def test_arguments(self):
+        parser = _BatchParser(
+            HTMLParserTreeBuilder,
+            dict(multi_valued_attributes=None),
+            dict(from_encoding="iso-8859-8"),
+            None,
+            None,
+            (),
+        )
+        markup = '<p class="a b">\N{HEBREW LETTER ALEF}</p>'.encode("iso-8859-8")
+        [result] = parser.parse([(0, markup)])
+        soup = result.result
+        assert soup.p["class"] == "a b"
+        assert soup.p.string == "\N{HEBREW LETTER ALEF}"
+        assert soup.original_encoding == "iso-8859-8"
+
+    def test_unknown_features(self):
+        with pytest.raises(FeatureNotFound):
+            next(parse_many(self.documents, title, "no-such-parser"))
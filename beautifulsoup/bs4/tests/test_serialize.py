@@ -0,0 +1,232 @@
+import pickle
+import pytest
+
+from bs4 import (
+    BeautifulSoup,
+    loads,
+)
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.element import (
+    AttributeValueList,
+    CharsetMetaAttributeValue,
+    Comment,
+    Doctype,
+    NamespacedAttribute,
+    Tag,
+)
+from bs4.serialize import MAGIC
+from . import (
+    HTML5LIB_PRESENT,
+    LXML_PRESENT,
+    SoupTest,
+)
+
+
+class TestSerialize(SoupTest):
+    PARSERS = (
+        ["html.parser"]
+        + (["lxml"] if LXML_PRESENT else [])
+        + (["html5lib"] if HTML5LIB_PRESENT else [])
+    )
+
+    markup = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>title</title>"
+        "<script>if (a < b) {}</script></head><body>"
+        "<div class='a b' id='main'><p>paragraph &amp; <b>bold</b><br><!--comment--></p>"
+        "<p class='a'>\N{SNOWMAN}</p><pre>  whitespace  </pre></div></body></html>"
+    )
+
+    def assert_linkage(self, root):
+        """Make sure that walking the tree through .contents gives the
+        same result as walking it through .next_element, and that the
+        sibling and parent pointers are consistent.
+        """
+        todo = [root]
+        while todo:
+            element = todo.pop()
+            if isinstance(element, Tag):
+                previous = None
+                for child in element.contents:
+                    assert child.parent is element
+                    assert child.previous_sibling is previous
+                    if previous is not None:
+                        assert previous.next_sibling is child
+                    previous = child
+                if previous is not None:
+                    assert previous.next_sibling is None
+                todo.extend(reversed(element.contents))
+
+        expect = list(root.descendants)
+        element = root.contents[0] if root.contents else None
+        for e in expect:
+            assert e is element
+            element = element.next_element
+        assert element is None
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_round_trip(self, parser):
+        soup = BeautifulSoup(self.markup, parser)
+        data = soup.dumps()
+        assert data.startswith(MAGIC)
+        loaded = loads(data)
+
+        assert type(loaded) is BeautifulSoup
+        assert loaded.decode() == soup.decode()
+        assert loaded.prettify() == soup.prettify()
+        assert loaded.builder.NAME == soup.builder.NAME
+        assert loaded.original_encoding == soup.original_encoding
+        assert loaded.is_xml == soup.is_xml
+        self.assert_linkage(loaded)
+
+        # The details of each tag were preserved.
+        for original, new in zip(soup.find_all(True), loaded.find_all(True)):
+            assert original.name == new.name
+            assert original.attrs == new.attrs
+            assert original.sourceline == new.sourceline
+            assert original.sourcepos == new.sourcepos
+            assert original.can_be_empty_element == new.can_be_empty_element
+            assert original.interesting_string_types == new.interesting_string_types
+        for original, new in zip(
+            soup.find_all(string=True), loaded.find_all(string=True)
+        ):
+            assert original == new
+            assert type(original) is type(new)
+        assert isinstance(loaded.div["class"], AttributeValueList)
+        assert isinstance(loaded.contents[0], Doctype)
+        assert isinstance(loaded.find(string=lambda s: isinstance(s, Comment)), Comment)
+
+        # The meta charset will still be changed when the document is
+        # encoded.
+        assert isinstance(loaded.meta["charset"], CharsetMetaAttributeValue)
+        assert b'<meta charset="latin-1"/>' in loaded.encode("latin-1")
+
+        # The loaded tree can be modified like any other.
+        loaded.body.append(loaded.new_tag("footer"))
+        loaded.p.extract()
+        self.assert_linkage(loaded)
+
+    def test_empty_document(self):
+        soup = self.soup("")
+        loaded = loads(soup.dumps())
+        assert loaded.decode() == ""
+        assert loaded.contents == []
+        loaded.append(loaded.new_tag("a"))
+        assert loaded.decode() == "<a></a>"
+
+    def test_tag(self):
+        soup = self.soup(self.markup)
+        div = loads(soup.div.dumps())
+        assert type(div) is Tag
+        assert div.decode() == soup.div.decode()
+        assert div.parent is None
+        assert div.next_element is div.contents[0]
+        self.assert_linkage(div)
+
+    def test_deeply_nested_document(self):
+        # Serialization and deserialization don't involve any
+        # recursive function calls.
+        markup = "<span>" * 2000
+        soup = self.soup(markup)
+        loaded = loads(soup.dumps())
+        assert loaded.decode() == soup.decode()
+
+    def test_large_numbers(self):
+        # Enough distinct strings that their indexes don't fit into two bytes.
+        markup = "".join("<p id='%d'>%d</p>" % (i, -i) for i in range(20000))
+        soup = self.soup(markup)
+        assert loads(soup.dumps()).decode() == soup.decode()
+
+    def test_no_builder(self):
+        soup = self.soup("<p>text</p>")
+        soup.builder = None
+        loaded = loads(soup.dumps())
+        assert isinstance(loaded.builder, HTMLParserTreeBuilder)
+        assert loaded.decode() == "<p>text</p>"
+
+    def test_builder_options_are_kept(self):
+        soup = BeautifulSoup(
+            '<p class="a b">', "html.parser", multi_valued_attributes=None
+        )
+        loaded = loads(soup.dumps())
+        assert loaded.p["class"] == "a b"
+        loaded.p["class"] = "c d"
+        assert loads(loaded.dumps()).p["class"] == "c d"
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_xml(self):
+        markup = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<root xmlns:a="http://a/"><a:item a:attr="1">text</a:item>'
+            "<![CDATA[cdata]]><empty/></root>"
+        )
+        soup = BeautifulSoup(markup, "lxml-xml")
+        loaded = loads(soup.dumps())
+        assert loaded.decode() == soup.decode()
+        assert loaded.is_xml
+        item = loaded.find("a:item")
+        assert item.prefix == "a"
+        assert item.namespace == "http://a/"
+        [key] = item.attrs.keys()
+        assert isinstance(key, NamespacedAttribute)
+        assert key.namespace == "http://a/"
+        assert loaded.css.select("a|item") == [item]
+
+    def test_pickle(self):
+        soup = self.soup(self.markup)
+        for obj in (soup, soup.div):
+            loaded = pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+            assert loaded.decode() == obj.decode()
+            self.assert_linkage(loaded)
+
+        # A pickled Tag doesn't drag the rest of the tree along.
+        p = pickle.loads(pickle.dumps(soup.p))
+        assert p.parent is None
+        assert len(pickle.dumps(soup.p)) < len(pickle.dumps(soup))
+
+    def test_pickle_from_older_version(self):
+        # Before Tag used __slots__, a pickled Tag's state was a plain
+        # dictionary, and a BeautifulSoup object's state included the
+        # markup of the document.
+        state = dict(self.soup("").__dict__)
+        state["builder"] = HTMLParserTreeBuilder
+        state["markup"] = "<p class='a b'>text</p>"
+        soup = BeautifulSoup.__new__(BeautifulSoup)
+        soup.__setstate__(state)
+        assert soup.decode() == '<p class="a b">text</p>'
+
+        tag = Tag.__new__(Tag)
+        tag.__setstate__(
+            dict(
+                name="br",
+                attrs={},
+                contents=[],
+                can_be_empty_element=True,
+                hidden=False,
+                parser_class=None,
+                namespace=None,
+                prefix=None,
+                known_xml=False,
+                parent=None,
+                next_element=None,
+                previous_element=None,
+                next_sibling=None,
+                previous_sibling=None,
+            )
+        )
+        assert tag.decode() == "<br/>"
+
+    def test_bad_data(self):
+        with pytest.raises(ValueError):
+            loads(b"<p>not a parse tree</p>")
+        with pytest.raises(ValueError):
+            loads(MAGIC + b"garbage")
+
+    def test_only_tree_classes_can_be_loaded(self):
+        # Anything that might run arbitrary code when it's loaded is
+        # rejected.
+        data = MAGIC + pickle.dumps((1, "little", [], [], [print], [], None), 4)
+        with pytest.raises(ValueError) as e:
+            loads(data)
+        assert "builtins.print can't be part of a serialized parse tree" in str(
+            e.value
+        )
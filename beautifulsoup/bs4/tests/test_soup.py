@@ -1,15 +1,22 @@
 # -*- coding: utf-8 -*-
 """Tests of Beautiful Soup as a whole."""
 
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import gc
+import io
 import logging
 import pickle
 import pytest
 from typing import Iterable
+import weakref
 
 from bs4 import (
     BeautifulSoup,
     GuessedAtParserWarning,
     dammit,
+    iterparse,
+    loads,
 )
 from bs4.builder import (
     TreeBuilder,
@@ -34,6 +41,7 @@ from bs4._warnings import (
 from . import (
     default_builder,
     LXML_PRESENT,
+    SOUP_SIEVE_PRESENT,
     SoupTest,
 )
 import warnings
@@ -242,6 +250,29 @@ class TestConstructor(SoupTest):
             in str(exc_info.value)
         )
 
+    def test_pause_gc(self):
+        enabled = []
+
+        class Builder(TreeBuilder):
+            def feed(self, markup):
+                enabled.append(gc.isenabled())
+
+        assert gc.isenabled()
+        BeautifulSoup("<p>", builder=Builder, pause_gc=True)
+        assert enabled == [False]
+        assert gc.isenabled()
+
+        BeautifulSoup("<p>", builder=Builder)
+        assert enabled == [False, True]
+
+        # If the garbage collector was already off, it stays off.
+        gc.disable()
+        try:
+            BeautifulSoup("<p>", builder=Builder, pause_gc=True)
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
 
 class TestOutput(SoupTest):
     @pytest.mark.parametrize(
@@ -465,6 +496,439 @@ class TestSelectiveParsing(SoupTest):
         assert soup.encode() == b"<b>Yes</b><b>Yes <c>Yes</c></b>"
 
 
+class TestIncrementalParsing(SoupTest):
+    """Test BeautifulSoup.feed() and BeautifulSoup.close()."""
+
+    PARSERS = ["html.parser"] + (["lxml", "lxml-xml"] if LXML_PRESENT else [])
+
+    markup = (
+        "<html><head><title>caf\N{LATIN SMALL LETTER E WITH ACUTE}</title></head>"
+        "<body><p class='a b'>\N{SNOWMAN} <b>bold</b><!--comment--></p>"
+        + "<p>paragraph</p>" * 300
+        + "</body></html>"
+    )
+
+    def feed_in_chunks(self, soup, data, size):
+        for i in range(0, len(data), size):
+            soup.feed(data[i : i + size])
+        soup.close()
+        return soup
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    @pytest.mark.parametrize("size", [1, 5, 512, 100000])
+    def test_unicode_chunks(self, parser, size):
+        soup = self.feed_in_chunks(BeautifulSoup(features=parser), self.markup, size)
+        assert soup.decode() == BeautifulSoup(self.markup, parser).decode()
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    @pytest.mark.parametrize("size", [1, 5, 512, 100000])
+    def test_bytestring_chunks(self, parser, size):
+        # Multibyte characters will be split across chunks; that
+        # doesn't cause a problem.
+        data = self.markup.encode("utf8")
+        soup = self.feed_in_chunks(BeautifulSoup(features=parser), data, size)
+        expect = BeautifulSoup(data, parser)
+        assert soup.decode() == expect.decode()
+        assert "utf-8" == soup.original_encoding
+        assert None is soup.builder.soup
+
+    def test_encoding_is_detected_from_start_of_document(self):
+        data = (
+            '<meta charset="iso-8859-8">' + "<p>\N{HEBREW LETTER ALEF}</p>" * 1000
+        ).encode("iso-8859-8")
+        soup = self.feed_in_chunks(BeautifulSoup(features="html.parser"), data, 10)
+        assert "iso-8859-8" == soup.original_encoding
+        assert "iso-8859-8" == soup.declared_html_encoding
+        assert "\N{HEBREW LETTER ALEF}" == soup.p.string
+
+    def test_from_encoding(self):
+        data = "<p>Caf\N{LATIN SMALL LETTER E WITH ACUTE}</p>".encode("utf-16le")
+        soup = BeautifulSoup(features="html.parser", from_encoding="utf-16le")
+        self.feed_in_chunks(soup, data, 3)
+        assert "utf-16le" == soup.original_encoding
+        assert "Caf\N{LATIN SMALL LETTER E WITH ACUTE}" == soup.p.string
+
+    def test_undecodable_bytes_after_encoding_is_chosen(self):
+        soup = BeautifulSoup(features="html.parser", from_encoding="utf8")
+        soup.feed(b"<p>Caf\xc3\xa9</p>")
+        assert False is soup.contains_replacement_characters
+        soup.feed(b"<p>\xff</p>")
+        soup.close()
+        assert "\N{REPLACEMENT CHARACTER}" == soup.find_all("p")[1].string
+        assert True is soup.contains_replacement_characters
+
+    def test_short_document(self):
+        # The document is so short that the encoding isn't chosen until
+        # close() is called.
+        soup = BeautifulSoup(features="html.parser")
+        soup.feed(b"<b>bold")
+        assert [] == soup.contents
+        soup.close()
+        assert "<b>bold</b>" == soup.decode()
+
+    def test_parse_only_and_element_classes_are_respected(self):
+        class MyTag(Tag):
+            pass
+
+        soup = BeautifulSoup(
+            features="html.parser",
+            parse_only=SoupStrainer("b"),
+            element_classes={Tag: MyTag},
+        )
+        self.feed_in_chunks(soup, "<a>no</a><b>yes</b><i>no</i><b>yes</b>", 3)
+        assert "<b>yes</b><b>yes</b>" == soup.decode()
+        assert isinstance(soup.b, MyTag)
+
+    def test_close_without_feed(self):
+        soup = BeautifulSoup(features="html.parser")
+        soup.close()
+        assert "" == soup.decode()
+
+    def test_cannot_mix_strings_and_bytestrings(self):
+        soup = BeautifulSoup(features="html.parser")
+        soup.feed("<p>")
+        with pytest.raises(TypeError):
+            soup.feed(b"</p>")
+
+    def test_cannot_feed_soup_with_markup(self):
+        soup = self.soup("<p>")
+        with pytest.raises(ValueError):
+            soup.feed("<b>")
+
+    def test_cannot_feed_after_close(self):
+        soup = BeautifulSoup(features="html.parser")
+        soup.feed("<p>")
+        soup.close()
+        with pytest.raises(ValueError):
+            soup.feed("<b>")
+
+    def test_builder_without_incremental_support(self):
+        class Builder(TreeBuilder):
+            def feed(self, markup):
+                pass
+
+        soup = BeautifulSoup(builder=Builder)
+        with pytest.raises(NotImplementedError):
+            soup.feed("<p>")
+
+    def test_rejected_markup(self):
+        soup = BeautifulSoup(features="html.parser")
+        with pytest.raises(ParserRejectedMarkup):
+            soup.feed(b"<![UNKNOWN[]]>")
+            soup.close()
+
+
+class TestIterparse(SoupTest):
+    """Test the iterparse() function."""
+
+    PARSERS = ["html.parser"] + (["lxml-xml"] if LXML_PRESENT else [])
+
+    markup = (
+        "<doc><info>header</info><urlset>"
+        + "".join("\n<url><loc>/%d</loc></url>" % i for i in range(200))
+        + "\n</urlset></doc>"
+    )
+
+    def assert_linkage(self, tag):
+        # Walking the tree through .contents and walking it through
+        # .next_element must give the same result.
+        expect = list(tag.descendants)
+        element = tag.next_element
+        for e in expect:
+            assert e is element
+            element = element.next_element
+        assert element is None
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    @pytest.mark.parametrize("chunk_size", [1, 7, 100000])
+    def test_yields_each_match(self, parser, chunk_size):
+        locs = [
+            url.loc.string
+            for url in iterparse(
+                self.markup, SoupStrainer("url"), parser, chunk_size=chunk_size
+            )
+        ]
+        assert locs == ["/%d" % i for i in range(200)]
+
+    @pytest.mark.parametrize("parser", PARSERS)
+    def test_matches_are_discarded(self, parser):
+        largest = 0
+        previous = None
+        for url in iterparse(self.markup, SoupStrainer("url"), parser, chunk_size=50):
+            if previous is not None:
+                # The previous match was removed from the tree, but
+                # it's still intact.
+                assert previous.parent is None
+                assert previous.previous_element is None
+                assert previous._last_descendant().next_element is None
+                assert previous.loc is not None
+            largest = max(largest, len(url.parent.contents))
+            doc = url.parent.parent
+            self.assert_linkage(doc)
+            previous = url
+        # The parse tree never grew beyond a few <url> tags.
+        assert largest < 10
+
+        # Everything outside the <urlset> tag was kept.
+        assert doc.info.string == "header"
+        assert doc.url is None
+        self.assert_linkage(doc)
+
+    def test_source_types(self):
+        chunks = ["<a><b>1</b>", "<c>", "</c><b>", "2</b></a>"]
+        for source in (
+            iter(chunks),
+            io.StringIO("".join(chunks)),
+            io.BytesIO("".join(chunks).encode("utf8")),
+        ):
+            result = [
+                b.string for b in iterparse(source, SoupStrainer("b"), "html.parser")
+            ]
+            assert result == ["1", "2"]
+
+    def test_matches_are_not_nested(self):
+        markup = "<div id='1'><div id='2'></div><p></p></div>"
+        result = [
+            (div["id"], str(div))
+            for div in iterparse(markup, SoupStrainer("div"), "html.parser")
+        ]
+        assert result == [
+            ("2", '<div id="2"></div>'),
+            ("1", '<div id="1"><p></p></div>'),
+        ]
+
+    def test_match_can_be_kept(self):
+        markup = "<root><a>1</a><a>2</a></root>"
+        soup = self.soup("<kept></kept>")
+        for a in iterparse(markup, SoupStrainer("a"), "html.parser", chunk_size=1):
+            soup.kept.append(a)
+        assert soup.decode() == "<kept><a>1</a><a>2</a></kept>"
+
+    @pytest.mark.skipif(
+        not (LXML_PRESENT and SOUP_SIEVE_PRESENT),
+        reason="lxml and soupsieve are both required",
+    )
+    def test_css_selector_with_namespace(self):
+        markup = (
+            '<feed xmlns:a="http://a/"><a:entry id="1"><b>x</b></a:entry>'
+            '<a:entry id="2"><b/></a:entry><entry id="3"><b>x</b></entry></feed>'
+        )
+        result = [
+            entry["id"]
+            for entry in iterparse(markup, "a|entry:has(b:not(:empty))", chunk_size=10)
+        ]
+        assert result == ["1"]
+
+
+class TestRelease(SoupTest):
+    """Test the BeautifulSoup.release() method."""
+
+    def test_elements_are_freed_without_the_garbage_collector(self):
+        soup = self.soup("<div><p>a<b>b</b></p><p id='2'>c</p></div>")
+        elements = [weakref.ref(x) for x in soup.descendants]
+        gc.disable()
+        try:
+            soup.release()
+            assert all(ref() is None for ref in elements)
+        finally:
+            gc.enable()
+
+    def test_elements_are_disconnected(self):
+        soup = self.soup("<div><p>a<b>b</b></p><p>c</p></div>")
+        p = soup.p
+        string = soup.b.string
+        soup.release()
+        assert p.parent is None
+        assert p.contents == []
+        assert p.next_sibling is None
+        assert p.next_element is None
+        assert string.parent is None
+        assert string.previous_element is None
+        # Attributes are left alone.
+        assert p.name == "p"
+
+    def test_soup_can_be_used_again(self):
+        soup = self.soup("<p>a</p>", use_index=True, query_cache_size=4)
+        assert soup.find("p") is not None
+        version = soup.tree_version
+        soup.release()
+        assert soup.tree_version > version
+        assert soup.contents == []
+        assert soup.find("p") is None
+        assert soup.decode() == ""
+        soup.append(soup.new_tag("b", string="new"))
+        assert soup.decode() == "<b>new</b>"
+        assert soup.find("b").string == "new"
+        self.linkage_validator(soup)
+
+    def test_release_inside_a_batch(self):
+        soup = self.soup("<p>a</p><p>b</p>")
+        with soup.batch_edit():
+            soup.p.extract()
+            soup.release()
+            assert soup.contents == []
+        assert soup.decode() == ""
+
+
+class TestFreeze(SoupTest):
+    """Test the BeautifulSoup.freeze() method."""
+
+    markup = (
+        "<div class='a b'><p id='1'>one<b>two</b></p>"
+        "<p id='2'>three</p><ul><li>x</li><li>y</li></ul></div>end"
+    )
+
+    def test_changes_are_refused(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        assert soup.frozen
+        before = soup.decode()
+        other = self.soup("<i></i>")
+        for change in [
+            lambda: soup.p.append("x"),
+            lambda: soup.p.insert(0, "x"),
+            lambda: soup.p.insert_before("x"),
+            lambda: soup.b.extract(),
+            lambda: soup.b.decompose(),
+            lambda: soup.b.unwrap(),
+            lambda: soup.b.wrap(soup.new_tag("i")),
+            lambda: soup.b.string.replace_with("x"),
+            lambda: setattr(soup.b, "string", "x"),
+            lambda: soup.ul.clear(),
+            lambda: soup.p.__setitem__("id", "3"),
+            lambda: soup.p.__delitem__("id"),
+            lambda: soup.contents[-1].extract(),
+            lambda: other.i.append(soup.b),
+            lambda: soup.smooth(),
+            lambda: soup.decompose(),
+            lambda: soup.release(),
+            lambda: soup.reset(),
+            lambda: soup.batch_edit(),
+            lambda: soup.feed("<p>more</p>"),
+        ]:
+            with pytest.raises(ValueError):
+                change()
+        assert soup.decode() == before
+        self.linkage_validator(soup)
+
+    def test_contents_and_attributes_are_read_only(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        assert isinstance(soup.div.contents, tuple)
+        assert isinstance(soup.contents, tuple)
+        with pytest.raises(TypeError):
+            soup.p.attrs["id"] = "3"
+        assert soup.p["id"] == "1"
+
+    def test_searching_and_output(self):
+        soup = self.soup(self.markup)
+        expect = self.soup(self.markup)
+        soup.freeze()
+        assert soup.decode() == expect.decode()
+        assert soup.prettify() == expect.prettify()
+        assert soup.get_text("|") == expect.get_text("|")
+        assert [x["id"] for x in soup.find_all("p")] == ["1", "2"]
+        assert soup.find(id="2").string == "three"
+        assert soup.li.find_next_sibling("li").string == "y"
+        assert soup.ul.index(soup.ul.contents[1]) == 1
+        assert soup.div.p == expect.div.p
+        assert hash(soup.div) == hash(expect.div)
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_select(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        assert [x.string for x in soup.select("div > ul li")] == ["x", "y"]
+
+    def test_freeze_twice(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        soup.freeze()
+        assert soup.frozen
+
+    def test_reading_ignores_other_documents_batches(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        other = self.soup("<p>a</p>")
+        p = other.p
+        with other.batch_edit():
+            p.append("b")
+            assert soup.get_text() == "onetwothreexyend"
+            assert soup.find_all("li")[1].string == "y"
+            # The other document wasn't brought up to date.
+            assert p.contents[0].next_element is None
+        assert p.contents[0].next_element == "b"
+
+    def test_freeze_inside_a_batch(self):
+        soup = self.soup(self.markup)
+        with soup.batch_edit():
+            with pytest.raises(ValueError):
+                soup.freeze()
+        assert not soup.frozen
+
+    def test_copy_is_not_frozen(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        copied = copy.copy(soup)
+        assert not copied.frozen
+        assert isinstance(copied.div.contents, list)
+        copied.p.append("more")
+        copied.p["id"] = "3"
+        assert copied.p.decode() == '<p id="3">one<b>two</b>more</p>'
+        self.linkage_validator(copied)
+
+        p = copy.copy(soup.p)
+        p.append("more")
+        assert p.decode() == '<p id="1">one<b>two</b>more</p>'
+
+    def test_pickle(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        loaded = pickle.loads(pickle.dumps(soup))
+        assert loaded.decode() == soup.decode()
+
+    def test_dumps(self):
+        soup = self.soup(self.markup)
+        soup.freeze()
+        loaded = loads(soup.dumps())
+        assert loaded.decode() == soup.decode()
+        assert not loaded.frozen
+        loaded.p["id"] = "3"
+        self.linkage_validator(loaded)
+
+    def test_concurrent_reads(self):
+        markup = "".join(
+            "<div class='d%d'><p id='p%d'>%d<b>bold</b></p><ul>%s</ul></div>"
+            % (i % 5, i, i, "<li>x</li>" * (i % 7))
+            for i in range(50)
+        )
+        soup = BeautifulSoup(
+            markup,
+            "html.parser",
+            use_index=True,
+            query_cache_size=8,
+            cache_rendering=True,
+        )
+        soup.freeze()
+
+        def read(i):
+            results = [
+                len(soup.find_all("li")),
+                [x.p["id"] for x in soup.find_all("div", class_="d%d" % (i % 5))],
+                soup.find(id="p%d" % i).get_text(),
+                soup.decode(),
+                soup.find_all("div")[i].decode(),
+            ]
+            if SOUP_SIEVE_PRESENT:
+                results.append(len(soup.select("div.d%d li" % (i % 5))))
+            return results
+
+        expect = [read(i) for i in range(50)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in range(3):
+                assert list(executor.map(read, range(50))) == expect
+
+
 class TestNewTag(SoupTest):
     """Test the BeautifulSoup.new_tag() method."""
 
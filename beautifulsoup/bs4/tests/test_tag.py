@@ -1,7 +1,11 @@
 import warnings
+from bs4.builder import HTMLParserTreeBuilder
 from bs4.element import (
+    CharsetMetaAttributeValue,
     Comment,
     NavigableString,
+    Script,
+    Tag,
 )
 from . import SoupTest
 
@@ -174,6 +178,99 @@ class TestTag(SoupTest):
         assert script.div.script.get_text() == "<!--a comment-->Some text"
         assert list(script.div.script.strings) == ["<!--a comment-->Some text"]
 
+    def test_get_text_collapse_whitespace(self):
+        soup = self.soup("<p>  a \n\t b <b> </b>\n c</p>")
+        assert soup.p.get_text(collapse_whitespace=True) == " a b   c"
+        assert soup.p.get_text(strip=True, collapse_whitespace=True) == "a bc"
+        assert (
+            soup.p.get_text("|", strip=True, collapse_whitespace=True) == "a b|c"
+        )
+        assert soup.p.string is None
+        assert soup.b.string.get_text(collapse_whitespace=True) == " "
+
+    def test_strings_with_specific_types(self):
+        soup = self.soup("a<!--b--><b>c<![CDATA[d]]></b><?e>")
+        assert list(soup.strings) == ["a", "c", "d"]
+        assert list(soup._all_strings(types=Comment)) == ["b"]
+        assert list(soup._all_strings(types=[Comment, NavigableString])) == [
+            "a",
+            "b",
+            "c",
+        ]
+        assert len(list(soup._all_strings(types=None))) == 5
+
+        # Asking for tags doesn't find any.
+        assert list(soup._all_strings(types=(Tag, NavigableString))) == ["a", "c"]
+
+    def test_strings_survive_modification(self):
+        # A string can be removed from the tree while it's being
+        # iterated over.
+        soup = self.soup("<p>a<b>b</b>c</p>")
+        found = []
+        for string in soup.strings:
+            found.append(string)
+            string.extract()
+        assert found == ["a", "b", "c"]
+        assert soup.decode() == "<p><b></b></p>"
+
+    def test_result_set_get_text(self):
+        soup = self.soup("<p> a <b>b</b></p><p>c</p><script>d</script>")
+        results = soup.find_all(["p", "script"])
+        assert results.get_text() == [" a b", "c", "d"]
+        assert results.get_text("|", strip=True) == ["a|b", "c", "d"]
+        for tag, text in zip(results, results.get_text(" ", True)):
+            assert tag.get_text(" ", True) == text
+        assert soup.find_all("nosuchtag").get_text() == []
+
+
+class TestTagProfile(SoupTest):
+    """Test the TagProfile objects shared by tags with the same name."""
+
+    def test_tags_with_the_same_name_share_a_profile(self):
+        soup = self.soup("<p><br/></p><p><br/></p><script>x</script>")
+        p1, p2 = soup.find_all("p")
+        br1, br2 = soup.find_all("br")
+        assert p1._profile is p2._profile
+        assert br1._profile is br2._profile
+        assert p1._profile is not br1._profile
+        assert p1._profile is soup.builder.tag_profile("p")
+
+        assert False is p1.can_be_empty_element
+        assert True is br1.can_be_empty_element
+        assert {Script} == soup.script.interesting_string_types
+        assert Tag.MAIN_CONTENT_STRING_TYPES == p1.interesting_string_types
+
+    def test_changing_profile_value_affects_only_one_tag(self):
+        soup = self.soup("<p></p><p></p>")
+        p1, p2 = soup.find_all("p")
+        p1.can_be_empty_element = True
+        assert "<p/>" == p1.decode()
+        assert "<p></p>" == p2.decode()
+        assert p2._profile is soup.builder.tag_profile("p")
+
+    def test_substitutions_only_set_up_for_meta_tags(self):
+        builder = HTMLParserTreeBuilder()
+        assert True is builder.tag_profile("meta").has_substitutions
+        assert False is builder.tag_profile("p").has_substitutions
+
+        soup = self.soup('<meta charset="utf8">')
+        assert isinstance(soup.meta["charset"], CharsetMetaAttributeValue)
+
+    def test_overridden_set_up_substitutions_is_called_for_every_tag(self):
+        class Builder(HTMLParserTreeBuilder):
+            def set_up_substitutions(self, tag):
+                tag["seen"] = "yes"
+                return True
+
+        soup = self.soup("<p><b></b></p>", builder=Builder)
+        assert "yes" == soup.p["seen"]
+        assert "yes" == soup.b["seen"]
+
+    def test_copy_shares_profile(self):
+        soup = self.soup("<p>text</p>")
+        copied = soup.p.__copy__()
+        assert copied._profile is soup.p._profile
+
 
 class TestMultiValuedAttributes(SoupTest):
     """Test the behavior of multi-valued attributes like 'class'.
@@ -0,0 +1,122 @@
+import pytest
+
+from bs4 import (
+    BeautifulSoup,
+    TextRenderer,
+)
+from bs4.element import (
+    Comment,
+    NavigableString,
+    Script,
+)
+from . import (
+    LXML_PRESENT,
+    SoupTest,
+)
+
+
+class TestTextRenderer(SoupTest):
+    markup = (
+        "<html><head><title>The  title</title><style>p { color: red }</style>"
+        "<script>alert('hi')</script></head><body>"
+        "<h1>A <i>heading</i></h1>"
+        "<p>  A   paragraph\n with\ta <b>bold</b>word. </p><!--comment-->"
+        "<div>before<div>nested</div>after</div>"
+        "<ul><li>one</li><li> two </li></ul>"
+        "<table><tr><th>a</th><th>b</th></tr><tr><td>1</td><td> 2 </td></tr></table>"
+        "<pre>  keep\n    this </pre>"
+        "<template><p>Not shown.</p></template>"
+        "line<br>break<br><br>blank line"
+        "</body></html>"
+    )
+
+    expect = (
+        "The title\n"
+        "A heading\n"
+        "A paragraph with a boldword.\n"
+        "before\n"
+        "nested\n"
+        "after\n"
+        "one\n"
+        "two\n"
+        "a\tb\n"
+        "1\t2\n"
+        "  keep\n"
+        "    this \n"
+        "line\n"
+        "break\n"
+        "\n"
+        "blank line"
+    )
+
+    def test_render(self):
+        soup = self.soup(self.markup)
+        assert TextRenderer().render(soup) == self.expect
+        assert soup.get_text(layout="block") == self.expect
+        assert TextRenderer().lines(soup) == self.expect.split("\n")
+
+    def test_render_part_of_a_document(self):
+        soup = self.soup(self.markup)
+        assert soup.body.div.get_text(layout="block") == "before\nnested\nafter"
+        assert soup.p.b.get_text(layout="block") == "bold"
+        assert soup.p.b.string.get_text(layout="block") == "bold"
+        assert soup.find("li").next_sibling.get_text(layout="block") == "two"
+
+        # Rendering a <script> tag gives its contents, just as
+        # get_text() does.
+        assert soup.script.get_text(layout="block") == "alert('hi')"
+
+    def test_whitespace(self):
+        soup = self.soup("<p>  a  <b> b </b>c<i> </i> d  </p><p>\n</p><p>e</p>")
+        assert soup.get_text(layout="block") == "a b c d\ne"
+
+        # Line breaks at the start and end are dropped.
+        soup = self.soup("<br><br>a<br><br>")
+        assert soup.get_text(layout="block") == "a"
+
+    def test_types(self):
+        soup = self.soup("<p>a<!--b--></p><p>c</p>")
+        assert soup.get_text(layout="block", types=Comment) == "b"
+        assert soup.get_text(layout="block", types=None) == "ab\nc"
+        assert (
+            soup.get_text(layout="block", types=[NavigableString, Script]) == "a\nc"
+        )
+
+    def test_configuration(self):
+        soup = self.soup(
+            "<div><section>a<span>b</span><hr>c</section></div>"
+            "<table><tr><td>1</td><td>2</td></tr></table><pre>d   e</pre>"
+        )
+        renderer = TextRenderer(
+            block_elements=["section", "tr"],
+            line_break_elements=["span"],
+            cell_elements=["td"],
+            preserve_whitespace_tags=[],
+            cell_separator=" | ",
+        )
+        assert renderer.lines(soup) == ["a", "bc", "1 | 2", "d e"]
+
+        # Compare the default settings.
+        assert TextRenderer().render(soup) == "ab\nc\n1\t2\nd   e"
+
+    def test_deeply_nested_document(self):
+        soup = self.soup("<div>" * 2000 + "text")
+        assert soup.get_text(layout="block") == "text"
+
+    def test_result_set(self):
+        soup = self.soup(self.markup)
+        assert soup.find_all(["h1", "ul"]).get_text(layout="block") == [
+            "A heading",
+            "one\ntwo",
+        ]
+
+    def test_bad_layout(self):
+        soup = self.soup(self.markup)
+        with pytest.raises(ValueError):
+            soup.get_text(layout="columns")
+
+    @pytest.mark.skipif(not LXML_PRESENT, reason="lxml not installed")
+    def test_xml(self):
+        soup = BeautifulSoup("<doc><item>a</item><item>b</item></doc>", "xml")
+        assert soup.get_text(layout="block") == "ab"
+        assert TextRenderer(block_elements=["item"]).render(soup) == "a\nb"
@@ -23,6 +23,7 @@ from bs4.element import (
 )
 from bs4.filter import SoupStrainer
 from . import (
+    SOUP_SIEVE_PRESENT,
     SoupTest,
 )
 
@@ -383,6 +384,71 @@ class TestFindAllByAttribute(SoupTest):
         assert [] == soup.find_all(id=1, string="bar")
 
 
+class TestFindAllMany(SoupTest):
+    markup = (
+        '<div><a href="/1">one</a><img src="1.png"><a>two</a>'
+        '<p class="price">$1</p></div><p class="price">$2</p>'
+        '<a href="/3">three</a><img>'
+    )
+
+    def test_filters(self):
+        soup = self.soup(self.markup)
+        queries = {
+            "links": SoupStrainer("a", href=True),
+            "prices": SoupStrainer(class_="price"),
+            "strings": SoupStrainer(string=re.compile("^t")),
+            "nothing": SoupStrainer("table"),
+        }
+        results = soup.find_all_many(queries)
+        assert list(results) == list(queries)
+        for key, strainer in queries.items():
+            assert results[key] == soup.find_all(strainer)
+            assert results[key].source is strainer
+        assert [x.string for x in results["links"]] == ["one", "three"]
+        assert results["strings"] == ["two", "three"]
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_css_selectors(self):
+        soup = self.soup(self.markup)
+        queries = {
+            "images": "img[src]",
+            "nested": "div > a",
+            "last": "p.price:last-of-type",
+            "scoped": ":scope > a",
+        }
+        for start in (soup, soup.div):
+            results = start.find_all_many(queries)
+            for key, selector in queries.items():
+                assert results[key] == start.select(selector)
+
+    @pytest.mark.skipif(not SOUP_SIEVE_PRESENT, reason="Soup Sieve not installed")
+    def test_limit(self):
+        soup = self.soup(self.markup)
+        queries = {"a": SoupStrainer("a"), "p": "p", "img": "img"}
+        results = soup.find_all_many(queries, limit=1)
+        assert [len(x) for x in results.values()] == [1, 1, 1]
+
+        results = soup.find_all_many(queries, limit={"a": 2, "p": 1})
+        assert results["a"] == soup.find_all("a", limit=2)
+        assert results["p"] == [soup.p]
+        assert len(results["img"]) == 2
+
+    def test_stops_when_every_limit_is_reached(self):
+        seen = []
+
+        def first_tag(element):
+            seen.append(element)
+            return True
+
+        soup = self.soup(self.markup)
+        results = soup.find_all_many({"first": SoupStrainer(first_tag)}, limit=1)
+        assert results["first"] == [soup.div]
+        assert seen == [soup.div]
+
+    def test_no_queries(self):
+        assert self.soup(self.markup).find_all_many({}) == {}
+
+
 class TestSmooth(SoupTest):
     """Test Tag.smooth."""
 
@@ -426,6 +492,49 @@ class TestSmooth(SoupTest):
         assert "Comment 1" == div.contents[1]
         assert "Comment 2" == div.contents[2]
 
+    def test_smooth_long_run_of_strings(self):
+        soup = self.soup(
+            "<p>%s<b>bold</b>x</p><p>after</p>"
+            % "".join("<span>%d</span>" % i for i in range(100))
+        )
+        p = soup.p
+        for span in p.find_all("span"):
+            span.unwrap()
+        assert 102 == len(p.contents)
+        x = p.contents[-1]
+        p.smooth()
+        assert ["".join(str(i) for i in range(100)), "<b>bold</b>", "x"] == [
+            str(c) for c in p.contents
+        ]
+        # A string that wasn't next to another string is left alone.
+        assert x is p.contents[-1]
+        self.linkage_validator(soup)
+        assert p.contents[0].previous_element is p
+        assert p.contents[0].next_element is p.b
+
+    def test_smooth_preserves_preformatted_strings(self):
+        soup = self.soup("<div>a</div>")
+        div = soup.div
+        div.append("b")
+        div.append(CData("c"))
+        div.append("d")
+        div.append("e")
+        div.smooth()
+        assert ["ab", "c", "de"] == div.contents
+        assert isinstance(div.contents[1], CData)
+        self.linkage_validator(soup)
+
+    def test_smooth_deeply_nested_tree(self):
+        soup = self.soup("")
+        tag = soup
+        # Deeper than Python's default recursion limit.
+        for i in range(1200):
+            tag = tag.append(soup.new_tag("b"))
+        tag.append("a")
+        tag.append("b")
+        soup.smooth()
+        assert ["ab"] == tag.contents
+
 
 class TestIndex(SoupTest):
     """Test Tag.index"""
@@ -446,6 +555,31 @@ class TestIndex(SoupTest):
         with pytest.raises(ValueError):
             tree.index(1)
 
+    def test_index_of_wide_tag(self):
+        # A tag with a lot of children keeps track of where each child
+        # is, instead of looking through its contents every time.
+        soup = self.soup("<ul>%s</ul>" % ("<li>item</li>" * 100))
+        ul = soup.ul
+        items = list(ul.contents)
+        assert ul.index(items[50]) == 50
+        assert ul._positions is not None
+
+        items[10].extract()
+        items[90].decompose()
+        items[60].insert_after(soup.new_tag("b"))
+        ul.insert(0, "first")
+        ul.append(items[0])
+        for i, element in enumerate(ul.contents):
+            assert i == ul.index(element)
+        with pytest.raises(ValueError):
+            ul.index(items[10])
+
+        # Changing .contents directly doesn't tell the tag anything,
+        # but it still finds the right answer.
+        ul.contents.reverse()
+        for i, element in enumerate(ul.contents):
+            assert i == ul.index(element)
+
 
 class TestParentOperations(SoupTest):
     """Test navigation and searching through an element's parents."""
@@ -1306,6 +1440,32 @@ class TestTreeModification(SoupTest):
         a.clear(decompose=True)
         assert 0 == len(em.contents)
 
+    @pytest.mark.parametrize("decompose", [False, True])
+    def test_clear_keeps_tree_consistent(self, decompose):
+        soup = self.soup(
+            "<div><p>before</p><ul><li>1</li><li><b>2</b>3</li>4</ul><p>after</p></div>"
+        )
+        ul = soup.ul
+        contents = ul.contents
+        children = list(contents)
+        ul.clear(decompose=decompose)
+        assert contents is ul.contents
+        assert contents == []
+        self.linkage_validator(soup)
+        assert ul.next_element == soup.find_all("p")[1]
+        assert soup.decode() == "<div><p>before</p><ul></ul><p>after</p></div>"
+        if decompose:
+            assert all(child.decomposed for child in children)
+        else:
+            for child in children:
+                assert child.parent is None
+                assert child.previous_element is None
+                assert child.next_sibling is None
+            self.linkage_validator(children[1])
+            assert children[1].decode() == "<li><b>2</b>3</li>"
+            assert children[1].contents[-1].next_element is None
+            assert children[2].next_element is None
+
     @pytest.mark.parametrize(
         "method_name,expected_result",
         [
@@ -0,0 +1,271 @@
+"""Render a parse tree as readable plain text.
+
+`Tag.get_text` runs all of the strings in a tree together. A
+`TextRenderer` lays them out more the way a web browser would: each
+block-level element (a paragraph, a list item, a table row, a
+heading...) goes on its own line, a <br> tag breaks the line, and runs
+of whitespace in the markup become single spaces, except inside tags
+like <pre>. The strings inside <script>, <style> and <template> tags,
+along with comments and the like, are left out.
+
+The easiest way to use this is to call
+``tag.get_text(layout="block")``.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.element import (
+    NavigableString,
+    PageElement,
+    Tag,
+    _string_classes,
+)
+
+if TYPE_CHECKING:
+    from bs4._typing import _OneOrMoreStringTypes
+
+
+class TextRenderer(object):
+    """Turns a `Tag` (or a whole document) into plain text, one line
+    per block-level element.
+
+    The tree is rendered in a single pass over `Tag._event_stream`,
+    without any recursion. Which strings show up in the output is
+    decided by their class, the same way as with `Tag.get_text`, so
+    the contents of <script>, <style> and <template> tags (which are
+    `Script`, `Stylesheet` and `TemplateString` objects) are skipped
+    without any need to look at the tags they're in.
+    """
+
+    #: Tags that start a new line and end their own line. These are
+    #: the block-level elements defined by the HTML standard (see
+    #: `HTMLTreeBuilder.DEFAULT_BLOCK_ELEMENTS`), plus some other tags
+    #: that browsers show on lines of their own.
+    DEFAULT_BLOCK_ELEMENTS: Set[str] = HTMLTreeBuilder.DEFAULT_BLOCK_ELEMENTS | set(
+        [
+            "body",
+            "caption",
+            "details",
+            "dialog",
+            "head",
+            "hgroup",
+            "html",
+            "legend",
+            "menu",
+            "optgroup",
+            "option",
+            "summary",
+            "tbody",
+            "thead",
+            "title",
+            "tr",
+        ]
+    )
+
+    #: Tags that break the line they're on.
+    DEFAULT_LINE_BREAK_ELEMENTS: Set[str] = set(["br"])
+
+    #: Tags that hold one cell of a table row.
+    DEFAULT_CELL_ELEMENTS: Set[str] = set(["td", "th"])
+
+    #: Whitespace inside these tags is kept as it is.
+    DEFAULT_PRESERVE_WHITESPACE_TAGS: Set[str] = (
+        HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS
+    )
+
+    block_elements: Set[str]  #: :meta private:
+    line_break_elements: Set[str]  #: :meta private:
+    cell_elements: Set[str]  #: :meta private:
+    preserve_whitespace_tags: Set[str]  #: :meta private:
+    cell_separator: str  #: :meta private:
+
+    def __init__(
+        self,
+        block_elements: Optional[Iterable[str]] = None,
+        line_break_elements: Optional[Iterable[str]] = None,
+        cell_elements: Optional[Iterable[str]] = None,
+        preserve_whitespace_tags: Optional[Iterable[str]] = None,
+        cell_separator: str = "\t",
+    ):
+        """Constructor.
+
+        :param block_elements: The names of tags that go on their own
+            lines. Defaults to `TextRenderer.DEFAULT_BLOCK_ELEMENTS`.
+        :param line_break_elements: The names of tags that break a
+            line. Defaults to `TextRenderer.DEFAULT_LINE_BREAK_ELEMENTS`.
+        :param cell_elements: The names of tags that hold the cells of
+            a table row. Defaults to `TextRenderer.DEFAULT_CELL_ELEMENTS`.
+        :param preserve_whitespace_tags: The names of tags whose
+            whitespace should be left alone. Defaults to
+            `TextRenderer.DEFAULT_PRESERVE_WHITESPACE_TAGS`.
+        :param cell_separator: This string goes between the cells of a
+            table row.
+        """
+        if block_elements is None:
+            block_elements = self.DEFAULT_BLOCK_ELEMENTS
+        if line_break_elements is None:
+            line_break_elements = self.DEFAULT_LINE_BREAK_ELEMENTS
+        if cell_elements is None:
+            cell_elements = self.DEFAULT_CELL_ELEMENTS
+        if preserve_whitespace_tags is None:
+            preserve_whitespace_tags = self.DEFAULT_PRESERVE_WHITESPACE_TAGS
+        self.block_elements = set(block_elements)
+        self.line_break_elements = set(line_break_elements)
+        self.cell_elements = set(cell_elements)
+        self.preserve_whitespace_tags = set(preserve_whitespace_tags)
+        self.cell_separator = cell_separator
+
+    def render(
+        self,
+        element: PageElement,
+        types: _OneOrMoreStringTypes = PageElement.default,
+    ) -> str:
+        """Render a `Tag` or a `NavigableString` as plain text.
+
+        :param element: The element to render.
+        :param types: The classes of string to include, as with
+            `Tag.get_text`. By default, these are the strings
+            `Tag.get_text` would find.
+        :return: The text, with lines separated by newlines. There
+            are no blank lines, except where <br> tags call for them.
+        """
+        return "\n".join(self.lines(element, types))
+
+    def lines(
+        self,
+        element: PageElement,
+        types: _OneOrMoreStringTypes = PageElement.default,
+    ) -> List[str]:
+        """Render a `Tag` or a `NavigableString` as a list of lines of
+        plain text.
+
+        The arguments are the same as for `TextRenderer.render`.
+        """
+        if types is PageElement.default:
+            if (
+                isinstance(element, Tag)
+                and element.interesting_string_types is not None
+            ):
+                types = element.interesting_string_types
+            else:
+                types = Tag.MAIN_CONTENT_STRING_TYPES
+        wanted = _string_classes(types)
+
+        events: Iterator[Tuple[Tag._TreeTraversalEvent, PageElement]]
+        if isinstance(element, Tag):
+            events = element._event_stream()
+        else:
+            events = iter([(Tag.STRING_ELEMENT_EVENT, element)])
+
+        block_elements = self.block_elements
+        line_break_elements = self.line_break_elements
+        cell_elements = self.cell_elements
+        preserve_whitespace_tags = self.preserve_whitespace_tags
+        # Most tags, like <b> and <span>, don't affect the layout at
+        # all, and can be dismissed with a single set lookup.
+        layout_tags = (
+            block_elements
+            | line_break_elements
+            | cell_elements
+            | preserve_whitespace_tags
+        )
+        string_event = Tag.STRING_ELEMENT_EVENT
+        end_event = Tag.END_ELEMENT_EVENT
+
+        lines: List[str] = []
+        # The pieces of the line currently being built.
+        line: List[str] = []
+        # Whether a space is due before the next piece of text.
+        space = False
+        # Whether we're at the start of a line or a table cell, where
+        # a space would never be wanted.
+        at_start = True
+        # How many whitespace-preserving tags we're inside.
+        preserving = 0
+        # Whether any preserved strings, which might contain newlines
+        # of their own, went into the output.
+        preserved = False
+
+        for event, e in events:
+            if event is string_event:
+                if wanted is None:
+                    if not isinstance(e, NavigableString):
+                        continue
+                elif type(e) not in wanted:
+                    continue
+                string = e
+                if preserving:
+                    if space and not at_start:
+                        line.append(" ")
+                    space = False
+                    at_start = False
+                    preserved = True
+                    line.append(string)
+                    continue
+                words = string.split()
+                if not words:
+                    # Nothing but whitespace.
+                    if string:
+                        space = True
+                    continue
+                if not at_start and (space or string[0].isspace()):
+                    line.append(" ")
+                line.append(" ".join(words))
+                space = string[-1].isspace()
+                at_start = False
+                continue
+
+            name = e.name
+            if name not in layout_tags:
+                continue
+            if name in block_elements:
+                # The start or end of a block finishes the current
+                # line, if there is one.
+                if line:
+                    lines.append("".join(line))
+                    line = []
+                space = False
+                at_start = True
+            elif name in line_break_elements:
+                if event is not end_event:
+                    # A line break finishes the current line, even if
+                    # it's empty.
+                    lines.append("".join(line))
+                    line = []
+                    space = False
+                    at_start = True
+            elif name in cell_elements:
+                if event is not end_event and line:
+                    line.append(self.cell_separator)
+                    space = False
+                    at_start = True
+
+            if name in preserve_whitespace_tags:
+                if event is Tag.START_ELEMENT_EVENT:
+                    preserving += 1
+                elif event is end_event:
+                    preserving -= 1
+
+        if line:
+            lines.append("".join(line))
+        if preserved:
+            lines = "\n".join(lines).split("\n")
+        # Line breaks at the very beginning or end of the text don't
+        # separate anything.
+        start = 0
+        while start < len(lines) and not lines[start]:
+            start += 1
+        while len(lines) > start and not lines[-1]:
+            lines.pop()
+        return lines[start:]